@@ -0,0 +1,97 @@
+"""
+Scaling benchmark of normalize_parallel from 1 to N worker processes on synthetic papers built from the normalizer dictionary.
+"""
+
+import argparse
+import multiprocessing
+import random
+from copy import deepcopy
+from datetime import datetime
+from typing import List, Tuple, Any, Optional
+
+from bionorm.common.models import Paper, Passage, Location, GeneMention, SpeciesMention, DiseaseMention, ChemicalMention
+from bionorm.common.util import normalize_parallel, paper_entities, iter_lines
+from bionorm.normalizers.chemicals.SieveBased import ChemicalsSieveBasedNormalizer
+from bionorm.normalizers.disease.SieveBased import DiseaseSieveBasedNormalizer
+from bionorm.normalizers.gene.GNormPlus import GNormPlus
+from bionorm.normalizers.gene.GNormPlus.benchmarks.trees import collect_mentions
+from bionorm.normalizers.species.DictNormalizer import DictNormalizer
+
+NORMALIZERS = ['disease', 'chemicals', 'species', 'gene']
+_PASSAGE_FIELDS = {'disease': 'diseases', 'chemicals': 'chemicals', 'species': 'species', 'gene': 'genes'}
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--normalizer", choices=NORMALIZERS, required=True)
+    parser.add_argument("--papers", type=int, default=2000)
+    parser.add_argument("--mentions", type=int, default=10, help='Mentions per paper')
+    parser.add_argument("--max-workers", type=int, default=None, help='Defaults to the number of CPUs')
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def load_normalizer(name: str) -> Tuple[Any, List[str]]:
+    """Loads the default normalizer and the names from its dictionary used as mentions.
+    """
+    if name == 'disease' or name == 'chemicals':
+        normalizer = DiseaseSieveBasedNormalizer.default() if name == 'disease' else ChemicalsSieveBasedNormalizer.default()
+        names = [line.split('||')[1].split('|')[0] for line in iter_lines(normalizer.config.terminology_path) if '||' in line]
+    elif name == 'species':
+        normalizer = DictNormalizer.default()
+        names = [line.split('||')[1].split('|')[0] for line in iter_lines(normalizer.config.dict_path) if '||' in line]
+    else:
+        normalizer = GNormPlus.default()
+        names = collect_mentions([line for line in iter_lines(normalizer.config.gene_tree_path) if line.strip()])
+    start = datetime.now()
+    normalizer.load_data()
+    print(f'Loaded {name} normalizer in {datetime.now() - start}')
+    return normalizer, names
+
+
+def make_papers(name: str, names: List[str], papers_count: int, mentions_count: int, seed: int) -> List[Paper]:
+    mention_class = {'disease': DiseaseMention, 'chemicals': ChemicalMention, 'species': SpeciesMention, 'gene': GeneMention}[name]
+    rng = random.Random(seed)
+    papers = []
+    for i in range(papers_count):
+        mentions = rng.choices(names, k=mentions_count)
+        context = ' and '.join(mentions)
+        entities = []
+        start = 0
+        for mention in mentions:
+            entities.append(mention_class(Location(start, start + len(mention)), mention))
+            start += len(mention) + len(' and ')
+        passage = Passage('abstract', context, **{_PASSAGE_FIELDS[name]: entities})
+        papers.append(Paper(str(i), [passage], []))
+    return papers
+
+
+def run(normalizer: Any, papers: List[Paper], workers: int, chunk_size: int) -> Tuple[float, List[List[Optional[str]]]]:
+    papers = deepcopy(papers)
+    start = datetime.now()
+    normalized = list(normalize_parallel(normalizer, papers, workers=workers, chunk_size=chunk_size))
+    elapsed = (datetime.now() - start).total_seconds()
+    return elapsed, [[entity.id for entity in paper_entities(paper)] for paper in normalized]
+
+
+def main(name: str, papers_count: int, mentions_count: int, max_workers: Optional[int], chunk_size: int, seed: int):
+    normalizer, names = load_normalizer(name)
+    papers = make_papers(name, names, papers_count, mentions_count, seed)
+    max_workers = max_workers or multiprocessing.cpu_count()
+
+    workers_counts = sorted({1, max_workers} | {2 ** i for i in range(max_workers.bit_length()) if 2 ** i <= max_workers})
+    base_time, base_ids = None, None
+    for workers in workers_counts:
+        elapsed, ids = run(normalizer, papers, workers, chunk_size)
+        if base_time is None:
+            base_time, base_ids = elapsed, ids
+        assert ids == base_ids, f'Results with {workers} workers differ from the results with 1 worker'
+        print(f'{workers:>3} workers: {elapsed:8.2f}s, {papers_count / elapsed:8.1f} papers/s, speedup {base_time / elapsed:5.2f}x')
+
+
+if __name__ == '__main__':
+    parser = setup_argparser()
+    args_ = parser.parse_args()
+    main(args_.normalizer, args_.papers, args_.mentions, args_.max_workers, args_.chunk_size, args_.seed)
@@ -0,0 +1,71 @@
+"""
+Benchmark of TextProcessor suffix, prefix and affix lookups with the tries against the linear scan over the maps.
+"""
+
+import argparse
+import timeit
+from pathlib import Path
+from typing import Optional, List, Iterable
+
+from bionorm.common.SieveBased.benchmarks.partial_match import DISEASE_TERMINOLOGY_PATH
+from bionorm.common.SieveBased.config import SieveBasedConfig
+from bionorm.common.SieveBased.util import TextProcessor
+from bionorm.common.util import iter_lines
+
+
+def reference_get_suffix(text_processor: TextProcessor, string: str) -> Optional[str]:
+    return next((suffix for suffix in text_processor.suffix_map.keys() if string.endswith(suffix)), None)
+
+
+def reference_get_prefix(text_processor: TextProcessor, string: str) -> Optional[str]:
+    return next((prefix for prefix in text_processor.prefix_map.keys() if string.startswith(prefix)), None)
+
+
+def reference_get_affix(text_processor: TextProcessor, string: str) -> Optional[str]:
+    return next((affix for affix in text_processor.affix_map.keys() if affix in string), None)
+
+
+def collect_tokens(lines: Iterable[str]) -> List[str]:
+    """Collect tokens of the names in terminology lines, as AffixationSieve sees them.
+    """
+    tokens = []
+    for line in lines:
+        if '||' not in line:
+            continue
+        for name in line.strip().split('||')[1].lower().split('|'):
+            tokens.extend(name.split())
+    return tokens
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--terminology", type=lambda x: Path(x), default=DISEASE_TERMINOLOGY_PATH)
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser
+
+
+def main(terminology_path: Path, repeat: int):
+    text_processor = TextProcessor(SieveBasedConfig())
+    text_processor.load_data()
+    tokens = collect_tokens(iter_lines(str(terminology_path), verbose=True, message='Loading terminology...'))
+    print(f'{len(tokens)} tokens, {len(set(tokens))} unique')
+
+    lookups = [
+        ('suffix', reference_get_suffix, text_processor.get_suffix),
+        ('prefix', reference_get_prefix, text_processor.get_prefix),
+        ('affix', reference_get_affix, text_processor.get_affix),
+    ]
+    for name, reference, lookup in lookups:
+        assert [reference(text_processor, token) for token in tokens] == [lookup(token) for token in tokens], \
+            f'Index returned different {name}'
+        reference_time = min(timeit.repeat(lambda: [reference(text_processor, token) for token in tokens], number=1, repeat=repeat))
+        index_time = min(timeit.repeat(lambda: [lookup(token) for token in tokens], number=1, repeat=repeat))
+        print(f'{name:>6}: linear {reference_time / len(tokens) * 1e6:6.3f}us, index {index_time / len(tokens) * 1e6:6.3f}us per token '
+              f'({reference_time / index_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    parser = setup_argparser()
+    args_ = parser.parse_args()
+    main(args_.terminology, args_.repeat)
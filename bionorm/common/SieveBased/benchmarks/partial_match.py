@@ -0,0 +1,102 @@
+"""
+Benchmark of PartialMatchNCBISieve with the token index against the reference implementation comparing the strings.
+"""
+
+import argparse
+import random
+import timeit
+from pathlib import Path
+from typing import Optional, Set, List, Dict
+
+from bionorm.common.SieveBased.config import SieveBasedConfig
+from bionorm.common.SieveBased.processing import Terminology
+from bionorm.common.SieveBased.processing.sieves import PartialMatchNCBISieve
+from bionorm.common.SieveBased.util import TextProcessor
+
+DISEASE_TERMINOLOGY_PATH = Path(__file__).parents[3] / 'normalizers' / 'disease' / 'SieveBased' / 'data' / 'mesh_terminology.txt'
+
+
+def reference_partial_match(sieve: PartialMatchNCBISieve, phrase: str, tokens: List[str]) -> Optional[str]:
+    """Partial match going through the candidate names and comparing their tokens with the phrase ones.
+
+    Doesn't modify the terminology.
+    """
+    terminology = sieve.terminology
+    text_processor = sieve.text_processor
+    partial_matched_phrases: Set[str] = set()
+    cui_candidate_matching_tokens_count_map: Dict[str, int] = {}
+    cui_candidate_length_map: Dict[str, int] = {}
+    for token in tokens:
+        if token in text_processor.stopwords or token not in terminology.token_to_name_map:
+            continue
+        # Skip the matched names instead of taking the set difference, which would change the order of candidates
+        for candidate in terminology.token_to_name_map[token]:
+            if candidate in partial_matched_phrases:
+                continue
+            partial_matched_phrases.add(candidate)
+            count = text_processor.get_matching_tokens_count(phrase, candidate)
+            cui = next(iter(terminology.name_to_cui_map[candidate]))
+
+            if cui in cui_candidate_matching_tokens_count_map:
+                old_count = cui_candidate_matching_tokens_count_map[cui]
+                if old_count <= count:
+                    new_candidate_len = len(candidate.split())
+                    if old_count < count or (old_count == count and new_candidate_len < cui_candidate_length_map[cui]):
+                        cui_candidate_matching_tokens_count_map[cui] = count
+                        cui_candidate_length_map[cui] = new_candidate_len
+            else:
+                cui_candidate_matching_tokens_count_map[cui] = count
+                cui_candidate_length_map[cui] = len(candidate.split())
+    return sieve._get_cui(cui_candidate_matching_tokens_count_map, cui_candidate_length_map)
+
+
+def make_phrases(names: List[str], count: int, seed: int) -> List[str]:
+    """Make phrases partially matching the names by dropping, shuffling and mixing their tokens.
+    """
+    rng = random.Random(seed)
+    phrases = []
+    for _ in range(count):
+        tokens = rng.choice(names).split()
+        if len(tokens) > 1 and rng.random() < 0.5:
+            tokens.pop(rng.randrange(len(tokens)))
+        if rng.random() < 0.5:
+            tokens.append(rng.choice(rng.choice(names).split()))
+        rng.shuffle(tokens)
+        phrases.append(' '.join(tokens))
+    return phrases
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--terminology", type=lambda x: Path(x), default=DISEASE_TERMINOLOGY_PATH)
+    parser.add_argument("--phrases", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(terminology_path: Path, phrases_count: int, repeat: int, seed: int):
+    text_processor = TextProcessor(SieveBasedConfig())
+    text_processor.load_data()
+    terminology = Terminology(str(terminology_path), text_processor)
+    terminology.load_data(verbose=True)
+    sieve = PartialMatchNCBISieve(terminology)
+    phrases = make_phrases(list(terminology.name_to_cui_map), phrases_count, seed)
+
+    expected = [reference_partial_match(sieve, phrase, phrase.split()) for phrase in phrases]
+    actual = [sieve._partial_match(phrase, phrase.split()) for phrase in phrases]
+    assert expected == actual, 'Token index returned different CUIs'
+
+    reference_time = min(timeit.repeat(lambda: [reference_partial_match(sieve, phrase, phrase.split()) for phrase in phrases],
+                                       number=1, repeat=repeat))
+    index_time = min(timeit.repeat(lambda: [sieve._partial_match(phrase, phrase.split()) for phrase in phrases], number=1, repeat=repeat))
+    print(f'{len(phrases)} phrases, {len(terminology.token_index.names)} names, {len(terminology.token_index.postings)} tokens')
+    print(f'reference: {reference_time / len(phrases) * 1e3:8.3f}ms per phrase')
+    print(f'    index: {index_time / len(phrases) * 1e3:8.3f}ms per phrase ({reference_time / index_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    parser = setup_argparser()
+    args_ = parser.parse_args()
+    main(args_.terminology, args_.phrases, args_.repeat, args_.seed)
@@ -0,0 +1,62 @@
+"""
+Memory report of the terminology maps: dictionaries of sets, frozen maps and compact maps.
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from pathlib import Path
+
+from bionorm.common.SieveBased.benchmarks.partial_match import DISEASE_TERMINOLOGY_PATH
+from bionorm.common.SieveBased.config import SieveBasedConfig
+from bionorm.common.SieveBased.processing import Terminology
+from bionorm.common.SieveBased.util import TextProcessor
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--terminology", type=lambda x: Path(x), default=DISEASE_TERMINOLOGY_PATH)
+    return parser
+
+
+def load_terminology(terminology_path: Path, text_processor: TextProcessor, mode: str) -> Terminology:
+    terminology = Terminology(str(terminology_path), text_processor)
+    terminology.load_data()
+    if mode == 'frozen':
+        terminology.freeze()
+    elif mode.startswith('compact'):
+        terminology.compact()
+        if mode == 'compact+reverse':
+            len(terminology.cui_to_name_map)
+            len(terminology.cui_to_stemmed_name_map)
+    return terminology
+
+
+def main(terminology_path: Path):
+    text_processor = TextProcessor(SieveBasedConfig())
+    text_processor.load_data()
+    # Fill the stem cache, so it isn't counted in the first mode
+    load_terminology(terminology_path, text_processor, 'default')
+    gc.collect()
+
+    sizes = {}
+    for mode in ['default', 'frozen', 'compact', 'compact+reverse']:
+        tracemalloc.start()
+        start = time.perf_counter()
+        terminology = load_terminology(terminology_path, text_processor, mode)
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        sizes[mode], peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'{mode:>15}: {sizes[mode] / 2 ** 20:8.1f}MB retained, {peak / 2 ** 20:8.1f}MB peak, {elapsed:6.2f}s load '
+              f'({sizes["default"] / sizes[mode]:.1f}x smaller)')
+        del terminology
+        gc.collect()
+
+
+if __name__ == '__main__':
+    parser = setup_argparser()
+    args_ = parser.parse_args()
+    main(args_.terminology)
@@ -0,0 +1,36 @@
+"""
+Build terminology indexes (see TerminologyIndex), which are opened by SieveBased normalizers with use_terminology_index set
+instead of parsing the terminology files.
+"""
+
+import argparse
+from pathlib import Path
+from typing import List
+
+from bionorm.common.SieveBased.config import SieveBasedConfig
+from bionorm.common.SieveBased.processing import Terminology
+from bionorm.common.SieveBased.util import TextProcessor
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--terminology", type=lambda x: Path(x), nargs='+', required=True)
+    return parser
+
+
+def main(terminology_paths: List[Path]):
+    for terminology_path in terminology_paths:
+        config = SieveBasedConfig(terminology_path=str(terminology_path))
+        text_processor = TextProcessor(config)
+        text_processor.load_data()
+        terminology = Terminology(config.terminology_path, text_processor)
+        terminology.load_data(verbose=True)
+        index = terminology.build_index()
+        print(f'{terminology_path.name} -> {index}')
+
+
+if __name__ == '__main__':
+    parser = setup_argparser()
+    args_ = parser.parse_args()
+    main(args_.terminology)
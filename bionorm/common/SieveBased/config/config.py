@@ -14,6 +14,12 @@ class SieveBasedConfig(NamedTuple):
     """
     use_nltk_stopwords: bool = False
     sieve_level: int = 10
+    freeze_terminology: bool = True
+    sieve_result_cache_size: int = 0
+    stem_cache_size: int = 1 << 18
+    persist_stem_cache: bool = False
+    use_terminology_index: bool = False
+    compact_terminology: bool = False
     stopwords_path: str = join(DATA_PATH, 'stopwords.txt')
     stemmer_constructor: Type[StemmerI] = PorterStemmer
     spell_check_map_path: str = join(DATA_PATH, 'ncbi-spell-check.txt')
@@ -1 +1,2 @@
+from .candidates import *
 from .entities import *
@@ -0,0 +1,104 @@
+import threading
+from collections import Counter
+from typing import List, Set, Dict, Iterable, Iterator
+
+
+class CandidateNames:
+    """Candidate names of an entity generated by the sieves.
+
+    Names are deduplicated as they are added and kept in the order of generation. Sieves look the names up in the
+    normalized names and the terminology only once: the first `looked_up` names already failed to match, as neither the
+    maps nor the names change while the entity goes through the sieves, so each sieve checks only the names added since.
+
+    Attributes:
+        names (List[str]):
+            Names in the order of addition.
+        looked_up (int):
+            Number of the first names already looked up.
+        generated (Dict[str, int]):
+            Number of variants generated by every sieve, including duplicates.
+        added (Dict[str, int]):
+            Number of new names added by every sieve.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.looked_up = 0
+        self.generated: Dict[str, int] = {}
+        self.added: Dict[str, int] = {}
+        self._names_set: Set[str] = set()
+
+    def __contains__(self, name):
+        return name in self._names_set
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name: str) -> bool:
+        """Add the name if it isn't there yet.
+
+        Args:
+            name (str):
+                Name to add.
+
+        Returns:
+            Whether the name is new.
+        """
+        if name in self._names_set:
+            return False
+        self._names_set.add(name)
+        self.names.append(name)
+        return True
+
+    def update(self, names: Iterable[str]):
+        for name in names:
+            self.add(name)
+
+    def count(self, sieve_name: str, generated: int, added: int):
+        """Add the numbers of variants generated by the sieve.
+
+        Args:
+            sieve_name (str):
+                Display name of sieve.
+            generated (int):
+                Number of generated variants.
+            added (int):
+                Number of new names among them.
+        """
+        self.generated[sieve_name] = self.generated.get(sieve_name, 0) + generated
+        self.added[sieve_name] = self.added.get(sieve_name, 0) + added
+
+
+class CandidateCounts:
+    """Thread-safe totals of the candidate names generated by every sieve.
+
+    Attributes:
+        generated (Counter):
+            Number of variants generated by every sieve, including duplicates.
+        added (Counter):
+            Number of new names added by every sieve.
+    """
+
+    def __init__(self):
+        self.generated: Dict[str, int] = Counter()
+        self.added: Dict[str, int] = Counter()
+        self._lock = threading.Lock()
+
+    def update(self, candidates: CandidateNames):
+        """Add the counts of the entity.
+
+        Args:
+            candidates (CandidateNames):
+                Candidate names of the normalized entity.
+        """
+        with self._lock:
+            self.generated.update(candidates.generated)
+            self.added.update(candidates.added)
+
+    def clear(self):
+        with self._lock:
+            self.generated.clear()
+            self.added.clear()
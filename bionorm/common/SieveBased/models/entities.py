@@ -1,6 +1,7 @@
-from typing import Optional, Set
+from typing import Optional
 
 from bionorm.common.models import BioEntity
+from bionorm.common.SieveBased.models.candidates import CandidateNames
 from bionorm.common.SieveBased.util import TextProcessor
 
 CUI_LESS = 'CUI-less'
@@ -26,8 +27,8 @@ class SieveBasedEntity:
         self.text = text_processor.correct_spelling(self.__entity.text.lower().strip())
         self.stemmed_name = text_processor.get_stemmed_phrase(self.text)
         self.normalizing_sieve_level = 0
-        self.names_knowledge_base: Set[str] = set()
-        self.stemmed_names_knowledge_base: Set[str] = set()
+        self.names_knowledge_base = CandidateNames()
+        self.stemmed_names_knowledge_base = CandidateNames()
         self.long_form: Optional[str] = long_form
 
     @property
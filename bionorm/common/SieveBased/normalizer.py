@@ -1,23 +1,90 @@
-from typing import List, Tuple, Optional
+import abc
+from copy import copy
+from typing import List, Tuple, Optional, Dict, Set, FrozenSet, NamedTuple
 
-from bionorm.common.models import BioEntity
+from bionorm.common.models import BioEntity, Paper
 from bionorm.common.SieveBased.config import SieveBasedConfig
-from bionorm.common.SieveBased.models import SieveBasedEntity, CUI_LESS
-from bionorm.common.SieveBased.processing import Terminology
+from bionorm.common.SieveBased.models import SieveBasedEntity, CandidateCounts, CUI_LESS
+from bionorm.common.SieveBased.processing import Terminology, NormalizationContext, SieveResultCache, CachedSieveResult
 from bionorm.common.SieveBased.processing.sieves import AffixationSieve, BaseSieve, EntityModifierSynonymsSieve, HyphenationSieve, \
     PartialMatchNCBISieve, PrepositionalTransformSieve, Sieve, SimpleNameSieve, StemmingSieve, SymbolReplacementSieve
 from bionorm.common.SieveBased.util import TextProcessor
 
 
-class SieveBasedNormalizer:
+class _ProbedMap:
+    """View of normalized names map, which remembers the names looked up in it.
+
+    Attributes:
+        probed (Set[str]):
+            Names looked up in the map.
+        hit (bool):
+            Whether any of the names was found in the map.
+    """
+
+    def __init__(self, names_map: Dict[str, Set[str]]):
+        self.names_map = names_map
+        self.probed: Set[str] = set()
+        self.hit = False
+
+    def __contains__(self, name):
+        self.probed.add(name)
+        found = name in self.names_map
+        self.hit |= found
+        return found
+
+    def __getitem__(self, name):
+        return self.names_map[name]
+
+
+class _ProbedContext(NormalizationContext):
+    """Context, which remembers the names looked up in it.
+    """
+
+    def __init__(self, context: NormalizationContext):
+        super(_ProbedContext, self).__init__()
+        self.normalized_name_to_cui_map = _ProbedMap(context.normalized_name_to_cui_map)
+        self.stemmed_normalized_name_to_cui_map = _ProbedMap(context.stemmed_normalized_name_to_cui_map)
+
+    @property
+    def hit(self) -> bool:
+        return self.normalized_name_to_cui_map.hit or self.stemmed_normalized_name_to_cui_map.hit
+
+
+class _BatchResult(NamedTuple):
+    """Result of normalization of an entity without the normalized names of paper.
+
+    Attributes:
+        entity (SieveBasedEntity):
+            Normalized entity.
+        probed_names (FrozenSet[str]):
+            Names looked up in normalized_name_to_cui_map by sieves.
+        probed_stemmed_names (FrozenSet[str]):
+            Names looked up in stemmed_normalized_name_to_cui_map by sieves.
+    """
+    entity: SieveBasedEntity
+    probed_names: FrozenSet[str]
+    probed_stemmed_names: FrozenSet[str]
+
+
+class SieveBasedNormalizer(abc.ABC):
     """Sieve-based normalizer for entities.
 
     Notes:
         After creation of normalizer call load_data() to load all of the data.
+        A loaded normalizer keeps no state between calls: entities normalized in a paper are stored in a
+        :class:`NormalizationContext` of the call and the sieves don't modify themselves, so normalize() and
+        normalize_batch() may be called from several threads at once. The terminology should be frozen for that
+        (see freeze_terminology of config), otherwise lookups of missing names may insert them into its maps.
+        If sieve_result_cache_size of config is positive, results of the sieves are cached across papers in
+        :class:`SieveResultCache`, see it for which of them are reused.
 
     Attributes:
         config (SieveBasedConfig):
             Config for normalizer
+        result_cache (:obj:`SieveResultCache`, optional):
+            Cache of sieve results shared between papers, None if disabled.
+        candidate_counts (CandidateCounts):
+            Numbers of candidate names generated by every sieve.
     """
 
     def __init__(self, config: SieveBasedConfig):
@@ -36,6 +103,11 @@ class SieveBasedNormalizer:
             SimpleNameSieve(self.terminology),
             PartialMatchNCBISieve(self.terminology)
         ]
+        # Only the maps used by the sieves up to the sieve level are loaded
+        self.terminology.required_maps = frozenset().union(*(sieve.required_maps for sieve in self.sieves[:config.sieve_level]))
+        self.result_cache: Optional[SieveResultCache] = \
+            SieveResultCache(config.sieve_result_cache_size) if config.sieve_result_cache_size > 0 else None
+        self.candidate_counts = CandidateCounts()
 
     def load_data(self, *, verbose: bool = False):
         """Loads the data used by normalizer.
@@ -46,6 +118,21 @@ class SieveBasedNormalizer:
         """
         self.text_processor.load_data(verbose=verbose)
         self.terminology.load_data(verbose=verbose)
+        if self.config.freeze_terminology:
+            self.terminology.freeze()
+
+    @abc.abstractmethod
+    def get_entities(self, paper: Paper) -> List[Tuple[BioEntity, Optional[str]]]:
+        """Collect entities of the paper to normalize.
+
+        Args:
+            paper (Paper):
+                Paper to normalize.
+
+        Returns:
+            Entities to normalize with their abbreviations.
+        """
+        pass
 
     def normalize_entities(self, entities_with_abb: List[Tuple[BioEntity, Optional[str]]], *, verbose: bool = False):
         """Normalize entities in paper in-place.
@@ -56,20 +143,90 @@ class SieveBasedNormalizer:
             verbose (:obj:`bool`, defaults to :obj:`False`):
                 Whether to output verbose information about normalized entity.
         """
+        context = NormalizationContext()
         for entity, long_form in entities_with_abb:
-            sieve_entity = SieveBasedEntity(entity, self.text_processor, long_form)
-            self._run_multi_pass_sieve(sieve_entity)
-            if sieve_entity.id is None:
-                sieve_entity.id = CUI_LESS
-            if sieve_entity.normalizing_sieve_level != 1 or sieve_entity.id == CUI_LESS:
-                self.terminology.store_normalized_entity(sieve_entity)
-            if verbose:
-                print(f'{sieve_entity.text}\t{sieve_entity.id}\t[{self.sieves[sieve_entity.normalizing_sieve_level].name}]')
-        self.terminology.clear_normalized_entities()
-
-    def _run_multi_pass_sieve(self, entity: SieveBasedEntity):
+            sieve_entity = self._normalize_entity(entity, long_form, context)
+            self._store_entity(sieve_entity, context, verbose=verbose)
+
+    def normalize_batch(self, papers: List[Paper], *, verbose: bool = False):
+        """Normalize entities of several papers in-place.
+
+        Sieves are run once per unique pair of entity text and long form in the batch. The result is reused for the paper
+        unless sieves looked up one of the names already normalized in this paper, in which case the entity is normalized again.
+        The results are the same as of normalizing papers one by one.
+
+        Args:
+            papers (List[Paper]):
+                Papers to normalize.
+            verbose (:obj:`bool`, defaults to :obj:`False`):
+                Whether to output verbose information about normalized entity.
+        """
+        papers_entities = [self.get_entities(paper) for paper in papers]
+        results = self._normalize_unique(papers_entities)
+        for entities_with_abb in papers_entities:
+            context = NormalizationContext()
+            for entity, long_form in entities_with_abb:
+                result = results[(entity.text, long_form)]
+                if result.probed_names.isdisjoint(context.normalized_name_to_cui_map) and \
+                        result.probed_stemmed_names.isdisjoint(context.stemmed_normalized_name_to_cui_map):
+                    sieve_entity = result.entity
+                    entity.id = sieve_entity.id
+                else:
+                    sieve_entity = self._normalize_entity(entity, long_form, context)
+                self._store_entity(sieve_entity, context, verbose=verbose)
+
+    def _normalize_unique(self, papers_entities: List[List[Tuple[BioEntity, Optional[str]]]]) \
+            -> Dict[Tuple[str, Optional[str]], _BatchResult]:
+        results: Dict[Tuple[str, Optional[str]], _BatchResult] = {}
+        for entities_with_abb in papers_entities:
+            for entity, long_form in entities_with_abb:
+                key = (entity.text, long_form)
+                if key in results:
+                    continue
+                context = _ProbedContext(NormalizationContext())
+                # Normalize a copy to leave the ID of entity to the pass over papers
+                sieve_entity = self._normalize_entity(copy(entity), long_form, context)
+                results[key] = _BatchResult(sieve_entity, frozenset(context.normalized_name_to_cui_map.probed),
+                                            frozenset(context.stemmed_normalized_name_to_cui_map.probed))
+        return results
+
+    def _normalize_entity(self, entity: BioEntity, long_form: Optional[str], context: NormalizationContext) -> SieveBasedEntity:
+        sieve_entity = SieveBasedEntity(entity, self.text_processor, long_form)
+        if self.result_cache is None:
+            self._run_multi_pass_sieve(sieve_entity, context)
+        else:
+            self._run_cached_multi_pass_sieve(sieve_entity, context)
+        self.candidate_counts.update(sieve_entity.names_knowledge_base)
+        self.candidate_counts.update(sieve_entity.stemmed_names_knowledge_base)
+        if sieve_entity.id is None:
+            sieve_entity.id = CUI_LESS
+        return sieve_entity
+
+    def _store_entity(self, sieve_entity: SieveBasedEntity, context: NormalizationContext, *, verbose: bool = False):
+        if sieve_entity.normalizing_sieve_level != 1 or sieve_entity.id == CUI_LESS:
+            self.terminology.store_normalized_entity(sieve_entity, context)
+        if verbose:
+            print(f'{sieve_entity.text}\t{sieve_entity.id}\t[{self.sieves[sieve_entity.normalizing_sieve_level].name}]')
+
+    def _run_cached_multi_pass_sieve(self, entity: SieveBasedEntity, context: NormalizationContext):
+        key = (entity.text, entity.long_form, self.config.sieve_level)
+        # Checking the cached result looks up its probed names in context, so they are recorded by an outer probed context too
+        result = self.result_cache.get(key, context)
+        if result is not None:
+            entity.id = result.cui
+            entity.normalizing_sieve_level = result.sieve_level
+            return
+        probed_context = _ProbedContext(context)
+        self._run_multi_pass_sieve(entity, probed_context)
+        # Results found in the names normalized in the paper are valid for this paper only
+        if not probed_context.hit:
+            self.result_cache.put(key, CachedSieveResult(entity.id, entity.normalizing_sieve_level,
+                                                         frozenset(probed_context.normalized_name_to_cui_map.probed),
+                                                         frozenset(probed_context.stemmed_normalized_name_to_cui_map.probed)))
+
+    def _run_multi_pass_sieve(self, entity: SieveBasedEntity, context: NormalizationContext):
         for i, sieve in enumerate(self.sieves[:self.config.sieve_level]):
-            entity.id = sieve.apply(entity)
+            entity.id = sieve.apply(entity, context)
             if entity.id is not None:
                 entity.normalizing_sieve_level = i
                 return
@@ -1 +1,6 @@
-from .terminology import Terminology
+from .context import NormalizationContext
+from .terminology import Terminology, TerminologyMap
+from .token_index import TokenIndex
+from .result_cache import CachedSieveResult, SieveResultCache
+from .terminology_index import TerminologyIndex, IndexedSetMap
+from .compact_maps import StringPool, CompactSetMap, LazyMap
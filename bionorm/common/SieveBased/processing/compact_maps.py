@@ -0,0 +1,133 @@
+import threading
+from array import array
+from typing import Dict, List, Iterator, Mapping, Iterable, FrozenSet, Callable, Optional
+
+
+class StringPool:
+    """Interned strings mapped to dense integer ids.
+
+    Attributes:
+        strings (List[str]):
+            Strings by their ids.
+        ids (Dict[str, int]):
+            Map from string to its id.
+    """
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.strings)
+
+    def intern(self, string: str) -> int:
+        """Add the string to the pool if it isn't there yet.
+
+        Args:
+            string (str):
+                String to add.
+
+        Returns:
+            Id of the string.
+        """
+        string_id = self.ids.get(string)
+        if string_id is None:
+            string_id = self.ids[string] = len(self.strings)
+            self.strings.append(string)
+        return string_id
+
+
+class CompactSetMap(Mapping[str, FrozenSet[str]]):
+    """Read-only map from strings to sets of strings, which stores ids of the pool strings in arrays.
+
+    Keys are found by their ids in the pool and every set is a slice of one array of ids (CSR layout), so the map doesn't
+    hold any Python objects per key. Sets are decoded into frozensets on every access.
+    """
+
+    def __init__(self, pool: StringPool, sets_map: Mapping[str, Iterable[str]]):
+        """
+        Args:
+            pool (StringPool):
+                Pool of the keys and values, shared by the maps of terminology. It should already contain all of the keys and
+                values of the map.
+            sets_map (Mapping[str, Iterable[str]]):
+                Map to store, its keys and the values of every set keep their order.
+        """
+        self._pool = pool
+        self._key_ids = array('i')
+        self._rows = array('i', [-1]) * len(pool)
+        self._offsets = array('q', [0])
+        self._values = array('i')
+        for key, values in sets_map.items():
+            key_id = pool.ids[key]
+            self._rows[key_id] = len(self._key_ids)
+            self._key_ids.append(key_id)
+            self._values.extend(pool.ids[value] for value in values)
+            self._offsets.append(len(self._values))
+
+    def __len__(self) -> int:
+        return len(self._key_ids)
+
+    def __iter__(self) -> Iterator[str]:
+        strings = self._pool.strings
+        return (strings[key_id] for key_id in self._key_ids)
+
+    def _find(self, key) -> int:
+        key_id = self._pool.ids.get(key)
+        return -1 if key_id is None or key_id >= len(self._rows) else self._rows[key_id]
+
+    def __contains__(self, key) -> bool:
+        return self._find(key) != -1
+
+    def __getitem__(self, key: str) -> FrozenSet[str]:
+        row = self._find(key)
+        if row == -1:
+            raise KeyError(key)
+        strings = self._pool.strings
+        return frozenset(strings[value] for value in self._values[self._offsets[row]:self._offsets[row + 1]])
+
+    def inverted(self) -> 'CompactSetMap':
+        """Build the reverse map from every value to the keys of the sets containing it.
+        """
+        reverse_map: Dict[str, List[str]] = {}
+        strings = self._pool.strings
+        for row, key_id in enumerate(self._key_ids):
+            for value in self._values[self._offsets[row]:self._offsets[row + 1]]:
+                reverse_map.setdefault(strings[value], []).append(strings[key_id])
+        return CompactSetMap(self._pool, reverse_map)
+
+
+class LazyMap(Mapping):
+    """Read-only map, which is built by the factory on the first access.
+
+    Notes:
+        The map is built under a lock, so it's built once even if it's first accessed from several threads.
+    """
+
+    def __init__(self, factory: Callable[[], Mapping]):
+        self._factory = factory
+        self._map: Optional[Mapping] = None
+        self._lock = threading.Lock()
+
+    @property
+    def built(self) -> bool:
+        return self._map is not None
+
+    def _get_map(self) -> Mapping:
+        if self._map is None:
+            with self._lock:
+                if self._map is None:
+                    self._map = self._factory()
+        return self._map
+
+    def __len__(self) -> int:
+        return len(self._get_map())
+
+    def __iter__(self) -> Iterator:
+        return iter(self._get_map())
+
+    def __contains__(self, key) -> bool:
+        return key in self._get_map()
+
+    def __getitem__(self, key):
+        return self._get_map()[key]
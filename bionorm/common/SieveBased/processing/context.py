@@ -0,0 +1,20 @@
+from collections import defaultdict
+from typing import Dict, Set
+
+
+class NormalizationContext:
+    """Per-paper state of normalization.
+
+    Holds the names normalized in the current paper, which serve as a cache for the following entities. The names are
+    per-paper, as the abbreviations may have different meanings in different papers.
+
+    Attributes:
+        normalized_name_to_cui_map (Dict[str, Set[str]]):
+            Map from normalized name (or long form of abbreviation) to its CUI.
+        stemmed_normalized_name_to_cui_map (Dict[str, Set[str]]):
+            Map from stemmed normalized name to its CUI.
+    """
+
+    def __init__(self):
+        self.normalized_name_to_cui_map: Dict[str, Set[str]] = defaultdict(set)
+        self.stemmed_normalized_name_to_cui_map: Dict[str, Set[str]] = defaultdict(set)
@@ -0,0 +1,118 @@
+import threading
+from collections import OrderedDict
+from typing import Optional, FrozenSet, NamedTuple, Tuple
+
+from bionorm.common.SieveBased.processing.context import NormalizationContext
+
+ResultKey = Tuple[str, Optional[str], int]
+
+
+class CachedSieveResult(NamedTuple):
+    """Result of the sieves for an entity, which didn't depend on the names normalized in its paper.
+
+    Attributes:
+        cui (:obj:`str`, optional):
+            Found CUI, None if none of the sieves normalized the entity.
+        sieve_level (int):
+            Index of the normalizing sieve.
+        probed_names (FrozenSet[str]):
+            Names looked up in normalized_name_to_cui_map of the context by sieves.
+        probed_stemmed_names (FrozenSet[str]):
+            Names looked up in stemmed_normalized_name_to_cui_map of the context by sieves.
+    """
+    cui: Optional[str]
+    sieve_level: int
+    probed_names: FrozenSet[str]
+    probed_stemmed_names: FrozenSet[str]
+
+
+class SieveResultCache:
+    """Thread-safe LRU cache of sieve results shared between papers.
+
+    Keys are tuples of spell-corrected entity text, long form of abbreviation and sieve level of config.
+
+    Notes:
+        Sieves look up names in the per-paper :class:`NormalizationContext` before the terminology, so a result may depend
+        on the paper. Only the results found without a hit in the context should be put into the cache: they depend on the
+        terminology only. Such result is reused in another paper only if none of the names looked up by the sieves are
+        normalized in it, otherwise the entity has to go through the sieves again.
+
+    Attributes:
+        max_size (int):
+            Maximum number of results, the least recently used are evicted.
+        hits (int):
+            Number of reused results.
+        misses (int):
+            Number of lookups of the keys not in the cache.
+        conflicts (int):
+            Number of results not reused, as they could be affected by the names normalized in the paper.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.conflicts = 0
+        self._results: 'OrderedDict[ResultKey, CachedSieveResult]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._results)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses + self.conflicts
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: ResultKey, context: NormalizationContext) -> Optional[CachedSieveResult]:
+        """Find the result reusable in the paper.
+
+        The names probed by the sieves are looked up in the maps of the context, as the sieves would do.
+
+        Args:
+            key (ResultKey):
+                Text, long form and sieve level.
+            context (NormalizationContext):
+                Context of the paper.
+
+        Returns:
+            Cached result if it exists and isn't affected by the context, None otherwise.
+        """
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+        if any(name in context.normalized_name_to_cui_map for name in result.probed_names) or \
+                any(name in context.stemmed_normalized_name_to_cui_map for name in result.probed_stemmed_names):
+            with self._lock:
+                self.conflicts += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def put(self, key: ResultKey, result: CachedSieveResult):
+        """Store the result, evicting the least recently used one if the cache is full.
+
+        Args:
+            key (ResultKey):
+                Text, long form and sieve level.
+            result (CachedSieveResult):
+                Result found without hits in the context.
+        """
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            if len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+    def clear(self):
+        """Remove all results and reset the statistics.
+        """
+        with self._lock:
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
+            self.conflicts = 0
@@ -8,3 +8,4 @@ from .sieve import Sieve
 from .simple_name_sieve import SimpleNameSieve
 from .stemming_sieve import StemmingSieve
 from .symbol_replacement_sieve import SymbolReplacementSieve
+from .transformation_sieve import TransformationSieve
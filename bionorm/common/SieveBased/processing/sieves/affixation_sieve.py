@@ -1,11 +1,10 @@
-from typing import Optional, Set, List
+from typing import List, Iterator
 
-from bionorm.common.SieveBased.models import SieveBasedEntity
 from bionorm.common.SieveBased.processing import Terminology
-from bionorm.common.SieveBased.processing.sieves.base_sieve import BaseSieve
+from bionorm.common.SieveBased.processing.sieves.transformation_sieve import TransformationSieve
 
 
-class AffixationSieve(BaseSieve):
+class AffixationSieve(TransformationSieve):
     """Affixation sieve.
 
     This sieve looks for all of the different suffix combinations, also replaces all of the prefixes and affixes
@@ -18,27 +17,14 @@ class AffixationSieve(BaseSieve):
     def name(self) -> str:
         return "Affixation Sieve"
 
-    def apply(self, entity: SieveBasedEntity) -> Optional[str]:
-        self._transform_name(entity)
-        return self.normalize(entity.names_knowledge_base)
-
-    def _transform_name(self, entity: SieveBasedEntity):
-        transformed_names: Set[str] = set()
-        for name in entity.names_knowledge_base:
-            transformed_names.update(self._affix(name))
-        entity.names_knowledge_base.update(transformed_names)
-
-    def _affix(self, name: str) -> Set[str]:
+    def _transform(self, name: str) -> Iterator[str]:
         tokens = name.split()
-        new_phrases = self._suffixation(tokens, name)
-        new_phrases.add(self._prefixation(tokens))
-        new_phrases.add(self._affixation(tokens))
-        return new_phrases
-
-    def _suffixation(self, tokens: List[str], name: str) -> Set[str]:
-        return self._get_all_string_token_suffixation_combinations(tokens).union(self._get_uniform_string_token_suffixation(tokens, name))
+        yield from self._get_all_string_token_suffixation_combinations(tokens)
+        yield from self._get_uniform_string_token_suffixation(tokens, name)
+        yield self._prefixation(tokens)
+        yield self._affixation(tokens)
 
-    def _get_all_string_token_suffixation_combinations(self, tokens: List[str]) -> Set[str]:
+    def _get_all_string_token_suffixation_combinations(self, tokens: List[str]) -> List[str]:
         suffixated_phrases: List[str] = []
         for token in tokens:
             suffix = self.text_processor.get_suffix(token)
@@ -59,18 +45,16 @@ class AffixationSieve(BaseSieve):
                         for s in for_suffixation:
                             temp_suffixated_phrases.append(phrase + ' ' + token.replace(suffix, s))
                     suffixated_phrases = temp_suffixated_phrases
-        return set(suffixated_phrases)
+        return suffixated_phrases
 
-    def _get_uniform_string_token_suffixation(self, tokens: List[str], name: str) -> Set[str]:
-        suffixated_phrases: Set[str] = set()
+    def _get_uniform_string_token_suffixation(self, tokens: List[str], name: str) -> Iterator[str]:
         for token in tokens:
             suffix = self.text_processor.get_suffix(token)
             for_suffixation = None if suffix is None else self.text_processor.suffix_map[suffix]
             if for_suffixation is None:
                 continue
             for s in for_suffixation:
-                suffixated_phrases.add(name.replace(suffix, s))
-        return suffixated_phrases
+                yield name.replace(suffix, s)
 
     def _prefixation(self, tokens: List[str]) -> str:
         prefixated_tokens: List[str] = []
@@ -1,7 +1,7 @@
 from typing import List, Optional, Dict, Set
 
-from bionorm.common.SieveBased.models import SieveBasedEntity
-from bionorm.common.SieveBased.processing import Terminology
+from bionorm.common.SieveBased.models import SieveBasedEntity, CandidateNames
+from bionorm.common.SieveBased.processing import Terminology, NormalizationContext, TerminologyMap
 from bionorm.common.SieveBased.processing.sieves.sieve import Sieve
 
 
@@ -11,6 +11,8 @@ class BaseSieve(Sieve):
     Basic sieve looking for the exact match. Also has long form mode, which looks for the full forms of abbreviations, instead of given
     name.
     """
+    required_maps = frozenset({TerminologyMap.NAME_TO_CUI})
+
     def __init__(self, terminology: Terminology, *, long_form_mode: bool = False):
         """
         Args:
@@ -43,7 +45,7 @@ class BaseSieve(Sieve):
             return next(iter(name_to_cui_map[name]))
         return None
 
-    def exact_match_sieve(self, name: str) -> Optional[str]:
+    def exact_match_sieve(self, name: str, context: NormalizationContext) -> Optional[str]:
         """Find the exact match for name.
 
         First looks up in already normalized names map, which serves a function of cache.
@@ -52,40 +54,67 @@ class BaseSieve(Sieve):
         Args:
             name (str):
                 Name to normalize.
+            context (NormalizationContext):
+                Context with already normalized names.
 
         Returns:
             ID if the value was normalized. None, otherwise.
         """
 
         # Check against already normalized names
-        cui = self.get_terminology_name_cui(self.terminology.normalized_name_to_cui_map, name)
+        cui = self.get_terminology_name_cui(context.normalized_name_to_cui_map, name)
         if cui is not None:
             return cui
         # Check against terminology
         cui = self.get_terminology_name_cui(self.terminology.name_to_cui_map, name)
         return cui
 
-    def normalize(self, names_knowledge_base: Set[str]) -> Optional[str]:
+    def normalize(self, names_knowledge_base: Set[str], context: NormalizationContext) -> Optional[str]:
         """Find the first exact match in the set of aliases.
 
         Args:
             names_knowledge_base (Set[str]):
                 Aliases of name.
+            context (NormalizationContext):
+                Context with already normalized names.
 
         Returns:
             ID if the value was normalized. None, otherwise.
         """
         for name in names_knowledge_base:
-            cui = self.exact_match_sieve(name)
+            cui = self.exact_match_sieve(name, context)
+            if cui:
+                return cui
+        return None
+
+    def normalize_candidates(self, candidates: CandidateNames, context: NormalizationContext) -> Optional[str]:
+        """Find the first exact match among the candidate names not looked up yet.
+
+        Notes:
+            The names looked up before are skipped, so it may be used only by the sieves with this exact_match_sieve().
+
+        Args:
+            candidates (CandidateNames):
+                Candidate names of entity.
+            context (NormalizationContext):
+                Context with already normalized names.
+
+        Returns:
+            ID if the value was normalized. None, otherwise.
+        """
+        while candidates.looked_up < len(candidates):
+            name = candidates.names[candidates.looked_up]
+            candidates.looked_up += 1
+            cui = self.exact_match_sieve(name, context)
             if cui:
                 return cui
         return None
 
-    def apply(self, entity: SieveBasedEntity) -> Optional[str]:
+    def apply(self, entity: SieveBasedEntity, context: NormalizationContext) -> Optional[str]:
         if self.long_form_mode:
             if entity.long_form:
-                return self.exact_match_sieve(entity.long_form)
+                return self.exact_match_sieve(entity.long_form, context)
             else:
                 return None
         else:
-            return self.exact_match_sieve(entity.text)
+            return self.exact_match_sieve(entity.text, context)
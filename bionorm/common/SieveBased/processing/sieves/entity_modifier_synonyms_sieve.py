@@ -1,11 +1,11 @@
-from typing import Optional, Set, List
+from typing import Optional, List, Iterator
 
 from bionorm.common.SieveBased.models import SieveBasedEntity
-from bionorm.common.SieveBased.processing import Terminology
-from bionorm.common.SieveBased.processing.sieves.base_sieve import BaseSieve
+from bionorm.common.SieveBased.processing import Terminology, NormalizationContext
+from bionorm.common.SieveBased.processing.sieves.transformation_sieve import TransformationSieve
 
 
-class EntityModifierSynonymsSieve(BaseSieve):
+class EntityModifierSynonymsSieve(TransformationSieve):
     """Entity Modifier Synonyms sieve.
 
     """
@@ -16,57 +16,37 @@ class EntityModifierSynonymsSieve(BaseSieve):
     def name(self) -> str:
         return "Entity Modifier Synonyms Sieve"
 
-    def apply(self, entity: SieveBasedEntity) -> Optional[str]:
+    def apply(self, entity: SieveBasedEntity, context: NormalizationContext) -> Optional[str]:
         if entity.text not in self.text_processor.plural_synonyms and entity.text not in self.text_processor.singular_synonyms:
-            self._transform_name(entity)
-            return self.normalize(entity.names_knowledge_base)
+            return super(EntityModifierSynonymsSieve, self).apply(entity, context)
         return None
 
-    def _transform_name(self, entity: SieveBasedEntity):
-        transformed_names: Set[str] = set()
-        for name in entity.names_knowledge_base:
-            tokens = name.split()
-            modifier = self._get_modifier(tokens, self.text_processor.plural_synonyms)
+    def _transform(self, name: str) -> Iterator[str]:
+        tokens = name.split()
+        for modifiers in (self.text_processor.plural_synonyms, self.text_processor.singular_synonyms):
+            modifier = self._get_modifier(tokens, modifiers)
             if modifier:
-                transformed_names.update(
-                    self._substitute_entity_modifier_with_synonyms(name, modifier, self.text_processor.plural_synonyms)
-                )
+                yield from self._substitute_entity_modifier_with_synonyms(name, modifier, modifiers)
                 maybe_name = self._delete_tail_modifier(tokens, modifier)
                 if maybe_name:
-                    transformed_names.add(maybe_name)
-                continue
-
-            modifier = self._get_modifier(tokens, self.text_processor.singular_synonyms)
-            if modifier:
-                transformed_names.update(
-                    self._substitute_entity_modifier_with_synonyms(name, modifier, self.text_processor.singular_synonyms)
-                )
-                maybe_name = self._delete_tail_modifier(tokens, modifier)
-                if maybe_name:
-                    transformed_names.add(maybe_name)
-                continue
-            transformed_names.update(self._append_modifier(name, self.text_processor.singular_synonyms))
-
-        entity.names_knowledge_base.update(transformed_names)
+                    yield maybe_name
+                return
+        yield from self._append_modifier(name, self.text_processor.singular_synonyms)
 
     @staticmethod
-    def _append_modifier(string: str, modifiers: List[str]) -> Set[str]:
-        new_phrases: Set[str] = set()
+    def _append_modifier(string: str, modifiers: List[str]) -> Iterator[str]:
         for modifier in modifiers:
-            new_phrases.add(f'{string} {modifier}')
-        return new_phrases
+            yield f'{string} {modifier}'
 
     def _delete_tail_modifier(self, tokens: List[str], modifier: str) -> Optional[str]:
         return self.text_processor.get_token_substring(tokens, 0, len(tokens) - 1) if tokens[-1] == modifier else None
 
     @staticmethod
-    def _substitute_entity_modifier_with_synonyms(string: str, to_replace_word: str, synonyms: List[str]) -> Set[str]:
-        new_phrases: Set[str] = set()
+    def _substitute_entity_modifier_with_synonyms(string: str, to_replace_word: str, synonyms: List[str]) -> Iterator[str]:
         for synonym in synonyms:
             if to_replace_word == synonym:
                 continue
-            new_phrases.add(string.replace(to_replace_word, synonym))
-        return new_phrases
+            yield string.replace(to_replace_word, synonym)
 
     def _get_modifier(self, tokens: List[str], modifiers: List[str]) -> Optional[str]:
         for modifier in modifiers:
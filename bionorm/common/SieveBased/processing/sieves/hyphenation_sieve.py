@@ -1,11 +1,10 @@
-from typing import Optional, Set, List
+from typing import List, Iterator
 
-from bionorm.common.SieveBased.models import SieveBasedEntity
 from bionorm.common.SieveBased.processing import Terminology
-from bionorm.common.SieveBased.processing.sieves.base_sieve import BaseSieve
+from bionorm.common.SieveBased.processing.sieves.transformation_sieve import TransformationSieve
 
 
-class HyphenationSieve(BaseSieve):
+class HyphenationSieve(TransformationSieve):
     """Hyphenation sieve.
 
     Looks for aliases where hyphens are replaced with spaces one-by-one and vice versa.
@@ -17,27 +16,16 @@ class HyphenationSieve(BaseSieve):
     def name(self) -> str:
         return "Hyphenation Sieve"
 
-    def apply(self, entity: SieveBasedEntity) -> Optional[str]:
-        self._transform_name(entity)
-        return self.normalize(entity.names_knowledge_base)
-
-    def _transform_name(self, entity: SieveBasedEntity):
-        transformed_name: Set[str] = set()
-        for name in entity.names_knowledge_base:
-            transformed_name.update(self._hyphenate_string(name.split()))
-            transformed_name.update(self._dehyphenate_string(name.split('-')))
-        entity.names_knowledge_base.update(transformed_name)
+    def _transform(self, name: str) -> Iterator[str]:
+        yield from self._hyphenate_string(name.split())
+        yield from self._dehyphenate_string(name.split('-'))
 
     @staticmethod
-    def _hyphenate_string(tokens: List[str]) -> Set[str]:
-        hyphenated_strings: Set[str] = set()
+    def _hyphenate_string(tokens: List[str]) -> Iterator[str]:
         for i in range(1, len(tokens)):
-            hyphenated_strings.add(' '.join(tokens[:i]) + '-' + ' '.join(tokens[i:]))
-        return hyphenated_strings
+            yield ' '.join(tokens[:i]) + '-' + ' '.join(tokens[i:])
 
     @staticmethod
-    def _dehyphenate_string(tokens: List[str]) -> Set[str]:
-        dehyphenated_strings: Set[str] = set()
+    def _dehyphenate_string(tokens: List[str]) -> Iterator[str]:
         for i in range(1, len(tokens)):
-            dehyphenated_strings.add('-'.join(tokens[:i]) + ' ' + '-'.join(tokens[i:]))
-        return dehyphenated_strings
+            yield '-'.join(tokens[:i]) + ' ' + '-'.join(tokens[i:])
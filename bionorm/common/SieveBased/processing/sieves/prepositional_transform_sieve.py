@@ -1,11 +1,11 @@
-from typing import Optional, List, Set
+from typing import Optional, List, Iterator
 
 from bionorm.common.SieveBased.models import SieveBasedEntity
-from bionorm.common.SieveBased.processing import Terminology
-from bionorm.common.SieveBased.processing.sieves.base_sieve import BaseSieve
+from bionorm.common.SieveBased.processing import Terminology, NormalizationContext
+from bionorm.common.SieveBased.processing.sieves.transformation_sieve import TransformationSieve
 
 
-class PrepositionalTransformSieve(BaseSieve):
+class PrepositionalTransformSieve(TransformationSieve):
     """Prepositional Transform sieve.
 
     Looks for aliases with some of the manipulations with prepositions.
@@ -25,10 +25,9 @@ class PrepositionalTransformSieve(BaseSieve):
     def name(self) -> str:
         return "Prepositional Transform Sieve"
 
-    def apply(self, entity: SieveBasedEntity) -> Optional[str]:
+    def apply(self, entity: SieveBasedEntity, context: NormalizationContext) -> Optional[str]:
         self._init(entity)
-        self._transform_name(entity)
-        return self.normalize(entity.names_knowledge_base)
+        return super(PrepositionalTransformSieve, self).apply(entity, context)
 
     @staticmethod
     def _init(entity: SieveBasedEntity):
@@ -36,33 +35,24 @@ class PrepositionalTransformSieve(BaseSieve):
         if entity.long_form:
             entity.names_knowledge_base.add(entity.long_form)
 
-    def _transform_name(self, entity: SieveBasedEntity):
-        transformed_names: Set[str] = set()
-        for name in entity.names_knowledge_base:
-            preposition_in_name = self.text_processor.get_preposition(name)
-            if preposition_in_name:
-                transformed_names.update(self._substitute_prepositions_in_phrase(preposition_in_name, name))
-                transformed_names.add(self._swap_phrasal_subject_and_object(preposition_in_name, name.split()))
-            else:
-                transformed_names.update(self._insert_prepositions_in_phrase(name.split()))
-        entity.names_knowledge_base.update(transformed_names)
+    def _transform(self, name: str) -> Iterator[str]:
+        preposition_in_name = self.text_processor.get_preposition(name)
+        if preposition_in_name:
+            yield from self._substitute_prepositions_in_phrase(preposition_in_name, name)
+            yield self._swap_phrasal_subject_and_object(preposition_in_name, name.split())
+        else:
+            yield from self._insert_prepositions_in_phrase(name.split())
 
-    def _insert_prepositions_in_phrase(self, tokens: List[str]) -> Set[str]:
-        new_prepositional_phrases: Set[str] = set()
+    def _insert_prepositions_in_phrase(self, tokens: List[str]) -> Iterator[str]:
         for preposition in self.text_processor.prepositions:
-            new_phrase = f'{self.text_processor.get_token_substring(tokens, 1, len(tokens))} {preposition} {tokens[0]}'
-            new_prepositional_phrases.add(new_phrase)
-            new_phrase = f'{tokens[-1]} {preposition} {self.text_processor.get_token_substring(tokens, 0, len(tokens) - 1)}'
-            new_prepositional_phrases.add(new_phrase)
-        return new_prepositional_phrases
+            yield f'{self.text_processor.get_token_substring(tokens, 1, len(tokens))} {preposition} {tokens[0]}'
+            yield f'{tokens[-1]} {preposition} {self.text_processor.get_token_substring(tokens, 0, len(tokens) - 1)}'
 
-    def _substitute_prepositions_in_phrase(self, preposition_in_name: str, name: str) -> Set[str]:
-        new_prepositional_phrases: Set[str] = set()
+    def _substitute_prepositions_in_phrase(self, preposition_in_name: str, name: str) -> Iterator[str]:
         for preposition in self.text_processor.prepositions:
             if preposition_in_name == preposition:
                 continue
-            new_prepositional_phrases.add(name.replace(f' {preposition_in_name} ', f' {preposition} '))
-        return new_prepositional_phrases
+            yield name.replace(f' {preposition_in_name} ', f' {preposition} ')
 
     def _swap_phrasal_subject_and_object(self, preposition_in_name: str, tokens: List[str]) -> str:
         preposition_index = self.text_processor.get_token_index(tokens, preposition_in_name)
@@ -1,15 +1,21 @@
 import abc
-from typing import Optional
+from typing import Optional, FrozenSet
 
 from bionorm.common.SieveBased.models import SieveBasedEntity
-from bionorm.common.SieveBased.processing import Terminology
+from bionorm.common.SieveBased.processing import Terminology, NormalizationContext, TerminologyMap
 
 
 class Sieve(abc.ABC):
     """Sieve is the block, which uses some heuristic to try normalizing entities.
 
     apply() method of sieve can add some of the additional aliases for entities, which may help further sieves to find ID.
+
+    Attributes:
+        required_maps (FrozenSet[TerminologyMap]):
+            Maps of terminology used by the sieve, only the maps required by the sieves of the normalizer are loaded.
     """
+    required_maps: FrozenSet[TerminologyMap] = frozenset()
+
     def __init__(self, terminology: Terminology):
         """
         Args:
@@ -20,12 +26,14 @@ class Sieve(abc.ABC):
         self.text_processor = terminology.text_processor
 
     @abc.abstractmethod
-    def apply(self, entity: SieveBasedEntity) -> Optional[str]:
+    def apply(self, entity: SieveBasedEntity, context: NormalizationContext) -> Optional[str]:
         """Try to normalize entity.
 
         Args:
             entity (SieveBasedEntity):
                 Entity to normalize.
+            context (NormalizationContext):
+                Context of the paper being normalized.
 
         Returns:
             ID in terminology matching the entity alias or None if not found.
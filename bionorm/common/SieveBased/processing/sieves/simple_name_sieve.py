@@ -1,7 +1,7 @@
 from typing import Optional, Set, List
 
 from bionorm.common.SieveBased.models import SieveBasedEntity
-from bionorm.common.SieveBased.processing import Terminology
+from bionorm.common.SieveBased.processing import Terminology, NormalizationContext, TerminologyMap
 from bionorm.common.SieveBased.processing.sieves.base_sieve import BaseSieve
 
 
@@ -10,6 +10,8 @@ class SimpleNameSieve(BaseSieve):
 
     Looks for shorter aliases by removing the word before last and the first word.
     """
+    required_maps = frozenset({TerminologyMap.NAME_TO_CUI, TerminologyMap.SIMPLE_NAME_TO_CUI})
+
     def __init__(self, terminology: Terminology):
         super(SimpleNameSieve, self).__init__(terminology)
 
@@ -17,10 +19,10 @@ class SimpleNameSieve(BaseSieve):
     def name(self) -> str:
         return "Simple Name Sieve"
 
-    def apply(self, entity: SieveBasedEntity) -> Optional[str]:
+    def apply(self, entity: SieveBasedEntity, context: NormalizationContext) -> Optional[str]:
         names_for_transformation = self._get_names_for_transformation(entity)
         names_knowledge_base = self._transform_name(names_for_transformation)
-        cui = self.normalize(names_knowledge_base)
+        cui = self.normalize(names_knowledge_base, context)
         return cui if cui is not None else self.get_terminology_name_cui(self.terminology.simple_name_to_cui_map, entity.text)
 
     @staticmethod
@@ -1,15 +1,18 @@
-from typing import Optional, Set
+from typing import Optional
 
 from bionorm.common.SieveBased.models import SieveBasedEntity
-from bionorm.common.SieveBased.processing import Terminology
+from bionorm.common.SieveBased.processing import Terminology, NormalizationContext, TerminologyMap
 from bionorm.common.SieveBased.processing.sieves.base_sieve import BaseSieve
 
 
 class StemmingSieve(BaseSieve):
     """Stemming sieve.
 
-    Looks for stemmed alias.
+    Looks for stemmed alias. Candidate names are stemmed one by one in the order of their addition, stopping at the first match,
+    so the stem of the name added first wins if the stems of several names match.
     """
+    required_maps = frozenset({TerminologyMap.STEMMED_NAME_TO_CUI})
+
     def __init__(self, terminology: Terminology):
         super(StemmingSieve, self).__init__(terminology)
 
@@ -17,18 +20,23 @@ class StemmingSieve(BaseSieve):
     def name(self) -> str:
         return "Stemming Sieve"
 
-    def apply(self, entity: SieveBasedEntity) -> Optional[str]:
-        self._transform_name(entity)
-        return self.normalize(entity.stemmed_names_knowledge_base)
-
-    def _transform_name(self, entity: SieveBasedEntity):
-        transformed_name: Set[str] = set()
+    def apply(self, entity: SieveBasedEntity, context: NormalizationContext) -> Optional[str]:
+        candidates = entity.stemmed_names_knowledge_base
+        generated = 0
+        added = 0
         for name in entity.names_knowledge_base:
-            transformed_name.add(self.text_processor.get_stemmed_phrase(name))
-        entity.stemmed_names_knowledge_base.update(transformed_name)
-
-    def exact_match_sieve(self, name: str) -> Optional[str]:
-        cui = self.get_terminology_name_cui(self.terminology.stemmed_normalized_name_to_cui_map, name)
+            generated += 1
+            if candidates.add(self.text_processor.get_stemmed_phrase(name)):
+                added += 1
+                cui = self.normalize_candidates(candidates, context)
+                if cui:
+                    candidates.count(self.name, generated, added)
+                    return cui
+        candidates.count(self.name, generated, added)
+        return None
+
+    def exact_match_sieve(self, name: str, context: NormalizationContext) -> Optional[str]:
+        cui = self.get_terminology_name_cui(context.stemmed_normalized_name_to_cui_map, name)
         if cui is not None:
             return cui
         cui = self.get_terminology_name_cui(self.terminology.stemmed_name_to_cui_map, name)
@@ -1,7 +1,7 @@
 from typing import Optional, Set
 
 from bionorm.common.SieveBased.models import SieveBasedEntity
-from bionorm.common.SieveBased.processing import Terminology
+from bionorm.common.SieveBased.processing import Terminology, NormalizationContext
 from bionorm.common.SieveBased.processing.sieves.base_sieve import BaseSieve
 
 
@@ -17,9 +17,9 @@ class SymbolReplacementSieve(BaseSieve):
     def name(self) -> str:
         return "Symbol Replacement Sieve"
 
-    def apply(self, entity: SieveBasedEntity) -> Optional[str]:
+    def apply(self, entity: SieveBasedEntity, context: NormalizationContext) -> Optional[str]:
         self._transform_name(entity)
-        return self.normalize(entity.names_knowledge_base)
+        return self.normalize_candidates(entity.names_knowledge_base, context)
 
     def _transform_name(self, entity: SieveBasedEntity):
         transformed_names: Set[str] = set()
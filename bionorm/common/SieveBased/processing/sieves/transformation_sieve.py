@@ -0,0 +1,49 @@
+import abc
+from typing import Optional, Iterable
+
+from bionorm.common.SieveBased.models import SieveBasedEntity
+from bionorm.common.SieveBased.processing import NormalizationContext
+from bionorm.common.SieveBased.processing.sieves.base_sieve import BaseSieve
+
+
+class TransformationSieve(BaseSieve):
+    """Sieve, which looks for the exact match of variants of the candidate names.
+
+    Every candidate name added by the previous sieves is transformed into variants. New variants are added to the
+    candidates and looked up right away, so the sieve stops at the first match without generating the rest of them.
+    The match is the same as of looking up all of the candidates in the order of their addition after the transformation, so
+    the variant of the name added first wins if variants of several names match.
+    """
+
+    def apply(self, entity: SieveBasedEntity, context: NormalizationContext) -> Optional[str]:
+        candidates = entity.names_knowledge_base
+        cui = self.normalize_candidates(candidates, context)
+        if cui:
+            return cui
+        generated = 0
+        added = 0
+        # Only the names added before the sieve are transformed, variants of the variants are left to the next sieves
+        for name in candidates.names[:len(candidates)]:
+            for variant in self._transform(name):
+                generated += 1
+                if candidates.add(variant):
+                    added += 1
+                    cui = self.normalize_candidates(candidates, context)
+                    if cui:
+                        candidates.count(self.name, generated, added)
+                        return cui
+        candidates.count(self.name, generated, added)
+        return None
+
+    @abc.abstractmethod
+    def _transform(self, name: str) -> Iterable[str]:
+        """Generate variants of the name.
+
+        Args:
+            name (str):
+                Candidate name.
+
+        Returns:
+            Variants in a deterministic order, may contain duplicates.
+        """
+        pass
@@ -1,10 +1,43 @@
 from collections import defaultdict
-from typing import Dict, Set
+from enum import Enum
+from functools import partial
+from types import MappingProxyType
+from typing import Dict, Set, Optional, Iterable, FrozenSet, Mapping
 
 from bionorm.common.SieveBased.models import SieveBasedEntity
+from bionorm.common.SieveBased.processing.compact_maps import StringPool, CompactSetMap, LazyMap
+from bionorm.common.SieveBased.processing.context import NormalizationContext
+from bionorm.common.SieveBased.processing.terminology_index import index_path, open_index, processing_fingerprint, source_hash, \
+    write_index
+from bionorm.common.SieveBased.processing.token_index import TokenIndex
 from bionorm.common.SieveBased.util import TextProcessor
 from bionorm.common.util import process_file
 
+STEM_CACHE_EXTENSION = '.stems'
+
+
+class TerminologyMap(Enum):
+    """Maps of terminology, which may be required by the sieves. Values are the attribute names of the maps.
+    """
+    NAME_TO_CUI = 'name_to_cui_map'
+    STEMMED_NAME_TO_CUI = 'stemmed_name_to_cui_map'
+    # Also the token index, which is built from it and NAME_TO_CUI
+    TOKEN_TO_NAME = 'token_to_name_map'
+    SIMPLE_NAME_TO_CUI = 'simple_name_to_cui_map'
+
+
+_MAPS = [terminology_map.value for terminology_map in TerminologyMap]
+# Reverse maps, which are built from the forward maps on demand
+_REVERSE_MAPS = {'cui_to_name_map': 'name_to_cui_map', 'cui_to_stemmed_name_map': 'stemmed_name_to_cui_map'}
+
+
+def _invert(names_map: Mapping[str, Iterable[str]], frozen: bool) -> Mapping[str, Set[str]]:
+    reverse_map: Dict[str, Set[str]] = defaultdict(set)
+    for key, values in names_map.items():
+        for value in values:
+            reverse_map[value].add(key)
+    return MappingProxyType({key: frozenset(values) for key, values in reverse_map.items()}) if frozen else reverse_map
+
 
 class Terminology:
     """Wrapper around terminology dictionary.
@@ -14,25 +47,39 @@ class Terminology:
     Notes:
         After creation of terminology call load_data() to load all of the data.
         This is also done by load_data() of SieveBasedNormalizer.
+        Terminology doesn't change during the normalization, so it may be frozen with freeze() after loading and shared between
+        threads or forked processes.
+        If persist_stem_cache of config is set, stems of the tokens are saved next to the terminology file (with
+        STEM_CACHE_EXTENSION) and loaded from there on the next startups.
+        If use_terminology_index of config is set, the maps are opened from the index file next to the terminology (see
+        :class:`TerminologyIndex`), which is rebuilt if it's missing or stale. Such terminology is frozen right away.
+        Otherwise, if compact_terminology of config is set, the maps are compacted with compact() after loading.
+        Only the required_maps are filled from the terminology file, the others stay empty (the index always has all of them).
+        Reverse maps (cui_to_name_map and cui_to_stemmed_name_map) are built from the forward maps on the first access.
     """
-    def __init__(self, terminology_path: str, text_processor: TextProcessor):
+    def __init__(self, terminology_path: str, text_processor: TextProcessor, *,
+                 required_maps: Optional[Iterable[TerminologyMap]] = None):
         """
         Args:
             terminology_path (str):
                 Path to terminology dictionary.
             text_processor (TextProcessor):
                 Text processor to use.
+            required_maps (:obj:`Iterable[TerminologyMap]`, optional):
+                Maps to fill on loading. Defaults to all of the maps.
         """
         self.terminology_path: str = terminology_path
         self.text_processor: TextProcessor = text_processor
+        self.required_maps: FrozenSet[TerminologyMap] = frozenset(TerminologyMap if required_maps is None else required_maps)
         self.name_to_cui_map: Dict[str, Set[str]] = defaultdict(set)
-        self.cui_to_name_map: Dict[str, Set[str]] = defaultdict(set)
         self.stemmed_name_to_cui_map: Dict[str, Set[str]] = defaultdict(set)
-        self.cui_to_stemmed_name_map: Dict[str, Set[str]] = defaultdict(set)
         self.token_to_name_map: Dict[str, Set[str]] = defaultdict(set)
-        self.normalized_name_to_cui_map: Dict[str, Set[str]] = defaultdict(set)
-        self.stemmed_normalized_name_to_cui_map: Dict[str, Set[str]] = defaultdict(set)
         self.simple_name_to_cui_map: Dict[str, Set[str]] = defaultdict(set)
+        self.cui_to_name_map: Mapping[str, Set[str]] = {}
+        self.cui_to_stemmed_name_map: Mapping[str, Set[str]] = {}
+        self.token_index: Optional[TokenIndex] = None
+        self.frozen = False
+        self._set_reverse_maps()
 
     def load_data(self, *, verbose: bool = False):
         """Loads data in terminology.
@@ -41,41 +88,133 @@ class Terminology:
             verbose (:obj:`bool`, defaults to :obj:`False`):
                 Whether to output verbose information about loading.
         """
-        process_file(self.terminology_path, self._load_terminology, verbose=verbose, message='Loading terminology...')
+        if self.text_processor.config.use_terminology_index:
+            index = open_index(self.terminology_path, self.text_processor)
+            if index is None:
+                if verbose:
+                    print(f'Building terminology index {index_path(self.terminology_path)}')
+                self._load_terminology_file(frozenset(TerminologyMap), verbose=verbose)
+                self.build_index()
+                index = open_index(self.terminology_path, self.text_processor)
+            for attribute in _MAPS:
+                setattr(self, attribute, index.maps[attribute])
+            self.token_index = index.token_index
+            self.frozen = True
+            self._set_reverse_maps()
+        else:
+            self._load_terminology_file(self.required_maps, verbose=verbose)
+            self._set_reverse_maps()
+            if self.text_processor.config.compact_terminology:
+                self.compact()
+
+    def build_index(self, path: Optional[str] = None) -> str:
+        """Write the loaded maps to the index file.
+
+        Args:
+            path (:obj:`str`, optional):
+                Path to the index. Defaults to the terminology path with the index extension.
 
-    def _load_terminology(self, line: str):
+        Returns:
+            Path to the written index.
+        """
+        path = path or index_path(self.terminology_path)
+        write_index(path, {attribute: getattr(self, attribute) for attribute in _MAPS}, self.token_index,
+                    source_hash(self.terminology_path), processing_fingerprint(self.text_processor))
+        return path
+
+    def _load_terminology_file(self, maps: FrozenSet[TerminologyMap], *, verbose: bool = False):
+        stem_cache = self.text_processor.stem_cache
+        stem_cache_path = self.terminology_path + STEM_CACHE_EXTENSION
+        persist_stem_cache = self.text_processor.config.persist_stem_cache and stem_cache.max_size > 0
+        if persist_stem_cache:
+            stem_cache.load(stem_cache_path, verbose=verbose)
+        misses = stem_cache.misses
+        if TerminologyMap.TOKEN_TO_NAME in maps:
+            # CUIs of the names in the token index
+            maps |= {TerminologyMap.NAME_TO_CUI}
+        process_file(self.terminology_path, partial(self._load_terminology, maps=maps), verbose=verbose,
+                     message='Loading terminology...')
+        if TerminologyMap.TOKEN_TO_NAME in maps:
+            self.token_index = TokenIndex(self.token_to_name_map, self.name_to_cui_map)
+        if persist_stem_cache and stem_cache.misses > misses:
+            stem_cache.save(stem_cache_path)
+        if verbose:
+            print(f'Stem cache: {len(stem_cache)} stems, hit rate {stem_cache.hit_rate:.1%}')
+
+    def freeze(self):
+        """Make terminology maps read-only.
+
+        Maps are replaced with read-only views of dictionaries with frozensets, so any attempt to change them raises an error.
+        """
+        if self.frozen:
+            return
+        for attribute in _MAPS:
+            setattr(self, attribute, MappingProxyType({key: frozenset(value) for key, value in getattr(self, attribute).items()}))
+        self.frozen = True
+        self._set_reverse_maps()
+
+    def compact(self):
+        """Replace terminology maps with compact read-only maps.
+
+        All of the names, stems, tokens and CUIs are interned in one :class:`StringPool` and the sets are replaced with arrays of
+        their ids (see :class:`CompactSetMap`). Reverse maps aren't stored, they are built from the forward maps on the first
+        access. Compacted terminology is frozen.
+        """
+        if self.frozen:
+            return
+        pool = StringPool()
+        for attribute in _MAPS:
+            for key, values in getattr(self, attribute).items():
+                pool.intern(key)
+                for value in values:
+                    pool.intern(value)
+        for attribute in _MAPS:
+            setattr(self, attribute, CompactSetMap(pool, getattr(self, attribute)))
+        self.frozen = True
+        self._set_reverse_maps()
+
+    def _set_reverse_maps(self):
+        for attribute, forward_attribute in _REVERSE_MAPS.items():
+            forward_map = getattr(self, forward_attribute)
+            factory = forward_map.inverted if isinstance(forward_map, CompactSetMap) else partial(_invert, forward_map, self.frozen)
+            setattr(self, attribute, LazyMap(factory))
+
+    def _load_terminology(self, line: str, maps: FrozenSet[TerminologyMap]):
         cui, aliases_str = line.split('||')  # type: str, str
         aliases = aliases_str.lower().split('|')
         for alias in aliases:
-            self._put_to_maps(cui, alias)
+            self._put_to_maps(cui, alias, maps)
             cleaned_alias = alias.replace(',', '')
             if cleaned_alias != alias:
-                self._put_to_maps(cui, alias.replace(',', ''))
+                self._put_to_maps(cui, alias.replace(',', ''), maps)
 
-    def _put_to_maps(self, cui: str, alias: str):
-        self.name_to_cui_map[alias].add(cui)
-        self.cui_to_name_map[cui].add(alias)
+    def _put_to_maps(self, cui: str, alias: str, maps: FrozenSet[TerminologyMap]):
+        if TerminologyMap.NAME_TO_CUI in maps:
+            self.name_to_cui_map[alias].add(cui)
         tokens = alias.split()
-        for token in tokens:
-            if token not in self.text_processor.stopwords:
-                self.token_to_name_map[token].add(alias)
+        if TerminologyMap.TOKEN_TO_NAME in maps:
+            for token in tokens:
+                if token not in self.text_processor.stopwords:
+                    self.token_to_name_map[token].add(alias)
 
-        stemmed_concept_name = self.text_processor.get_stemmed_phrase_from_tokens(tokens)
-        self.stemmed_name_to_cui_map[stemmed_concept_name].add(cui)
-        self.cui_to_stemmed_name_map[cui].add(stemmed_concept_name)
+        if TerminologyMap.STEMMED_NAME_TO_CUI in maps:
+            stemmed_concept_name = self.text_processor.get_stemmed_phrase_from_tokens(tokens)
+            self.stemmed_name_to_cui_map[stemmed_concept_name].add(cui)
 
-        if len(tokens) == 3:
+        if len(tokens) == 3 and TerminologyMap.SIMPLE_NAME_TO_CUI in maps:
             new_phrase = f'{tokens[0]} {tokens[2]}'
             self.simple_name_to_cui_map[new_phrase].add(cui)
             new_phrase = f'{tokens[1]} {tokens[2]}'
             self.simple_name_to_cui_map[new_phrase].add(cui)
 
-    def store_normalized_entity(self, entity: SieveBasedEntity):
+    def store_normalized_entity(self, entity: SieveBasedEntity, context: NormalizationContext):
         """Store already normalized entity to have it in cache.
 
         Args:
             entity (SieveBasedEntity):
                 Entity to save in normalized maps.
+            context (NormalizationContext):
+                Context of the paper to save the entity in.
         """
         if entity.normalizing_sieve_level == 2 and entity.long_form is None:
             return
@@ -84,11 +223,5 @@ class Terminology:
         stemmed_normalized_key = self.text_processor.get_stemmed_phrase(entity.long_form) if entity.normalizing_sieve_level == 2 \
             else entity.stemmed_name
 
-        self.normalized_name_to_cui_map[normalized_key] = {entity.id}
-        self.stemmed_normalized_name_to_cui_map[stemmed_normalized_key] = {entity.id}
-
-    def clear_normalized_entities(self):
-        """Clear normalized entities after processing the article, as they may be multiple meaning abbreviations.
-        """
-        self.normalized_name_to_cui_map.clear()
-        self.stemmed_normalized_name_to_cui_map.clear()
+        context.normalized_name_to_cui_map[normalized_key] = {entity.id}
+        context.stemmed_normalized_name_to_cui_map[stemmed_normalized_key] = {entity.id}
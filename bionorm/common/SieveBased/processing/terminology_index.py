@@ -0,0 +1,380 @@
+import hashlib
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from os.path import exists
+from typing import Dict, List, Optional, Iterator, Mapping, Sequence, Iterable, FrozenSet, Tuple
+
+from bionorm.common.SieveBased.processing.token_index import TokenIndex
+from bionorm.common.SieveBased.util import TextProcessor
+from bionorm.common.util import resolve_path
+
+INDEX_EXTENSION = '.index'
+INDEX_VERSION = 2
+
+_MAGIC = b'SBTERMI\0'
+# magic, version, byte order, sha256 of terminology file, sha256 of text processing fingerprint, number of sections
+_HEADER = struct.Struct('<8sII32s32sI')
+# name, item format, offset, number of items
+_SECTION = struct.Struct('<32s2sQQ')
+_ALIGNMENT = 8
+_BYTE_ORDERS = {'little': 0, 'big': 1}
+_EMPTY_SLOT = -1
+
+
+def index_path(terminology_path: str) -> str:
+    """Path of the index built from the terminology file.
+
+    Args:
+        terminology_path (str):
+            Path to the terminology file.
+
+    Returns:
+        Path to the index next to the terminology file.
+    """
+    return terminology_path + INDEX_EXTENSION
+
+
+def source_hash(terminology_path: str) -> bytes:
+    """SHA-256 of the terminology file (or its compressed version, see :func:`resolve_path`).
+    """
+    digest = hashlib.sha256()
+    with open(resolve_path(terminology_path), 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def processing_fingerprint(text_processor: TextProcessor) -> bytes:
+    """SHA-256 of the text processing options the terminology maps depend on: the stemmer and the stopwords.
+    """
+    digest = hashlib.sha256(f'{INDEX_VERSION}\n{text_processor.stem_cache.fingerprint}\n'.encode('utf-8'))
+    for stopword in sorted(text_processor.stopwords):
+        digest.update(f'{stopword}\n'.encode('utf-8'))
+    return digest.digest()
+
+
+def _string_hash(data: bytes) -> int:
+    return zlib.crc32(data)
+
+
+class _StringPool:
+    """Strings packed into one UTF-8 blob with offsets, decoded on access."""
+
+    def __init__(self, blob: memoryview, offsets: Sequence[int]):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __getitem__(self, string_id: int) -> str:
+        return str(self.blob[self.offsets[string_id]:self.offsets[string_id + 1]], 'utf-8')
+
+    def equals(self, string_id: int, data: bytes) -> bool:
+        start = self.offsets[string_id]
+        end = self.offsets[string_id + 1]
+        return end - start == len(data) and self.blob[start:end] == data
+
+
+class _HashTable:
+    """Open addressing hash table from string keys to their indices, stored in arrays of slots and key hashes."""
+
+    def __init__(self, slots: Sequence[int], hashes: Sequence[int], key_ids: Sequence[int], pool: _StringPool):
+        self._slots = slots
+        self._mask = len(slots) - 1
+        self._hashes = hashes
+        self._key_ids = key_ids
+        self._pool = pool
+
+    def find(self, key: str) -> int:
+        """Find the index of the key, -1 if it's missing.
+        """
+        data = key.encode('utf-8')
+        key_hash = _string_hash(data)
+        slots = self._slots
+        slot = key_hash & self._mask
+        while True:
+            index = slots[slot]
+            if index == _EMPTY_SLOT or (self._hashes[index] == key_hash and self._pool.equals(self._key_ids[index], data)):
+                return index
+            slot = (slot + 1) & self._mask
+
+
+class _StringList(Sequence[str]):
+    """Read-only list of strings of the pool."""
+
+    def __init__(self, string_ids: Sequence[int], pool: _StringPool):
+        self._string_ids = string_ids
+        self._pool = pool
+
+    def __len__(self) -> int:
+        return len(self._string_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._pool[string_id] for string_id in self._string_ids[index]]
+        return self._pool[self._string_ids[index]]
+
+
+class _StringIdMap(Mapping[str, int]):
+    """Read-only map from strings to their indices."""
+
+    def __init__(self, table: _HashTable, keys: _StringList):
+        self._table = table
+        self._keys = keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __contains__(self, key) -> bool:
+        return self._table.find(key) != -1
+
+    def __getitem__(self, key: str) -> int:
+        index = self._table.find(key)
+        if index == -1:
+            raise KeyError(key)
+        return index
+
+    def get(self, key: str, default=None):
+        index = self._table.find(key)
+        return default if index == -1 else index
+
+
+class _Postings(Sequence[Sequence[int]]):
+    """Read-only lists of ids stored in one array with offsets (CSR layout)."""
+
+    def __init__(self, offsets: Sequence[int], values: memoryview):
+        self._offsets = offsets
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> Sequence[int]:
+        return self._values[self._offsets[index]:self._offsets[index + 1]]
+
+
+class IndexedSetMap(Mapping[str, FrozenSet[str]]):
+    """Read-only map from strings to sets of strings stored in the terminology index.
+
+    Keys are found with a hash table over the string pool, values are decoded on the first access and kept.
+    """
+
+    def __init__(self, table: _HashTable, keys: _StringList, values: _Postings, pool: _StringPool):
+        self._find = table.find
+        self._keys = keys
+        self._values = values
+        self._pool = pool
+        self._decoded: Dict[str, FrozenSet[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __contains__(self, key) -> bool:
+        return key in self._decoded or self._find(key) != -1
+
+    def __getitem__(self, key: str) -> FrozenSet[str]:
+        values = self._decoded.get(key)
+        if values is None:
+            index = self._find(key)
+            if index == -1:
+                raise KeyError(key)
+            values = self._decoded[key] = frozenset(self._pool[value] for value in self._values[index])
+        return values
+
+
+class TerminologyIndex:
+    """Terminology maps and token index opened from the binary index file with :func:`mmap`.
+
+    The file holds a pool of all of the strings and, for every map, its keys with a hash table and the values in CSR
+    layout, so opening it doesn't depend on the size of terminology. The header holds the hash of the terminology file
+    and of the text processing options, the index is stale if any of them changed.
+
+    Attributes:
+        maps (Dict[str, IndexedSetMap]):
+            Terminology maps by their attribute names.
+        token_index (TokenIndex):
+            Token index of the terminology.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str):
+                Path to the index file written by :func:`write_index`.
+
+        Raises:
+            ValueError: If the file isn't an index or it was saved in an incompatible format.
+        """
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, version, byte_order, self.source_hash, self.fingerprint, section_count = _HEADER.unpack_from(view)
+        if magic != _MAGIC:
+            raise ValueError(f'{path} is not a terminology index')
+        if version != INDEX_VERSION:
+            raise ValueError(f'{path} has index version {version}, but {INDEX_VERSION} is expected')
+        if byte_order != _BYTE_ORDERS[sys.byteorder]:
+            raise ValueError(f'{path} was saved on the machine with different byte order')
+
+        sections: Dict[str, memoryview] = {}
+        for i in range(section_count):
+            name, fmt, offset, size = _SECTION.unpack_from(view, _HEADER.size + i * _SECTION.size)
+            fmt = fmt.rstrip(b'\0').decode('ascii')
+            sections[name.rstrip(b'\0').decode('ascii')] = view[offset:offset + size * struct.calcsize(fmt)].cast(fmt)
+
+        pool = _StringPool(sections['strings.blob'], sections['strings.offsets'])
+        self.maps: Dict[str, IndexedSetMap] = {}
+        for name in _map_names(sections):
+            self.maps[name] = IndexedSetMap(_hash_table(sections, name, pool), _StringList(sections[f'{name}.keys'], pool),
+                                            _Postings(sections[f'{name}.offsets'], sections[f'{name}.values']), pool)
+
+        self.token_index = TokenIndex.from_arrays(
+            token_ids=_StringIdMap(_hash_table(sections, 'token_index', pool), _StringList(sections['token_index.keys'], pool)),
+            postings=_Postings(sections['token_index.offsets'], sections['token_index.postings']),
+            names=_StringList(sections['token_index.names'], pool),
+            name_lengths=sections['token_index.name_lengths'],
+            name_cuis=sections['token_index.name_cuis'],
+            cuis=_StringList(sections['token_index.cuis'], pool),
+        )
+
+    def is_fresh(self, terminology_path: str, text_processor: TextProcessor) -> bool:
+        """Check whether the index was built from the same terminology file with the same text processing options.
+        """
+        return self.fingerprint == processing_fingerprint(text_processor) and self.source_hash == source_hash(terminology_path)
+
+
+def _hash_table(sections: Mapping[str, memoryview], name: str, pool: _StringPool) -> _HashTable:
+    return _HashTable(sections[f'{name}.slots'], sections[f'{name}.hashes'], sections[f'{name}.keys'], pool)
+
+
+def _map_names(sections: Mapping[str, memoryview]) -> List[str]:
+    return [name[:-len('.keys')] for name in sections if name.endswith('.keys') and not name.startswith('token_index.')]
+
+
+def open_index(terminology_path: str, text_processor: TextProcessor) -> Optional[TerminologyIndex]:
+    """Open the index of the terminology if it exists and isn't stale.
+
+    Args:
+        terminology_path (str):
+            Path to the terminology file.
+        text_processor (TextProcessor):
+            Loaded text processor the terminology is processed with.
+
+    Returns:
+        Opened index or None if it's missing, stale or incompatible.
+    """
+    path = index_path(terminology_path)
+    if not exists(path):
+        return None
+    try:
+        index = TerminologyIndex(path)
+    except ValueError:
+        return None
+    return index if index.is_fresh(terminology_path, text_processor) else None
+
+
+class _IndexWriter:
+    """Collects the sections of the index and interns the strings."""
+
+    def __init__(self):
+        self.sections: List[Tuple[str, str, bytes]] = []
+        self.string_ids: Dict[str, int] = {}
+        self.blob = bytearray()
+        self.offsets = array('q', [0])
+
+    def intern(self, string: str) -> int:
+        string_id = self.string_ids.get(string)
+        if string_id is None:
+            string_id = self.string_ids[string] = len(self.string_ids)
+            self.blob += string.encode('utf-8')
+            self.offsets.append(len(self.blob))
+        return string_id
+
+    def add(self, name: str, data: array):
+        self.sections.append((name, data.typecode, data.tobytes()))
+
+    def add_keys(self, name: str, keys: Iterable[str]):
+        key_ids = array('i', (self.intern(key) for key in keys))
+        hashes = array('I', (_string_hash(self.blob[self.offsets[key_id]:self.offsets[key_id + 1]]) for key_id in key_ids))
+        slots = array('i', [_EMPTY_SLOT]) * _table_size(len(key_ids))
+        mask = len(slots) - 1
+        for index, key_hash in enumerate(hashes):
+            slot = key_hash & mask
+            while slots[slot] != _EMPTY_SLOT:
+                slot = (slot + 1) & mask
+            slots[slot] = index
+        self.add(f'{name}.keys', key_ids)
+        self.add(f'{name}.hashes', hashes)
+        self.add(f'{name}.slots', slots)
+
+    def add_lists(self, name: str, lists: Iterable[Iterable[int]], values_name: str):
+        offsets = array('q', [0])
+        values = array('i')
+        for values_list in lists:
+            values.extend(values_list)
+            offsets.append(len(values))
+        self.add(f'{name}.offsets', offsets)
+        self.add(f'{name}.{values_name}', values)
+
+    def write(self, path: str, source: bytes, fingerprint: bytes):
+        self.add('strings.offsets', self.offsets)
+        self.sections.append(('strings.blob', 'B', bytes(self.blob)))
+        offset = _HEADER.size + _SECTION.size * len(self.sections)
+        offset += -offset % _ALIGNMENT
+        table = []
+        for name, fmt, data in self.sections:
+            table.append(_SECTION.pack(name.encode('ascii'), fmt.encode('ascii'), offset, len(data) // struct.calcsize(fmt)))
+            offset += len(data) + (-len(data) % _ALIGNMENT)
+
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, INDEX_VERSION, _BYTE_ORDERS[sys.byteorder], source, fingerprint, len(self.sections)))
+            for entry in table:
+                f.write(entry)
+            f.write(bytes(-f.tell() % _ALIGNMENT))
+            for _, _, data in self.sections:
+                f.write(data)
+                f.write(bytes(-len(data) % _ALIGNMENT))
+
+
+def _table_size(count: int) -> int:
+    size = 1
+    while size < 2 * count:
+        size <<= 1
+    return size
+
+
+def write_index(path: str, maps: Mapping[str, Mapping[str, Iterable[str]]], token_index: TokenIndex, source: bytes,
+                fingerprint: bytes):
+    """Write the terminology maps and token index to the index file.
+
+    Args:
+        path (str):
+            Path to the index file.
+        maps (Mapping[str, Mapping[str, Iterable[str]]]):
+            Terminology maps by their attribute names.
+        token_index (TokenIndex):
+            Token index of the terminology.
+        source (bytes):
+            SHA-256 of the terminology file, see :func:`source_hash`.
+        fingerprint (bytes):
+            SHA-256 of the text processing options, see :func:`processing_fingerprint`.
+    """
+    writer = _IndexWriter()
+    for name, names_map in maps.items():
+        writer.add_keys(name, names_map.keys())
+        writer.add_lists(name, ([writer.intern(value) for value in values] for values in names_map.values()), 'values')
+
+    writer.add_keys('token_index', (token for token, _ in sorted(token_index.token_ids.items(), key=lambda item: item[1])))
+    writer.add_lists('token_index', token_index.postings, 'postings')
+    writer.add('token_index.names', array('i', (writer.intern(name) for name in token_index.names)))
+    writer.add('token_index.name_lengths', array('i', token_index.name_lengths))
+    writer.add('token_index.name_cuis', array('i', token_index.name_cuis))
+    writer.add('token_index.cuis', array('i', (writer.intern(cui) for cui in token_index.cuis)))
+    writer.write(path, source, fingerprint)
@@ -0,0 +1,37 @@
+from bionorm.common.SieveBased.processing import NormalizationContext, CachedSieveResult, SieveResultCache
+
+
+def _result(cui: str, probed_names=(), probed_stemmed_names=()) -> CachedSieveResult:
+    return CachedSieveResult(cui, 0, frozenset(probed_names), frozenset(probed_stemmed_names))
+
+
+def test_lru_eviction():
+    cache = SieveResultCache(2)
+    context = NormalizationContext()
+    cache.put(('a', None, 10), _result('D1'))
+    cache.put(('b', None, 10), _result('D2'))
+    assert cache.get(('a', None, 10), context).cui == 'D1'
+    cache.put(('c', None, 10), _result('D3'))
+
+    assert len(cache) == 2
+    assert cache.get(('b', None, 10), context) is None
+    assert cache.get(('a', None, 10), context).cui == 'D1'
+    assert cache.get(('c', None, 10), context).cui == 'D3'
+    assert (cache.hits, cache.misses, cache.conflicts) == (3, 1, 0)
+
+
+def test_conflicts_with_context():
+    cache = SieveResultCache(10)
+    cache.put(('src', 'renal crisis', 10), _result('D1', probed_names={'src', 'renal crisis'}))
+    cache.put(('cancers', None, 10), _result('D2', probed_stemmed_names={'cancer'}))
+
+    context = NormalizationContext()
+    context.normalized_name_to_cui_map['renal crisis'] = {'D3'}
+    context.stemmed_normalized_name_to_cui_map['cancer'] = {'D4'}
+    assert cache.get(('src', 'renal crisis', 10), context) is None
+    assert cache.get(('cancers', None, 10), context) is None
+    assert cache.get(('src', 'renal crisis', 10), NormalizationContext()).cui == 'D1'
+    assert (cache.hits, cache.misses, cache.conflicts) == (1, 0, 2)
+    assert cache.hit_rate == 1 / 3
+    # Lookups don't add names to the context
+    assert set(context.normalized_name_to_cui_map) == {'renal crisis'}
@@ -0,0 +1,71 @@
+import pytest
+
+from bionorm.common.models import DiseaseMention, Location
+from bionorm.common.SieveBased.config import SieveBasedConfig
+from bionorm.common.SieveBased.models import SieveBasedEntity, CandidateNames
+from bionorm.common.SieveBased.processing import Terminology, NormalizationContext
+from bionorm.common.SieveBased.processing.sieves import AffixationSieve, HyphenationSieve, PrepositionalTransformSieve, StemmingSieve
+from bionorm.common.SieveBased.util import TextProcessor
+
+_TERMINOLOGY = """D001||scleroderma renal crisis|renal crisis
+D002||breast cancer|cancer of breast, female
+D003||hypoglycemia|diabetic hypoglycemia"""
+
+
+@pytest.fixture
+def terminology(tmp_path) -> Terminology:
+    path = tmp_path / 'terminology.txt'
+    path.write_text(_TERMINOLOGY)
+    text_processor = TextProcessor(SieveBasedConfig())
+    text_processor.load_data()
+    terminology = Terminology(str(path), text_processor)
+    terminology.load_data()
+    return terminology
+
+
+def test_candidate_names():
+    candidates = CandidateNames()
+    assert candidates.add('b') and candidates.add('a') and not candidates.add('b')
+    candidates.update(['c', 'a'])
+    assert list(candidates) == ['b', 'a', 'c'] and 'c' in candidates and len(candidates) == 3
+
+
+def test_delta_lookup(terminology):
+    entity = SieveBasedEntity(DiseaseMention(Location(0, 0), 'renal crisis of lupus'), terminology.text_processor)
+    context = NormalizationContext()
+    assert PrepositionalTransformSieve(terminology).apply(entity, context) is None
+    candidates = entity.names_knowledge_base
+    assert candidates.looked_up == len(candidates)
+    expected = set(candidates) | {variant for name in candidates for variant in HyphenationSieve(terminology)._transform(name)}
+
+    assert HyphenationSieve(terminology).apply(entity, context) is None
+    assert set(candidates) == expected and candidates.looked_up == len(candidates)
+    assert candidates.added['Hyphenation Sieve'] == len(expected) - candidates.added['Prepositional Transform Sieve'] - 1
+
+
+def test_early_stop(terminology):
+    entity = SieveBasedEntity(DiseaseMention(Location(0, 0), 'diabetic hypoglycemic'), terminology.text_processor)
+    entity.names_knowledge_base.add(entity.text)
+    sieve = AffixationSieve(terminology)
+    assert sieve.apply(entity, NormalizationContext()) == 'D003'
+    candidates = entity.names_knowledge_base
+    assert candidates.names[-1] == 'diabetic hypoglycemia' and candidates.looked_up == len(candidates)
+    assert candidates.added[sieve.name] < len(set(sieve._transform(entity.text)))
+
+
+@pytest.mark.parametrize('sieve_class, names', [
+    (HyphenationSieve, ['heart-arrest', 'arrest-of heart']),
+    (StemmingSieve, ['heart arrested', 'arrested of heart']),
+])
+def test_tie_break(tmp_path, sieve_class, names):
+    # Both names have a variant in the terminology, the variant of the name added first wins regardless of PYTHONHASHSEED
+    path = tmp_path / 'terminology.txt'
+    path.write_text('D011||arrest of heart\nD006||heart arrest')
+    text_processor = TextProcessor(SieveBasedConfig())
+    text_processor.load_data()
+    terminology = Terminology(str(path), text_processor)
+    terminology.load_data()
+    for ordered_names, cui in [(names, 'D006'), (names[::-1], 'D011')]:
+        entity = SieveBasedEntity(DiseaseMention(Location(0, 0), ordered_names[0]), text_processor)
+        entity.names_knowledge_base.update(ordered_names)
+        assert sieve_class(terminology).apply(entity, NormalizationContext()) == cui
@@ -0,0 +1,126 @@
+import pytest
+
+from bionorm.common.models import DiseaseMention, Location
+from bionorm.common.SieveBased.config import SieveBasedConfig
+from bionorm.common.SieveBased.models import SieveBasedEntity
+from bionorm.common.SieveBased.processing import Terminology, NormalizationContext, TerminologyMap
+from bionorm.common.SieveBased.processing.terminology import STEM_CACHE_EXTENSION
+from bionorm.common.SieveBased.processing.terminology_index import INDEX_EXTENSION
+from bionorm.common.SieveBased.util import TextProcessor
+
+_TERMINOLOGY = """D001||scleroderma renal crisis|renal crisis
+D002||breast cancer|cancer of breast, female"""
+
+
+@pytest.fixture
+def terminology(tmp_path) -> Terminology:
+    path = tmp_path / 'terminology.txt'
+    path.write_text(_TERMINOLOGY)
+    text_processor = TextProcessor(SieveBasedConfig())
+    text_processor.load_data()
+    terminology = Terminology(str(path), text_processor)
+    terminology.load_data()
+    return terminology
+
+
+def test_freeze(terminology):
+    name_to_cui_map = {name: set(cuis) for name, cuis in terminology.name_to_cui_map.items()}
+    token_to_name_map = {token: set(names) for token, names in terminology.token_to_name_map.items()}
+    terminology.freeze()
+    assert terminology.frozen
+    assert terminology.name_to_cui_map == name_to_cui_map
+    assert terminology.token_to_name_map == token_to_name_map
+
+    with pytest.raises(TypeError):
+        terminology.name_to_cui_map['kidney cancer'] = {'D003'}
+    with pytest.raises(AttributeError):
+        terminology.token_to_name_map['cancer'].add('kidney cancer')
+    with pytest.raises(AttributeError):
+        terminology.cui_to_name_map['D001'].clear()
+
+
+def test_store_normalized_entity(terminology):
+    terminology.freeze()
+    entity = SieveBasedEntity(DiseaseMention(Location(0, 3), 'SRC'), terminology.text_processor)
+    entity.id = 'D001'
+    context = NormalizationContext()
+    terminology.store_normalized_entity(entity, context)
+    assert context.normalized_name_to_cui_map == {'src': {'D001'}}
+    assert context.stemmed_normalized_name_to_cui_map == {'src': {'D001'}}
+
+
+def test_persisted_stem_cache(tmp_path):
+    path = tmp_path / 'terminology.txt'
+    path.write_text(_TERMINOLOGY)
+    config = SieveBasedConfig(terminology_path=str(path), persist_stem_cache=True)
+    terminologies = []
+    for _ in range(2):
+        text_processor = TextProcessor(config)
+        text_processor.load_data()
+        terminology = Terminology(str(path), text_processor)
+        terminology.load_data()
+        terminologies.append(terminology)
+
+    assert (tmp_path / ('terminology.txt' + STEM_CACHE_EXTENSION)).exists()
+    assert terminologies[1].text_processor.stem_cache.misses == 0
+    assert terminologies[1].stemmed_name_to_cui_map == terminologies[0].stemmed_name_to_cui_map
+
+
+def _token_names(token_index, token):
+    return [token_index.names[name_id] for name_id in token_index.postings[token_index.token_ids[token]]]
+
+
+def test_terminology_index(tmp_path, terminology):
+    path = tmp_path / 'terminology.txt'
+    config = SieveBasedConfig(terminology_path=str(path), use_terminology_index=True)
+    text_processor = TextProcessor(config)
+    text_processor.load_data()
+    indexed = Terminology(str(path), text_processor)
+    indexed.load_data()
+
+    assert (tmp_path / ('terminology.txt' + INDEX_EXTENSION)).exists()
+    assert indexed.frozen
+    for attribute in ['name_to_cui_map', 'cui_to_name_map', 'stemmed_name_to_cui_map', 'token_to_name_map']:
+        assert {key: set(values) for key, values in getattr(indexed, attribute).items()} == getattr(terminology, attribute)
+    assert 'renal failure' not in indexed.name_to_cui_map
+    assert _token_names(indexed.token_index, 'renal') == _token_names(terminology.token_index, 'renal')
+
+    path.write_text(_TERMINOLOGY + '\nD003||renal failure')
+    rebuilt = Terminology(str(path), text_processor)
+    rebuilt.load_data()
+    assert rebuilt.name_to_cui_map['renal failure'] == {'D003'}
+
+
+def test_compact(terminology):
+    maps = {attribute: {key: set(values) for key, values in getattr(terminology, attribute).items()}
+            for attribute in ['name_to_cui_map', 'cui_to_name_map', 'stemmed_name_to_cui_map', 'cui_to_stemmed_name_map',
+                              'token_to_name_map']}
+    terminology.compact()
+    assert terminology.frozen
+    assert not terminology.cui_to_name_map.built
+    for attribute, expected in maps.items():
+        assert {key: set(values) for key, values in getattr(terminology, attribute).items()} == expected
+    assert terminology.cui_to_name_map.built
+    assert 'renal failure' not in terminology.name_to_cui_map
+    assert 'D001' not in terminology.name_to_cui_map
+    with pytest.raises(KeyError):
+        terminology.name_to_cui_map['D001']
+
+
+def test_required_maps(tmp_path):
+    path = tmp_path / 'terminology.txt'
+    path.write_text(_TERMINOLOGY)
+    text_processor = TextProcessor(SieveBasedConfig())
+    text_processor.load_data()
+    terminology = Terminology(str(path), text_processor, required_maps=[TerminologyMap.NAME_TO_CUI])
+    terminology.load_data()
+
+    assert terminology.name_to_cui_map['renal crisis'] == {'D001'}
+    assert not terminology.stemmed_name_to_cui_map
+    assert not terminology.token_to_name_map
+    assert terminology.token_index is None
+    assert text_processor.stem_cache.misses == 0
+
+    assert not terminology.cui_to_name_map.built
+    assert terminology.cui_to_name_map['D001'] == {'scleroderma renal crisis', 'renal crisis'}
+    assert not terminology.cui_to_stemmed_name_map
@@ -0,0 +1,57 @@
+from copy import deepcopy
+
+import pytest
+
+from bionorm.common.SieveBased.config import SieveBasedConfig
+from bionorm.common.SieveBased.processing import Terminology
+from bionorm.common.SieveBased.processing.sieves import PartialMatchNCBISieve
+from bionorm.common.SieveBased.util import TextProcessor
+
+_TERMINOLOGY = """D001||breast cancer|cancer of breast
+D002||lung cancer
+C003||renal cell carcinoma|kidney cancer
+D004||acute renal failure"""
+
+
+@pytest.fixture(scope='module')
+def terminology(tmp_path_factory) -> Terminology:
+    path = tmp_path_factory.mktemp('terminology') / 'terminology.txt'
+    path.write_text(_TERMINOLOGY)
+    text_processor = TextProcessor(SieveBasedConfig())
+    text_processor.load_data()
+    terminology = Terminology(str(path), text_processor)
+    terminology.load_data()
+    return terminology
+
+
+@pytest.mark.parametrize('phrase, cui', [
+    ('breast tumor', 'D001'),
+    # Stopwords aren't counted, the most matching tokens win
+    ('cancer of the lung', 'D002'),
+    ('renal failure', 'D004'),
+    # Tokens are counted once
+    ('lung lung', 'D002'),
+    # The shortest name wins a tie, then D- over C-
+    ('kidney failure', 'C003'),
+    ('renal', 'D004'),
+    ('the of', None),
+    ('unknown words', None),
+    ('', None),
+])
+def test_partial_match(terminology, phrase, cui):
+    token_to_name_map = deepcopy(terminology.token_to_name_map)
+    assert PartialMatchNCBISieve(terminology)._partial_match(phrase, phrase.split()) == cui
+    assert terminology.token_to_name_map == token_to_name_map
+
+
+def test_index(terminology):
+    index = terminology.token_index
+    assert set(index.token_ids) == {'breast', 'cancer', 'lung', 'renal', 'cell', 'carcinoma', 'kidney', 'acute', 'failure'}
+    for token, token_id in index.token_ids.items():
+        assert [index.names[name_id] for name_id in index.postings[token_id]] == list(terminology.token_to_name_map[token])
+    assert {index.names[name_id]: index.cuis[index.name_cuis[name_id]] for name_id in range(len(index.names))} == {
+        'breast cancer': 'D001', 'cancer of breast': 'D001', 'lung cancer': 'D002', 'renal cell carcinoma': 'C003',
+        'kidney cancer': 'C003', 'acute renal failure': 'D004'}
+    counts = index.count_matching_tokens(['cancer', 'of', 'breast', 'cancer'], terminology.text_processor.stopwords)
+    assert {index.names[name_id]: count for name_id, count in counts.items()} == {
+        'breast cancer': 2, 'cancer of breast': 2, 'lung cancer': 1, 'kidney cancer': 1}
@@ -0,0 +1,105 @@
+from array import array
+from collections import Counter
+from typing import Dict, Set, List, Iterable, Mapping, Sequence
+
+
+class TokenIndex:
+    """Inverted index from tokens to the terminology names containing them.
+
+    Tokens and names are mapped to integer ids. Every token has a posting list of name ids, every name has the count of its
+    tokens and the id of its CUI, so partial matching doesn't work with strings.
+
+    Notes:
+        Posting lists keep the iteration order of the sets in token_to_name_map, so the candidates are visited in the same
+        order as by the iteration over the sets, which matters for the ties between CUIs.
+
+    Attributes:
+        token_ids (Dict[str, int]):
+            Map from token to its id.
+        postings (List[array]):
+            Name ids for every token id.
+        names (List[str]):
+            Names by their ids.
+        name_lengths (array):
+            Count of tokens (including stopwords) in every name.
+        name_cuis (array):
+            Id of CUI of every name.
+        cuis (List[str]):
+            CUIs by their ids.
+    """
+
+    def __init__(self, token_to_name_map: Mapping[str, Iterable[str]], name_to_cui_map: Mapping[str, Iterable[str]]):
+        """
+        Args:
+            token_to_name_map (Mapping[str, Iterable[str]]):
+                Map from token to names containing it.
+            name_to_cui_map (Mapping[str, Iterable[str]]):
+                Map from name to its CUIs. The first of the CUIs is used for the name.
+        """
+        self.token_ids: Dict[str, int] = {}
+        self.postings: List[array] = []
+        self.names: List[str] = []
+        self.name_lengths = array('i')
+        self.name_cuis = array('i')
+        self.cuis: List[str] = []
+
+        name_ids: Dict[str, int] = {}
+        cui_ids: Dict[str, int] = {}
+        for token, names in token_to_name_map.items():
+            posting = array('i')
+            for name in names:
+                name_id = name_ids.get(name)
+                if name_id is None:
+                    name_id = name_ids[name] = len(self.names)
+                    self.names.append(name)
+                    self.name_lengths.append(len(name.split()))
+                    cui = next(iter(name_to_cui_map[name]))
+                    cui_id = cui_ids.get(cui)
+                    if cui_id is None:
+                        cui_id = cui_ids[cui] = len(self.cuis)
+                        self.cuis.append(cui)
+                    self.name_cuis.append(cui_id)
+                posting.append(name_id)
+            self.token_ids[token] = len(self.postings)
+            self.postings.append(posting)
+
+    @classmethod
+    def from_arrays(cls, *, token_ids: Mapping[str, int], postings: Sequence[Sequence[int]], names: Sequence[str],
+                    name_lengths: Sequence[int], name_cuis: Sequence[int], cuis: Sequence[str]) -> 'TokenIndex':
+        """Create the index from the prebuilt arrays, e.g. the ones stored in the terminology index file.
+
+        Returns:
+            Token index with the given attributes.
+        """
+        index = cls.__new__(cls)
+        index.token_ids = token_ids
+        index.postings = postings
+        index.names = names
+        index.name_lengths = name_lengths
+        index.name_cuis = name_cuis
+        index.cuis = cuis
+        return index
+
+    def count_matching_tokens(self, tokens: Iterable[str], stopwords: Set[str]) -> Dict[int, int]:
+        """Count common tokens of the phrase with every name sharing at least one token with it.
+
+        Args:
+            tokens (Iterable[str]):
+                Tokens of the phrase.
+            stopwords (Set[str]):
+                Tokens to ignore.
+
+        Returns:
+            Map from name id to the count of unique common tokens excluding stopwords.
+            Names are ordered by the first token of phrase they share and then by their order in the posting list.
+        """
+        counts: Dict[int, int] = Counter()
+        seen: Set[str] = set()
+        for token in tokens:
+            if token in seen or token in stopwords:
+                continue
+            seen.add(token)
+            token_id = self.token_ids.get(token)
+            if token_id is not None:
+                counts.update(self.postings[token_id])
+        return counts
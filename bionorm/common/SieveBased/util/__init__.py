@@ -1 +1,3 @@
+from .affix_index import PrefixIndex, SuffixIndex, SubstringIndex
+from .stem_cache import StemCache
 from .text_processor import TextProcessor
@@ -0,0 +1,158 @@
+import re
+from typing import Dict, List, Optional, Iterable, Iterator
+
+# Rank of the nodes not ending any of the keys
+_NO_KEY = -1
+
+
+class _Trie:
+    """Character trie of keys, nodes are indices in the lists.
+
+    Attributes:
+        children (List[Dict[str, int]]):
+            Map from character to child node for every node.
+        ranks (List[int]):
+            Index of the key ending in every node, _NO_KEY if none.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        self.children: List[Dict[str, int]] = [{}]
+        self.ranks: List[int] = [_NO_KEY]
+        for rank, key in enumerate(keys):
+            node = 0
+            for char in key:
+                child = self.children[node].get(char)
+                if child is None:
+                    child = len(self.children)
+                    self.children[node][char] = child
+                    self.children.append({})
+                    self.ranks.append(_NO_KEY)
+                node = child
+            if self.ranks[node] == _NO_KEY:
+                self.ranks[node] = rank
+
+    def find_path_rank(self, chars: Iterator[str]) -> int:
+        """Find the smallest rank of the keys, which are prefixes of the characters.
+
+        Args:
+            chars (Iterator[str]):
+                Characters to walk the trie with.
+
+        Returns:
+            Smallest rank or _NO_KEY if none of the keys match.
+        """
+        children = self.children
+        ranks = self.ranks
+        best = ranks[0]
+        node = 0
+        for char in chars:
+            node = children[node].get(char)
+            if node is None:
+                break
+            rank = ranks[node]
+            if rank != _NO_KEY and (best == _NO_KEY or rank < best):
+                best = rank
+        return best
+
+
+class PrefixIndex:
+    """Finds the first of the keys (in their order), which the string starts with.
+
+    Notes:
+        Equivalent to the first key in `keys` for which `string.startswith(key)` holds, but walks the string once.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        """
+        Args:
+            keys (Iterable[str]):
+                Prefixes in the order of priority.
+        """
+        self.keys = list(keys)
+        self._trie = _Trie(self.keys)
+
+    def find(self, string: str) -> Optional[str]:
+        rank = self._trie.find_path_rank(iter(string))
+        return None if rank == _NO_KEY else self.keys[rank]
+
+
+class SuffixIndex:
+    """Finds the first of the keys (in their order), which the string ends with.
+
+    Notes:
+        Equivalent to the first key in `keys` for which `string.endswith(key)` holds. Keys are stored in a trie in reverse,
+        which is walked from the end of the string.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        """
+        Args:
+            keys (Iterable[str]):
+                Suffixes in the order of priority.
+        """
+        self.keys = list(keys)
+        self._trie = _Trie(key[::-1] for key in self.keys)
+
+    def find(self, string: str) -> Optional[str]:
+        rank = self._trie.find_path_rank(reversed(string))
+        return None if rank == _NO_KEY else self.keys[rank]
+
+
+class SubstringIndex:
+    """Aho-Corasick automaton finding the first of the keys (in their order), which the string contains.
+
+    Notes:
+        Equivalent to the first key in `keys` for which `key in string` holds, but walks the string once.
+        Strings are checked by a regular expression of all keys first, so those without keys aren't walked in Python, and
+        the automaton starts at the leftmost occurrence.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        """
+        Args:
+            keys (Iterable[str]):
+                Substrings in the order of priority.
+        """
+        self.keys = list(keys)
+        self._pattern = re.compile('|'.join(re.escape(key) for key in self.keys)) if self.keys else None
+        trie = _Trie(self.keys)
+        self._children = trie.children
+        self._fail = [0] * len(trie.children)
+        # Smallest rank of the keys ending in the node, including the keys which are suffixes of its path
+        self._best = list(trie.ranks)
+        queue = list(self._children[0].values())
+        for node in queue:
+            for char, child in self._children[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._children[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._children[fail].get(char, 0)
+                queue.append(child)
+        # Transitions of the automaton with the failure links followed in advance, characters missing in the keys lead to root
+        self._transitions: List[Dict[str, int]] = [dict(self._children[0])]
+        self._transitions.extend({} for _ in queue)
+        for node in queue:
+            fail = self._fail[node]
+            fail_best = self._best[fail]
+            if fail_best != _NO_KEY and (self._best[node] == _NO_KEY or fail_best < self._best[node]):
+                self._best[node] = fail_best
+            transitions = dict(self._transitions[fail])
+            transitions.update(self._children[node])
+            self._transitions[node] = transitions
+
+    def find(self, string: str) -> Optional[str]:
+        match = self._pattern.search(string) if self._pattern is not None else None
+        if match is None:
+            return None
+        transitions = self._transitions
+        best_ranks = self._best
+        best = best_ranks[0]
+        node = 0
+        for char in string[match.start():]:
+            node = transitions[node].get(char, 0)
+            rank = best_ranks[node]
+            if rank != _NO_KEY and (best == _NO_KEY or rank < best):
+                best = rank
+                if best == 0:
+                    break
+        return None if best == _NO_KEY else self.keys[best]
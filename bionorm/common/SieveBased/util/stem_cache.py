@@ -0,0 +1,136 @@
+import os
+import threading
+from os.path import exists
+from typing import Dict
+
+from nltk import StemmerI
+
+from bionorm.common.util import iter_lines
+
+
+class StemCache:
+    """Bounded cache of stems of single tokens.
+
+    Stems of the terminology tokens are computed once while it's loaded, the mentions mostly consist of the same tokens.
+    When the cache is full, the oldest stems are evicted. The cache may be saved to a file and loaded on later startups,
+    the file is ignored if it was written for another stemmer.
+
+    Notes:
+        Lookups of cached stems don't take a lock, so the cache may be used from several threads. Hit and miss counts
+        are only approximate in that case.
+
+    Attributes:
+        stemmer (StemmerI):
+            Stemmer to compute the missing stems.
+        max_size (int):
+            Maximum number of cached stems, 0 disables caching.
+        hits (int):
+            Number of stems found in the cache.
+        misses (int):
+            Number of computed stems.
+    """
+
+    def __init__(self, stemmer: StemmerI, max_size: int):
+        self.stemmer = stemmer
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._stems: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._stems)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def fingerprint(self) -> str:
+        """Name of the stemmer class, the stems of which are cached.
+        """
+        return f'{type(self.stemmer).__module__}.{type(self.stemmer).__qualname__}'
+
+    def stem(self, token: str) -> str:
+        """Stem the token, falling back to the token itself if the stem is empty.
+
+        Args:
+            token (str):
+                Token to stem.
+
+        Returns:
+            Stem of the token.
+        """
+        stem = self._stems.get(token)
+        if stem is not None:
+            self.hits += 1
+            return stem
+        self.misses += 1
+        stem = self.stemmer.stem(token).strip()
+        if stem == '':
+            stem = token
+        if self.max_size > 0:
+            with self._lock:
+                if len(self._stems) >= self.max_size:
+                    del self._stems[next(iter(self._stems))]
+                self._stems[token] = stem
+        return stem
+
+    def save(self, path: str):
+        """Save the cached stems to a file.
+
+        The file is written under a temporary name and replaced at once, so a crash while saving or another process sharing
+        the file never leaves a partially written cache behind.
+
+        Args:
+            path (str):
+                Path to the file, the first line holds the fingerprint, the others are tab-separated tokens and stems.
+        """
+        with self._lock:
+            stems = list(self._stems.items())
+        temporary = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(temporary, 'w', encoding='utf-8') as f:
+                f.write(f'{self.fingerprint}\n')
+                for token, stem in stems:
+                    f.write(f'{token}\t{stem}\n')
+            os.replace(temporary, path)
+        finally:
+            if exists(temporary):
+                os.remove(temporary)
+
+    def load(self, path: str, *, verbose: bool = False) -> bool:
+        """Load the stems saved by save().
+
+        Args:
+            path (str):
+                Path to the file.
+            verbose (:obj:`bool`, defaults to :obj:`False`):
+                Whether to show progress.
+
+        Returns:
+            Whether the stems were loaded, False if the file doesn't exist, was written for another stemmer or is malformed.
+            Stems of a malformed file aren't loaded at all.
+        """
+        if not exists(path):
+            return False
+        lines = iter_lines(path, verbose=verbose, message='Loading stems...')
+        if next(lines, '').rstrip('\n') != self.fingerprint:
+            lines.close()
+            return False
+        stems: Dict[str, str] = {}
+        for line in lines:
+            if len(self._stems) + len(stems) >= self.max_size:
+                break
+            fields = line.rstrip('\n').split('\t')
+            # The last line of a truncated file has no line ending
+            if len(fields) != 2 or not line.endswith('\n'):
+                lines.close()
+                return False
+            token, stem = fields
+            stems[token] = stem
+        lines.close()
+        with self._lock:
+            self._stems.update(stems)
+        return True
@@ -0,0 +1,26 @@
+import random
+
+import pytest
+
+from bionorm.common.SieveBased.util import PrefixIndex, SuffixIndex, SubstringIndex
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_first_key_in_order(seed):
+    rng = random.Random(seed)
+    for _ in range(50):
+        keys = list(dict.fromkeys(''.join(rng.choice('abc') for _ in range(rng.randint(0, 4))) for _ in range(rng.randint(0, 12))))
+        prefix_index, suffix_index, substring_index = PrefixIndex(keys), SuffixIndex(keys), SubstringIndex(keys)
+        for _ in range(50):
+            string = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 10)))
+            assert prefix_index.find(string) == next((key for key in keys if string.startswith(key)), None)
+            assert suffix_index.find(string) == next((key for key in keys if string.endswith(key)), None)
+            assert substring_index.find(string) == next((key for key in keys if key in string), None)
+
+
+def test_priority():
+    assert SuffixIndex(['sion', 'ion']).find('compulsion') == 'sion'
+    assert SuffixIndex(['ion', 'sion']).find('compulsion') == 'ion'
+    assert PrefixIndex(['pre', 'three', 'th']).find('three-legged') == 'three'
+    assert SubstringIndex(['carcinoma', 'cancer']).find('slow-cancer-induced-carcinoma') == 'carcinoma'
+    assert SubstringIndex(['ganglioma', 'ganglioglioma']).find('ganglioglioma') == 'ganglioglioma'
@@ -0,0 +1,53 @@
+from nltk import PorterStemmer, LancasterStemmer
+
+from bionorm.common.SieveBased.util import StemCache
+
+_TOKENS = ['cancers', 'grazing', 'geese', 'cancers', 'diseases', 'grazing', 'cancers']
+
+
+def test_stem():
+    stemmer = PorterStemmer()
+    cache = StemCache(stemmer, 3)
+    assert [cache.stem(token) for token in _TOKENS] == [stemmer.stem(token) for token in _TOKENS]
+    assert (cache.hits, cache.misses) == (2, 5)
+    assert len(cache) == 3 and cache.hit_rate == 2 / 7
+
+
+def test_disabled():
+    cache = StemCache(PorterStemmer(), 0)
+    assert cache.stem('cancers') == 'cancer' and cache.stem('cancers') == 'cancer'
+    assert len(cache) == 0 and cache.misses == 2
+
+
+def test_save_load(tmp_path):
+    path = str(tmp_path / 'terminology.txt.stems')
+    cache = StemCache(PorterStemmer(), 100)
+    for token in _TOKENS:
+        cache.stem(token)
+    cache.save(path)
+
+    loaded = StemCache(PorterStemmer(), 100)
+    assert loaded.load(path)
+    assert [loaded.stem(token) for token in _TOKENS] == [cache.stem(token) for token in _TOKENS]
+    assert loaded.misses == 0
+
+    other_stemmer = StemCache(LancasterStemmer(), 100)
+    assert not other_stemmer.load(path) and len(other_stemmer) == 0
+    assert not loaded.load(str(tmp_path / 'missing.stems'))
+
+
+def test_malformed(tmp_path):
+    path = tmp_path / 'terminology.txt.stems'
+    cache = StemCache(PorterStemmer(), 100)
+    for token in _TOKENS:
+        cache.stem(token)
+    cache.save(str(path))
+    assert [file.name for file in tmp_path.iterdir()] == ['terminology.txt.stems']
+    saved = path.read_text(encoding='utf-8')
+
+    for content in [saved[:-3], saved + 'token\n', saved + 'token\tstem\textra\n']:
+        path.write_text(content, encoding='utf-8')
+        loaded = StemCache(PorterStemmer(), 100)
+        assert loaded.stem('cancers') == 'cancer'
+        assert not loaded.load(str(path))
+        assert len(loaded) == 1
@@ -6,6 +6,8 @@ from nltk import StemmerI
 from nltk.corpus import stopwords
 
 from bionorm.common.SieveBased.config import SieveBasedConfig
+from bionorm.common.SieveBased.util.affix_index import PrefixIndex, SuffixIndex, SubstringIndex
+from bionorm.common.SieveBased.util.stem_cache import StemCache
 from bionorm.common.util import process_file
 
 
@@ -15,6 +17,8 @@ class TextProcessor:
     Notes:
         After creation of text processor call load_data() to load all of the data.
         This is also done by load_data() of SieveBasedNormalizer.
+        Suffix, prefix and affix lookups use the indexes built by load_data(), call build_affix_indexes() after modifying
+        the maps.
     """
     def __init__(self, config: SieveBasedConfig):
         """
@@ -24,6 +28,7 @@ class TextProcessor:
         """
         self.config: SieveBasedConfig = config
         self.stemmer: StemmerI = config.stemmer_constructor()
+        self.stem_cache = StemCache(self.stemmer, config.stem_cache_size)
         self.stopwords: Set[str] = set()
         self.spell_check_map: Dict[str, str] = {}
         self.prepositions: List[str] = []
@@ -34,6 +39,7 @@ class TextProcessor:
         self.affix_map: Dict[str, str] = {}
         self.singular_synonyms: List[str] = []
         self.plural_synonyms: List[str] = []
+        self.build_affix_indexes()
 
     def load_data(self, *, verbose=False):
         """Loads data in processor maps.
@@ -57,6 +63,14 @@ class TextProcessor:
         process_file(self.config.singular_synonyms_path, self._load_singular_synonyms, verbose=verbose, message='Loading singular '
                                                                                                                 'synonyms...')
         process_file(self.config.plural_synonyms_path, self._load_plural_synonyms, verbose=verbose, message='Loading plural synonyms...')
+        self.build_affix_indexes()
+
+    def build_affix_indexes(self):
+        """Build the indexes of suffix, prefix and affix maps, which find the first matching key in a single pass over the string.
+        """
+        self._suffix_index = SuffixIndex(self.suffix_map)
+        self._prefix_index = PrefixIndex(self.prefix_map)
+        self._affix_index = SubstringIndex(self.affix_map)
 
     def _load_stopwords(self, line: str):
         self.stopwords.add(line)
@@ -128,10 +142,7 @@ class TextProcessor:
             if token in self.stopwords:
                 stemmed.append(token)
             else:
-                stemmed_token: str = self.stemmer.stem(token).strip()
-                if stemmed_token == '':
-                    stemmed_token = token
-                stemmed.append(stemmed_token)
+                stemmed.append(self.stem_cache.stem(token))
         return ' '.join(stemmed)
 
     def correct_spelling(self, string: str) -> str:
@@ -209,12 +220,9 @@ class TextProcessor:
                 String to find suffix in.
 
         Returns:
-            Suffix of the string or None if it isn't found.
+            The first suffix of suffix map the string ends with or None if it isn't found.
         """
-        for suffix in self.suffix_map.keys():
-            if string.endswith(suffix):
-                return suffix
-        return None
+        return self._suffix_index.find(string)
 
     def get_prefix(self, string: str) -> Optional[str]:
         """Get prefix of the string.
@@ -224,12 +232,9 @@ class TextProcessor:
                 String to find prefix in.
 
         Returns:
-            Prefix of the string or None if it isn't found.
+            The first prefix of prefix map the string starts with or None if it isn't found.
         """
-        for prefix in self.prefix_map.keys():
-            if string.startswith(prefix):
-                return prefix
-        return None
+        return self._prefix_index.find(string)
 
     def get_affix(self, string: str) -> Optional[str]:
         """Get affix of the string.
@@ -239,12 +244,9 @@ class TextProcessor:
                 String to find affix in.
 
         Returns:
-            Affix of the string or None if it isn't found.
+            The first affix of affix map the string contains or None if it isn't found.
         """
-        for affix in self.affix_map.keys():
-            if affix in string:
-                return affix
-        return None
+        return self._affix_index.find(string)
 
     def get_matching_tokens_count(self, string1: str, string2: str) -> int:
         """Count amount of matching unique tokens in both strings, excluding stopwords.
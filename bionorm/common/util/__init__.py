@@ -1,2 +1,3 @@
 from .files import *
 from .mesh_utils import *
+from .parallel import *
@@ -1,14 +1,81 @@
-from typing import Callable
+import bz2
+import gzip
+import io
+import lzma
+from os.path import exists, getsize
+from typing import Callable, Iterator, BinaryIO
 
 from tqdm import tqdm
 
+READ_BUFFER_SIZE = 1 << 20
+COMPRESSED_EXTENSIONS = ('.gz', '.bz2', '.xz')
+
+# Lines read between updates of the progress bar
+_PROGRESS_STEP = 1 << 12
+
+
+def resolve_path(path: str) -> str:
+    """Finds the file on disk, falling back to its compressed versions.
+
+    Args:
+        path (str):
+            Path to the file, e.g. `terminology.txt`.
+
+    Returns:
+        The path itself if it exists, otherwise the first existing of `path.gz`, `path.bz2` and `path.xz`.
+        If none of them exist, returns the path as is.
+    """
+    if exists(path):
+        return path
+    for extension in COMPRESSED_EXTENSIONS:
+        if exists(path + extension):
+            return path + extension
+    return path
+
+
+def _decompress(path: str, raw: BinaryIO) -> BinaryIO:
+    if path.endswith('.gz'):
+        return gzip.GzipFile(fileobj=raw, mode='rb')
+    if path.endswith('.bz2'):
+        return bz2.BZ2File(raw, mode='rb')
+    if path.endswith('.xz'):
+        return lzma.LZMAFile(raw, mode='rb')
+    return raw
+
+
+def iter_lines(path: str, *, verbose: bool = False, message: str = '') -> Iterator[str]:
+    """Lazily iterates over lines of a text file.
+
+    The file is read with a large buffer, gzip/bz2/xz files (by extension) are decompressed on the fly.
+    If the path doesn't exist, but its compressed version does (see :func:`resolve_path`), the latter is read.
+
+    Args:
+        path (str):
+            Path to the file.
+        verbose (:obj:`bool`, defaults to :obj:`False`):
+            Whether to show progress by the read bytes of the file on disk.
+        message (:obj:`str`, defaults to empty string):
+            Description of the progress bar.
+
+    Returns:
+        Iterator over lines including line endings.
+    """
+    path = resolve_path(path)
+    with open(path, 'rb', buffering=READ_BUFFER_SIZE) as raw:
+        with io.TextIOWrapper(_decompress(path, raw)) as f:
+            if not verbose:
+                yield from f
+                return
+            with tqdm(total=getsize(path), desc=message, unit='B', unit_scale=True, unit_divisor=1024) as progress:
+                for i, line in enumerate(f):
+                    yield line
+                    if i % _PROGRESS_STEP == 0:
+                        progress.update(raw.tell() - progress.n)
+                progress.update(progress.total - progress.n)
+
 
 def process_file(path: str, process_fn: Callable[[str], None], *, verbose: bool = False, message: str = ''):
-    with open(path, 'r') as f:
-        lines = f.readlines()
-        if verbose:
-            lines = tqdm(lines, message)
-        for line in lines:
-            stripped = line.strip()
-            if stripped:
-                process_fn(stripped)
+    for line in iter_lines(path, verbose=verbose, message=message):
+        stripped = line.strip()
+        if stripped:
+            process_fn(stripped)
@@ -5,6 +5,8 @@ from typing import Dict, List, Set, Optional
 
 from tqdm import tqdm
 
+from bionorm.common.util.files import iter_lines
+
 ID_PREFIX = '<http://id.nlm.nih.gov/mesh/2020/'
 DISEASE_TYPE = '<http://id.nlm.nih.gov/mesh/vocab#SCR_Disease>'
 CHEMICAL_TYPE = '<http://id.nlm.nih.gov/mesh/vocab#SCR_Chemical>'
@@ -84,18 +86,16 @@ def strip_label(label: str) -> str:
 
 def collect_entities(mesh_file: Path, tree_prefixes: List[str], scr_type: Optional[str] = None) -> Dict[str, Set[str]]:
     entities: Dict[str, Dict[EntityType, List[str]]] = {}
-    with mesh_file.open('r') as mesh:
-        lines = mesh.readlines()
-        for line in tqdm(lines, 'Reading MeSH dump...'):  # type: str
-            id_str, field_str, value_str = line.split(' ', maxsplit=2)
-            ent_id = get_id(id_str)  # Omit last > and prefix
-            if ent_id not in entities:
-                entities[ent_id] = defaultdict(list)
-            try:
-                entity_type = EntityType(field_str)
-                entities[ent_id][entity_type].append(value_str[:-3])
-            except ValueError:
-                continue
+    for line in iter_lines(str(mesh_file), verbose=True, message='Reading MeSH dump...'):  # type: str
+        id_str, field_str, value_str = line.split(' ', maxsplit=2)
+        ent_id = get_id(id_str)  # Omit last > and prefix
+        if ent_id not in entities:
+            entities[ent_id] = defaultdict(list)
+        try:
+            entity_type = EntityType(field_str)
+            entities[ent_id][entity_type].append(value_str[:-3])
+        except ValueError:
+            continue
 
     result: Dict[str, Set[str]] = {}
 
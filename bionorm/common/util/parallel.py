@@ -0,0 +1,142 @@
+import gc
+import multiprocessing
+import queue
+import threading
+import traceback
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Any, Dict
+
+from bionorm.common.models import Paper, BioEntity
+
+DEFAULT_CHUNK_SIZE = 16
+DEFAULT_QUEUE_SIZE = 64
+
+# Seconds to wait for results before checking the workers are alive
+_POLL_INTERVAL = 1.0
+
+
+def paper_entities(paper: Paper) -> List[BioEntity]:
+    """Collect all entities of the paper in a stable order.
+
+    Args:
+        paper (Paper):
+            Paper to collect the entities from.
+
+    Returns:
+        Genes, species, diseases and chemicals of every passage.
+    """
+    return [entity for passage in paper.passages for entities in (passage.genes, passage.species, passage.diseases, passage.chemicals)
+            for entity in entities]
+
+
+def _normalize_chunk(normalizer: Any, papers: List[Paper]) -> List[List[Optional[str]]]:
+    if hasattr(normalizer, 'normalize_batch'):
+        normalizer.normalize_batch(papers)
+    else:
+        for paper in papers:
+            normalizer.normalize(paper)
+    return [[entity.id for entity in paper_entities(paper)] for paper in papers]
+
+
+def _worker(normalizer: Any, tasks: multiprocessing.Queue, results: multiprocessing.Queue):
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        index, papers = task
+        try:
+            results.put((index, _normalize_chunk(normalizer, papers), None))
+        except Exception:
+            results.put((index, None, traceback.format_exc()))
+
+
+def normalize_parallel(normalizer: Any, papers: Iterable[Paper], *, workers: int = multiprocessing.cpu_count(),
+                       chunk_size: int = DEFAULT_CHUNK_SIZE, queue_size: int = DEFAULT_QUEUE_SIZE) -> Iterator[Paper]:
+    """Normalize papers with a pool of forked processes sharing the loaded normalizer.
+
+    The normalizer data is loaded once in the current process. Workers are forked after :func:`gc.freeze`, so the pages of
+    the loaded dictionaries are shared copy-on-write and aren't copied on reference count updates by the collector.
+    Papers are sent to workers in chunks through a bounded queue, only the IDs of entities are sent back.
+
+    Notes:
+        Uses the fork start method, so it's available on POSIX systems only.
+        normalize_batch() of normalizer is used for the chunks if it's available.
+
+    Args:
+        normalizer (Any):
+            Loaded normalizer with normalize(paper) method, e.g. :class:`GNormPlus` or :class:`DiseaseSieveBasedNormalizer`.
+        papers (Iterable[Paper]):
+            Papers to normalize, may be a lazy iterable.
+        workers (:obj:`int`, defaults to number of CPUs):
+            Number of worker processes.
+        chunk_size (:obj:`int`, defaults to DEFAULT_CHUNK_SIZE):
+            Number of papers sent to a worker at once.
+        queue_size (:obj:`int`, defaults to DEFAULT_QUEUE_SIZE):
+            Maximum number of chunks in processing, bounds the memory used by the papers waiting for normalization.
+
+    Returns:
+        Iterator over the same papers with normalized entities in the input order.
+    """
+    context = multiprocessing.get_context('fork')
+    tasks = context.Queue(maxsize=queue_size)
+    results = context.Queue()
+    in_flight = threading.BoundedSemaphore(queue_size)
+    pending: Dict[int, List[Paper]] = {}
+    chunks_count = [0]
+    feeding_done = threading.Event()
+
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+    processes = [context.Process(target=_worker, args=(normalizer, tasks, results), daemon=True) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    if hasattr(gc, 'unfreeze'):
+        gc.unfreeze()
+
+    def feed():
+        paper_iterator = iter(papers)
+        index = 0
+        while True:
+            chunk = list(islice(paper_iterator, chunk_size))
+            if not chunk:
+                break
+            in_flight.acquire()
+            pending[index] = chunk
+            tasks.put((index, chunk))
+            index += 1
+            chunks_count[0] = index
+        feeding_done.set()
+        for _ in processes:
+            tasks.put(None)
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    try:
+        ready: Dict[int, List[List[Optional[str]]]] = {}
+        next_index = 0
+        while not (feeding_done.is_set() and next_index == chunks_count[0]):
+            if next_index in ready:
+                chunk = pending.pop(next_index)
+                for paper, paper_ids in zip(chunk, ready.pop(next_index)):
+                    for entity, entity_id in zip(paper_entities(paper), paper_ids):
+                        entity.id = entity_id
+                    yield paper
+                in_flight.release()
+                next_index += 1
+                continue
+            try:
+                index, ids, error = results.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if any(process.exitcode for process in processes):
+                    raise RuntimeError('Normalization worker exited unexpectedly')
+                continue
+            if error is not None:
+                raise RuntimeError(f'Normalization of chunk {index} failed:\n{error}')
+            ready[index] = ids
+        feeder.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
@@ -0,0 +1,38 @@
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+from bionorm.common.util import iter_lines, process_file
+
+_CONTENT = 'first\tline\n\n  second line  \nthird\n'
+_LINES = ['first\tline', 'second line', 'third']
+
+
+def _collect(path: str, verbose: bool = False):
+    lines = []
+    process_file(path, lines.append, verbose=verbose)
+    return lines
+
+
+@pytest.mark.parametrize('verbose', [False, True])
+def test_plain(tmp_path, verbose):
+    path = tmp_path / 'data.txt'
+    path.write_text(_CONTENT)
+    assert _collect(str(path), verbose) == _LINES
+    assert list(iter_lines(str(path))) == _CONTENT.splitlines(keepends=True)
+
+
+@pytest.mark.parametrize('extension, compress', [('.gz', gzip.compress), ('.bz2', bz2.compress), ('.xz', lzma.compress)])
+def test_compressed(tmp_path, extension, compress):
+    path = tmp_path / f'data.txt{extension}'
+    path.write_bytes(compress(_CONTENT.encode()))
+    assert _collect(str(path)) == _LINES
+    # Compressed file is used if the plain one is missing
+    assert _collect(str(tmp_path / 'data.txt'), verbose=True) == _LINES
+
+
+def test_missing(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        _collect(str(tmp_path / 'data.txt'))
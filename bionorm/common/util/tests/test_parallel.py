@@ -0,0 +1,40 @@
+import pytest
+
+from bionorm.common.models import Paper, Passage, SpeciesMention, DiseaseMention, Location
+from bionorm.common.util import normalize_parallel, paper_entities
+
+
+class _Normalizer:
+    def __init__(self):
+        # Loaded in the parent process only, workers see it through fork
+        self.names = {'human': '9606', 'mouse': '10090'}
+
+    def normalize(self, paper: Paper):
+        if paper.pmid == 'fail':
+            raise ValueError('Broken paper')
+        for entity in paper_entities(paper):
+            entity.id = f'{self.names.get(entity.text, "-")}:{paper.pmid}'
+
+
+def _papers(count: int):
+    for i in range(count):
+        yield Paper(str(i), [Passage('title', '', species=[SpeciesMention(Location(0, 5), 'human')],
+                                     diseases=[DiseaseMention(Location(0, 5), 'mouse'), DiseaseMention(Location(0, 3), 'fly')])], [])
+
+
+@pytest.mark.parametrize('workers, chunk_size, queue_size', [(1, 1, 1), (3, 2, 2), (4, 16, 64)])
+def test_normalize_parallel(workers, chunk_size, queue_size):
+    papers = list(normalize_parallel(_Normalizer(), _papers(50), workers=workers, chunk_size=chunk_size, queue_size=queue_size))
+    assert [paper.pmid for paper in papers] == [str(i) for i in range(50)]
+    for paper in papers:
+        assert [entity.id for entity in paper_entities(paper)] == [f'9606:{paper.pmid}', f'10090:{paper.pmid}', f'-:{paper.pmid}']
+
+
+def test_empty():
+    assert list(normalize_parallel(_Normalizer(), [], workers=2)) == []
+
+
+def test_error():
+    papers = list(_papers(5)) + [Paper('fail', [], [])]
+    with pytest.raises(RuntimeError, match='Broken paper'):
+        list(normalize_parallel(_Normalizer(), papers, workers=2, chunk_size=1))
@@ -1,6 +1,7 @@
 from os.path import join, dirname
+from typing import List, Tuple, Optional
 
-from bionorm.common.models import Paper
+from bionorm.common.models import Paper, BioEntity
 from bionorm.common.SieveBased import SieveBasedNormalizer
 from bionorm.common.SieveBased.config import SieveBasedConfig
 
@@ -20,6 +21,8 @@ class ChemicalsSieveBasedNormalizer(SieveBasedNormalizer):
         """
         return ChemicalsSieveBasedNormalizer(SieveBasedConfig(terminology_path=join(DATA_PATH, 'mesh_terminology.txt')))
 
+    def get_entities(self, paper: Paper) -> List[Tuple[BioEntity, Optional[str]]]:
+        return [(chemical, paper.abb_sf_to_lf.get(chemical.text.lower())) for passage in paper.passages for chemical in passage.chemicals]
+
     def normalize(self, paper: Paper, *, verbose: bool = False):
-        all_chemicals = [(chemical, paper.abb_sf_to_lf.get(chemical.text.lower())) for passage in paper.passages for chemical in passage.chemicals]
-        self.normalize_entities(all_chemicals, verbose=verbose)
+        self.normalize_entities(self.get_entities(paper), verbose=verbose)
@@ -1,6 +1,7 @@
 from os.path import join, dirname
+from typing import List, Tuple, Optional
 
-from bionorm.common.models import Paper
+from bionorm.common.models import Paper, BioEntity
 from bionorm.common.SieveBased import SieveBasedNormalizer
 from bionorm.common.SieveBased.config import SieveBasedConfig
 
@@ -20,6 +21,8 @@ class DiseaseSieveBasedNormalizer(SieveBasedNormalizer):
         """
         return DiseaseSieveBasedNormalizer(SieveBasedConfig(terminology_path=join(DATA_PATH, 'mesh_terminology.txt')))
 
+    def get_entities(self, paper: Paper) -> List[Tuple[BioEntity, Optional[str]]]:
+        return [(disease, paper.abb_sf_to_lf.get(disease.text.lower())) for passage in paper.passages for disease in passage.diseases]
+
     def normalize(self, paper: Paper, *, verbose: bool = False):
-        all_diseases = [(disease, paper.abb_sf_to_lf.get(disease.text.lower())) for passage in paper.passages for disease in passage.diseases]
-        self.normalize_entities(all_diseases, verbose=verbose)
+        self.normalize_entities(self.get_entities(paper), verbose=verbose)
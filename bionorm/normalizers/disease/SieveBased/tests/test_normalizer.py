@@ -0,0 +1,146 @@
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from typing import List
+
+import pytest
+
+from bionorm.common.models import DiseaseMention, Location, Passage, Paper, Abbreviation
+from bionorm.common.SieveBased import SieveBasedNormalizer
+from bionorm.common.SieveBased.config import SieveBasedConfig
+from bionorm.common.SieveBased.models import CUI_LESS
+from bionorm.common.SieveBased.processing import TerminologyMap
+from bionorm.normalizers.disease.SieveBased import DiseaseSieveBasedNormalizer
+
+_TERMINOLOGY = """D001||scleroderma renal crisis|renal crisis
+D002||breast cancer|breast carcinoma|cancer of breast|mammary cancer
+D003||hypertension|high blood pressure
+D004||diabetes mellitus, type 2|type 2 diabetes|non-insulin-dependent diabetes
+C005||renal cell carcinoma|kidney cancer
+D006||cardiac arrest|heart arrest
+D007||lung cancer|lung carcinoma"""
+
+_MENTIONS = ['scleroderma renal crisis', 'SRC', 'Breast cancer', 'breast  cancer', 'cancers of breasts', 'hypertensions',
+             'high-blood pressure', 'type 2 diabetes mellitus', 'diabetes', 'kidney cancers', 'renal crisis of scleroderma',
+             'cardiac arrests', 'heart-arrest', 'lung cancers', 'cancer', 'carcinoma', 'T2D', 'HBP', 'unknown disease']
+
+_ABBREVIATIONS = [('scleroderma renal crisis', 'SRC'), ('type 2 diabetes', 'T2D'), ('unknown disease', 'SRC'),
+                  ('high blood pressure', 'HBP'), ('hypertension', 'HBP')]
+
+
+@pytest.fixture(scope='module')
+def normalizer(tmp_path_factory) -> DiseaseSieveBasedNormalizer:
+    path = tmp_path_factory.mktemp('terminology') / 'terminology.txt'
+    path.write_text(_TERMINOLOGY)
+    normalizer = DiseaseSieveBasedNormalizer(SieveBasedConfig(terminology_path=str(path)))
+    normalizer.load_data()
+    return normalizer
+
+
+def _papers(count: int, seed: int = 0) -> List[Paper]:
+    rng = random.Random(seed)
+    papers = []
+    for i in range(count):
+        diseases = [DiseaseMention(Location(0, 0), rng.choice(_MENTIONS)) for _ in range(rng.randint(1, 8))]
+        abbreviations = [Abbreviation(*abbreviation) for abbreviation in rng.sample(_ABBREVIATIONS, rng.randint(0, 2))]
+        papers.append(Paper(str(i), [Passage('abstract', '', diseases=diseases)], abbreviations))
+    return papers
+
+
+def _ids(papers: List[Paper]) -> List[List[str]]:
+    return [[disease.id for passage in paper.passages for disease in passage.diseases] for paper in papers]
+
+
+def test_normalize(normalizer):
+    paper = Paper('0', [Passage('abstract', '', diseases=[DiseaseMention(Location(0, 3), 'SRC')])],
+                  [Abbreviation('scleroderma renal crisis', 'SRC')])
+    normalizer.normalize(paper)
+    assert _ids([paper]) == [['D001']]
+
+
+def test_frozen_terminology(normalizer, tmp_path):
+    path = tmp_path / 'terminology.txt'
+    path.write_text(_TERMINOLOGY)
+    mutable_normalizer = DiseaseSieveBasedNormalizer(SieveBasedConfig(terminology_path=str(path), freeze_terminology=False))
+    mutable_normalizer.load_data()
+    assert normalizer.terminology.frozen and not mutable_normalizer.terminology.frozen
+
+    papers = _papers(10, seed=1)
+    expected = deepcopy(papers)
+    for paper in expected:
+        mutable_normalizer.normalize(paper)
+    for paper in papers:
+        normalizer.normalize(paper)
+    assert _ids(papers) == _ids(expected)
+
+
+def test_normalize_batch(normalizer):
+    papers = _papers(30)
+    expected = deepcopy(papers)
+    for paper in expected:
+        normalizer.normalize(paper)
+    normalizer.normalize_batch(papers)
+    assert _ids(papers) == _ids(expected)
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_concurrent_normalize(normalizer, batch):
+    papers = _papers(60, seed=2)
+    expected = deepcopy(papers)
+    for paper in expected:
+        normalizer.normalize(paper)
+
+    chunks = [papers[i:i + 5] for i in range(0, len(papers), 5)]
+    switch_interval = sys.getswitchinterval()
+    # Switch threads as often as possible to interleave the sieves of different papers
+    sys.setswitchinterval(1e-5)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            if batch:
+                list(executor.map(normalizer.normalize_batch, chunks))
+            else:
+                list(executor.map(normalizer.normalize, papers))
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert _ids(papers) == _ids(expected)
+
+
+def test_result_cache(normalizer, tmp_path):
+    path = tmp_path / 'terminology.txt'
+    path.write_text(_TERMINOLOGY)
+    cached_normalizer = DiseaseSieveBasedNormalizer(SieveBasedConfig(terminology_path=str(path), sieve_result_cache_size=8))
+    cached_normalizer.load_data()
+
+    papers = _papers(30, seed=3)
+    expected = deepcopy(papers)
+    for paper in expected:
+        normalizer.normalize(paper)
+    batch_papers = deepcopy(papers)
+    for paper in papers:
+        cached_normalizer.normalize(paper)
+    cached_normalizer.normalize_batch(batch_papers)
+    assert _ids(papers) == _ids(expected)
+    assert _ids(batch_papers) == _ids(expected)
+    assert cached_normalizer.result_cache.hits > 0 and len(cached_normalizer.result_cache) == 8
+
+
+def test_required_maps(tmp_path):
+    path = tmp_path / 'terminology.txt'
+    path.write_text(_TERMINOLOGY)
+    exact_normalizer = DiseaseSieveBasedNormalizer(SieveBasedConfig(terminology_path=str(path), sieve_level=2))
+    exact_normalizer.load_data()
+    assert exact_normalizer.terminology.required_maps == {TerminologyMap.NAME_TO_CUI}
+    assert exact_normalizer.terminology.token_index is None
+
+    papers = _papers(10)
+    exact_normalizer.normalize_batch(papers)
+    assert any(cui != CUI_LESS for cuis in _ids(papers) for cui in cuis)
+
+
+def test_get_entities_is_required(tmp_path):
+    class NoEntitiesNormalizer(SieveBasedNormalizer):
+        pass
+
+    with pytest.raises(TypeError):
+        NoEntitiesNormalizer(SieveBasedConfig(terminology_path=str(tmp_path / 'terminology.txt')))
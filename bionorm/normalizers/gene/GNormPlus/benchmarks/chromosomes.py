@@ -0,0 +1,73 @@
+"""
+Benchmark of chromosome recognition in full-text papers: the batch search splitting every concept once and the lazy search
+stopping at the looked up chromosome IDs against the reference searching passage by passage.
+"""
+
+import argparse
+import random
+import re
+import timeit
+from typing import List, Set
+
+from bionorm.normalizers.gene.GNormPlus.benchmarks.mention_search import make_mentions, make_tree, make_context
+from bionorm.normalizers.gene.GNormPlus.util import PrefixTree, LazyConceptIds
+
+
+def reference_find_concept_ids(tree: PrefixTree, contexts: List[str]) -> Set[str]:
+    concept_ids: Set[str] = set()
+    for context in contexts:
+        for location in tree.search_mention_location(context):
+            for ID in re.split('r[|,]', location.concept):
+                concept_ids.add(ID)
+    return concept_ids
+
+
+def make_concept_tree(mentions: List[str], rng: random.Random) -> PrefixTree:
+    """Make tree of the mentions, some of which have several concept IDs separated the way chromosome tree has.
+    """
+    tree = make_tree(PrefixTree, mentions)
+    for mention in rng.sample(mentions, len(mentions) // 5):
+        tree.insert(mention, 'r|'.join(str(rng.randrange(10 ** 5)) for _ in range(rng.randint(2, 4))))
+    return tree
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--passages", type=int, default=300, help='Number of passages in paper')
+    parser.add_argument("--words", type=int, default=200, help='Number of words in every passage')
+    parser.add_argument("--lookups", type=int, default=5, help='Number of looked up chromosome IDs of candidate genes')
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(passages_count: int, words_count: int, lookups_count: int, repeat: int, seed: int):
+    rng = random.Random(seed)
+    mentions = make_mentions(2000, rng)
+    tree = make_concept_tree(mentions, rng)
+    contexts = [make_context(words_count, rng.sample(mentions, 100), rng) for _ in range(passages_count)]
+
+    expected = reference_find_concept_ids(tree, contexts)
+    assert tree.find_concept_ids(contexts) == expected, 'Batch search found different IDs'
+    assert set(LazyConceptIds(tree, contexts)) == expected, 'Lazy search found different IDs'
+    # Candidate genes mostly have their chromosomes mentioned in the first passages
+    lookups = rng.sample(sorted(tree.find_concept_ids(contexts[:passages_count // 10])), lookups_count)
+
+    def lazy_lookups():
+        concept_ids = LazyConceptIds(tree, contexts)
+        return [ID in concept_ids for ID in lookups]
+
+    reference_time = min(timeit.repeat(lambda: reference_find_concept_ids(tree, contexts), number=1, repeat=repeat))
+    batch_time = min(timeit.repeat(lambda: tree.find_concept_ids(contexts), number=1, repeat=repeat))
+    lazy_time = min(timeit.repeat(lazy_lookups, number=1, repeat=repeat))
+    print(f'{len(contexts)} passages, {len(expected)} chromosome IDs, {len(lookups)} looked up')
+    print(f'   reference: {reference_time * 1e3:8.2f}ms per paper')
+    print(f'       batch: {batch_time * 1e3:8.2f}ms per paper ({reference_time / batch_time:.1f}x)')
+    print(f'lazy lookups: {lazy_time * 1e3:8.2f}ms per paper ({reference_time / lazy_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    parser = setup_argparser()
+    args_ = parser.parse_args()
+    main(args_.passages, args_.words, args_.lookups, args_.repeat, args_.seed)
@@ -0,0 +1,188 @@
+"""
+Benchmark of the mention search in prefix trees with an integer cursor against the reference consuming the lowercased text
+string, on long synthetic full-text passages.
+"""
+
+import argparse
+import random
+import timeit
+from pathlib import Path
+from typing import List, Optional
+
+from bionorm.normalizers.gene.GNormPlus.benchmarks.trees import collect_mentions
+from bionorm.normalizers.gene.GNormPlus.util import PrefixTree, PrefixTranslation, FoundMention, split_to_tokens
+
+_WORDS = ['the', 'protein', 'binds', 'to', 'expression', 'of', 'was', 'increased', 'in', 'cells', 'and', 'we', '12', 'p', 'q']
+_SEPARATORS = [' ', ' ', ' ', '  ', ', ', '-', '\n', '; ', '']
+
+
+def reference_search_mention_location(tree: PrefixTree, context: str) -> List[FoundMention]:
+    """Mention search consuming the unconsumed text by slicing it after every token.
+    """
+    locations: List[FoundMention] = []
+    lowered = context.lower()
+
+    tokens = split_to_tokens(context, memoize=False)
+    offset = 0
+    start = 0
+    last = 0
+    first_time = 0
+    for c in lowered:
+        if not c.isspace():
+            break
+        offset += 1
+    i = 0
+    while i < len(tokens):
+        pre_i = i
+        pre_start = start
+        pre_last = last
+        pre_lowered = lowered
+        pre_offset = offset
+
+        tmp = tree.root
+        found = False
+        concept_found = i
+        concept_found_mention: Optional[FoundMention] = None
+        first_time_while = -1
+
+        while True:
+            token = tokens[i]
+            child = tree._find_child(tmp, token, PrefixTranslation.NUMBER)
+            if child is None:
+                break
+            tmp = child
+            first_time_while += 1
+            if start == 0 and first_time > 0:
+                start = offset
+            if 0 < len(token) <= len(lowered) and lowered[0:len(token)] == token:
+                lowered = lowered[len(token):]
+                offset += len(token)
+
+            last = offset
+            for c in lowered:
+                if not c.isspace():
+                    break
+                offset += 1
+
+            i += 1
+            concept = tree._get_concept(tmp)
+            if concept and start < last < len(context):
+                concept_found = i
+                concept_found_mention = FoundMention(start, last, context[start:last], concept)
+            found = True
+            if i >= len(tokens):
+                break
+            if first_time_while == 0:
+                pre_i = i
+                pre_start = start
+                pre_last = last
+                pre_lowered = lowered
+                pre_offset = offset
+
+        concept = tree._get_concept(tmp)
+        if found:
+            if concept and start < last < len(context):
+                locations.append(FoundMention(start, last, context[start:last], concept))
+            else:
+                if concept_found_mention:
+                    locations.append(concept_found_mention)
+                    i = concept_found + 1
+                if first_time_while >= 1:
+                    i = pre_i
+                    lowered = pre_lowered
+                    offset = pre_offset
+                start = 0
+                last = 0
+                if i > 0:
+                    i -= 1
+        else:
+            if first_time_while >= 1 and concept is None:
+                i = pre_i
+                start = pre_start
+                last = pre_last
+                lowered = pre_lowered
+                offset = pre_offset
+
+                if 0 < len(token) <= len(lowered) and lowered[0:len(token)] == token:
+                    lowered = lowered[len(token):]
+                    offset += len(token)
+
+        for c in lowered:
+            if not c.isspace():
+                break
+            offset += 1
+        first_time += 1
+
+        i += 1
+
+    return locations
+
+
+def make_mentions(mentions_count: int, rng: random.Random) -> List[str]:
+    """Make chromosome-like mentions, such as `17q21.3` or `chromosome 1p36`.
+    """
+    mentions = []
+    for _ in range(mentions_count):
+        mention = f'{rng.choice(["", "chromosome ", "Xp", "12"])}{rng.randint(1, 22)}{rng.choice("pq")}{rng.randint(1, 40)}'
+        mentions.append(mention + (f'.{rng.randint(1, 9)}' if rng.random() < 0.3 else ''))
+    return mentions
+
+
+def make_tree(tree_class, mentions: List[str]) -> PrefixTree:
+    tree = tree_class({})
+    for i, mention in enumerate(mentions):
+        tree.insert(mention, str(i))
+    return tree
+
+
+def make_context(words_count: int, mentions: List[str], rng: random.Random) -> str:
+    """Make a passage of random words, mentions and separators, which may start with a mention or whitespace.
+    """
+    parts = [rng.choice(['', ' ', '\t '])]
+    for _ in range(words_count):
+        parts.append(rng.choice(mentions) if rng.random() < 0.1 else rng.choice(_WORDS))
+        parts.append(rng.choice(_SEPARATORS))
+    return ''.join(parts)
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--tree", type=lambda x: Path(x), default=None,
+                        help='Text prefix tree (PT_*.txt), random chromosome mentions are used if it is not given')
+    parser.add_argument("--passages", type=int, default=20)
+    parser.add_argument("--words", type=int, default=5000, help='Number of words in every passage')
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(tree_path: Optional[Path], passages_count: int, words_count: int, repeat: int, seed: int):
+    rng = random.Random(seed)
+    if tree_path is not None:
+        with open(tree_path, 'r') as f:
+            mentions = collect_mentions([line for line in f if line.strip()])
+        tree = PrefixTree({})
+        with open(tree_path, 'r') as f:
+            tree.load_from_lines(line for line in f if line.strip())
+    else:
+        mentions = make_mentions(2000, rng)
+        tree = make_tree(PrefixTree, mentions)
+    contexts = [make_context(words_count, rng.sample(mentions, min(len(mentions), 200)), rng) for _ in range(passages_count)]
+
+    expected = [reference_search_mention_location(tree, context) for context in contexts]
+    assert [tree.search_mention_location(context) for context in contexts] == expected, 'Cursor search found different mentions'
+
+    reference_time = min(timeit.repeat(lambda: [reference_search_mention_location(tree, context) for context in contexts],
+                                       number=1, repeat=repeat))
+    cursor_time = min(timeit.repeat(lambda: [tree.search_mention_location(context) for context in contexts], number=1, repeat=repeat))
+    characters = sum(map(len, contexts))
+    print(f'{len(contexts)} passages, {characters} characters, {sum(map(len, expected))} mentions found')
+    print(f'reference: {reference_time / len(contexts) * 1e3:8.2f}ms per passage')
+    print(f'   cursor: {cursor_time / len(contexts) * 1e3:8.2f}ms per passage ({reference_time / cursor_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    parser = setup_argparser()
+    args_ = parser.parse_args()
+    main(args_.tree, args_.passages, args_.words, args_.repeat, args_.seed)
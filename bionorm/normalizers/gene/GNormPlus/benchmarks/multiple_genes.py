@@ -0,0 +1,119 @@
+"""
+Benchmark of the inference of ambiguous genes with ranks of guaranteed IDs against the reference scanning all guaranteed IDs
+for every ambiguous gene, on gene-dense synthetic papers.
+"""
+
+import argparse
+import random
+import timeit
+from copy import deepcopy
+from typing import Dict, Tuple, Union
+
+from bionorm.normalizers.gene.GNormPlus.models import GeneType
+from bionorm.normalizers.gene.GNormPlus.processing import infer_multiple_genes, GeneMentionRecord, GeneMentionHash, \
+    GuaranteedGeneToID, MultiGeneToId, GeneMentionKey
+
+# Keys of the dictionaries of the reference gene mention hash
+ID_KEY = 'ID'
+TYPE_KEY = 'type'
+FALLBACK_KEY = 'fallback'
+
+
+def to_reference_hash(gene_mention_hash: GeneMentionHash) -> Dict[str, Dict[str, str]]:
+    """Convert the table of gene mention records to the reference dictionaries with `mention\\ttax` keys.
+    """
+    reference_hash: Dict[str, Dict[str, str]] = {}
+    for (mentions, tax_id), record in gene_mention_hash.items():
+        hashes = {f'{start}\t{end}': '' for start, end in record.locations}
+        hashes[TYPE_KEY] = record.type.value
+        if record.ids is not None:
+            hashes[ID_KEY] = ','.join(record.ids)
+        if record.fallback is not None:
+            hashes[FALLBACK_KEY] = record.fallback
+        reference_hash[f'{mentions}\t{tax_id}'] = hashes
+    return reference_hash
+
+
+def to_reference_genes(gene_to_id: Dict[GeneMentionKey, Union[str, Tuple[str, ...]]]) -> Dict[str, str]:
+    """Convert guaranteed or ambiguous genes to the reference ones with `mention\\ttax` keys and comma-joined IDs.
+    """
+    return {f'{mentions}\t{tax_id}': ids if isinstance(ids, str) else ','.join(ids) for (mentions, tax_id), ids in gene_to_id.items()}
+
+
+def reference_infer_multiple_genes(guaranteed_gene_to_id: Dict[str, str], multi_gene_to_id: Dict[str, str],
+                                   gene_mention_hash: Dict[str, Dict[str, str]]):
+    for multi_gene, ids_str in multi_gene_to_id.items():
+        found_guaranteed = False
+        for guaranteed_id in guaranteed_gene_to_id.values():
+            ids = ids_str.split(',')
+            for ID in ids:
+                if ID == guaranteed_id:
+                    gene_mention_hash[multi_gene][ID_KEY] = ID
+                    found_guaranteed = True
+                    break
+            if found_guaranteed:
+                break
+
+
+def make_data(guaranteed_count: int, multi_count: int, candidates_count: int, ids_count: int, seed: int) \
+        -> Tuple[GuaranteedGeneToID, MultiGeneToId, GeneMentionHash]:
+    """Make random guaranteed and ambiguous genes, IDs are drawn from a shared pool, so they may overlap and repeat.
+
+    Returns:
+        Guaranteed genes, ambiguous genes and gene mention hash.
+    """
+    rng = random.Random(seed)
+    guaranteed_gene_to_id = {(f'g{i}', '9606'): str(rng.randrange(ids_count)) for i in range(guaranteed_count)}
+    multi_gene_to_id = {(f'm{i}', '9606'): tuple(str(rng.randrange(ids_count)) for _ in range(rng.randint(1, candidates_count)))
+                        for i in range(multi_count)}
+    return guaranteed_gene_to_id, multi_gene_to_id, make_gene_mention_hash(multi_gene_to_id)
+
+
+def make_gene_mention_hash(multi_gene_to_id: MultiGeneToId) -> GeneMentionHash:
+    """Make records of the ambiguous genes with their candidate IDs.
+    """
+    gene_mention_hash: GeneMentionHash = {}
+    for (mentions, tax_id), ids in multi_gene_to_id.items():
+        record = gene_mention_hash[mentions, tax_id] = GeneMentionRecord(mentions, tax_id, GeneType.GENE)
+        record.ids = ids
+    return gene_mention_hash
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--guaranteed", type=int, default=500, help='Number of guaranteed genes')
+    parser.add_argument("--multi", type=int, default=500, help='Number of ambiguous genes')
+    parser.add_argument("--candidates", type=int, default=10, help='Maximum number of candidate IDs of ambiguous gene')
+    parser.add_argument("--ids", type=int, default=20000, help='Number of distinct gene IDs')
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(guaranteed_count: int, multi_count: int, candidates_count: int, ids_count: int, repeat: int, seed: int):
+    guaranteed_gene_to_id, multi_gene_to_id, gene_mention_hash = make_data(guaranteed_count, multi_count, candidates_count,
+                                                                           ids_count, seed)
+    reference_guaranteed = to_reference_genes(guaranteed_gene_to_id)
+    reference_multi = to_reference_genes(multi_gene_to_id)
+    reference_hash = to_reference_hash(gene_mention_hash)
+    expected = deepcopy(reference_hash)
+    reference_infer_multiple_genes(reference_guaranteed, reference_multi, expected)
+    actual = deepcopy(gene_mention_hash)
+    infer_multiple_genes(guaranteed_gene_to_id, multi_gene_to_id, actual)
+    assert to_reference_hash(actual) == expected, 'Ranked inference chose different genes'
+    inferred = sum(actual[gene].ids != gene_mention_hash[gene].ids for gene in actual)
+
+    reference_time = min(timeit.repeat(lambda: reference_infer_multiple_genes(reference_guaranteed, reference_multi, reference_hash),
+                                       number=1, repeat=repeat))
+    ranked_time = min(timeit.repeat(lambda: infer_multiple_genes(guaranteed_gene_to_id, multi_gene_to_id, gene_mention_hash),
+                                    number=1, repeat=repeat))
+    print(f'{len(guaranteed_gene_to_id)} guaranteed, {len(multi_gene_to_id)} ambiguous genes, {inferred} inferred')
+    print(f'reference: {reference_time * 1e3:8.2f}ms per paper')
+    print(f'   ranked: {ranked_time * 1e3:8.2f}ms per paper ({reference_time / ranked_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    parser = setup_argparser()
+    args_ = parser.parse_args()
+    main(args_.guaranteed, args_.multi, args_.candidates, args_.ids, args_.repeat, args_.seed)
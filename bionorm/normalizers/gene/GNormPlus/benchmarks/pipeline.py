@@ -0,0 +1,341 @@
+"""
+Per-stage benchmark of the gene normalization pipeline with the table of gene mention records against the reference on the
+dictionaries of strings with `mention\\ttax` keys, on synthetic gene-dense papers. Outputs of both are checked to be the same.
+"""
+
+import argparse
+import random
+import re
+import time
+from copy import deepcopy
+from typing import Dict, Set, List, Tuple, NamedTuple, Callable, Any, Optional
+
+from bionorm.common.models import Paper, Passage, GeneMention, SpeciesMention, Location, Abbreviation
+from bionorm.normalizers.gene.GNormPlus.benchmarks.multiple_genes import reference_infer_multiple_genes, ID_KEY, TYPE_KEY, \
+    FALLBACK_KEY
+from bionorm.normalizers.gene.GNormPlus.benchmarks.scoring import reference_rank
+from bionorm.normalizers.gene.GNormPlus.benchmarks.species import PREFIX_MAP
+from bionorm.normalizers.gene.GNormPlus.models import GNormPaper, GeneType, GNormSpeciesAnnotation, SpeciesAnnotationPlacement
+from bionorm.normalizers.gene.GNormPlus.processing import fill_gene_mention_hash, find_in_gene_tree, infer_multiple_genes, \
+    process_abbreviations, rank_by_score_function, remove_gmt, append_gene_ids, preprocess_paper, assign_species, parse_gene_scoring, \
+    HUMAN_ID, GeneScoringEntry
+from bionorm.normalizers.gene.GNormPlus.util import PrefixTree, SINGLE_GENE_PATTERN, MULTI_GENE_PATTERN, GENE_GMT_PATTERN, \
+    HOMO_GMT_PATTERN, NUMBER_PATTERN, split_to_tokens
+
+_TAX_IDS = [HUMAN_ID, '10090', '10116']
+_WORDS = ['the', 'protein', 'binds', 'to', 'expression', 'of', 'was', 'increased', 'in', 'and', 'we', 'found']
+_NAME_SUFFIXES = ['', 'alpha', 'beta', 'p', 'a', 'b', 'IIa']
+_LONG_FORM_WORDS = ['kinase', 'receptor', 'factor', 'binding', 'protein', 'growth', '1', '2']
+
+
+class PipelineData(NamedTuple):
+    gene_tree: PrefixTree
+    family_name_tree: PrefixTree
+    chromosome_tree: PrefixTree
+    gene_scoring: Dict[str, GeneScoringEntry]
+    gene_scoring_df: Dict[str, float]
+
+
+def reference_fill_gene_mention_hash(paper: GNormPaper, gene_mention_hash: Dict[str, Dict[str, str]], mention_hash: Set[str]):
+    for passage in paper.passages:
+        for gene in passage.genes:
+            m_with_tax = f'{gene.text}\t{gene.tax_id.id}'
+            if gene.type == GeneType.GENE:
+                if m_with_tax in gene_mention_hash:
+                    gene_mention_hash[m_with_tax][f'{gene.location.start}\t{gene.location.end}'] = ''
+                else:
+                    gene_mention_hash[m_with_tax] = {f'{gene.location.start}\t{gene.location.end}': ''}
+                    gene_mention_hash[m_with_tax][TYPE_KEY] = gene.type.value
+                    mention_hash.add(gene.text)
+            elif gene.type == GeneType.FAMILY_NAME or gene.type == GeneType.DOMAIN_MOTIF:
+                for g in gene.text.split('|'):
+                    mention_hash.add(g)
+
+
+def reference_find_in_gene_tree(paper: GNormPaper, guaranteed_gene_to_id: Dict[str, str], multi_gene_to_id: Dict[str, str],
+                                gene_tree: PrefixTree, gene_mention_hash: Dict[str, Dict[str, str]]):
+    for gene_mention_tax, hashes in gene_mention_hash.items():
+        mentions, tax = gene_mention_tax.split('\t')
+        for mention in mentions.split('|'):
+            ids = gene_tree.find_mention(mention).split('|')
+
+            for ID in ids:
+                tax_to_id = ID.split(':')
+                if tax_to_id[0] == tax:
+                    hashes[ID_KEY] = tax_to_id[1]
+                    break
+
+            if tax != HUMAN_ID and ID_KEY not in hashes:
+                for ID in ids:
+                    tax_to_id = ID.split(':')
+                    if tax_to_id[0] == HUMAN_ID:
+                        hashes[ID_KEY] = tax_to_id[1]
+                        hashes[FALLBACK_KEY] = HUMAN_ID
+                        break
+
+            if ID_KEY in hashes:
+                gene_id = hashes[ID_KEY]
+                match = re.match(MULTI_GENE_PATTERN, gene_id)
+                if match:
+                    hashes[ID_KEY] = match.group(1)
+                    guaranteed_gene_to_id[gene_mention_tax] = match.group(1)
+                elif re.match(SINGLE_GENE_PATTERN, gene_id):
+                    guaranteed_gene_to_id[gene_mention_tax] = gene_id
+                else:
+                    found_by_chromosome = False
+                    for ID in gene_id.split(','):
+                        if ID in paper.chromosome_hash:
+                            guaranteed_gene_to_id[gene_mention_tax] = ID
+                            found_by_chromosome = True
+                            break
+                    if not found_by_chromosome:
+                        multi_gene_to_id[gene_mention_tax] = gene_id
+
+
+def reference_process_abbreviations(paper: GNormPaper, gene_mention_hash: Dict[str, Dict[str, str]]):
+    for gene_mention_tax, hashes in gene_mention_hash.items():
+        mentions, tax = gene_mention_tax.split('\t')
+        other_form: Optional[str] = None
+        lowered_mention = mentions.lower()
+        if lowered_mention in paper.abb_lf_to_sf:
+            other_form = paper.abb_lf_to_sf[lowered_mention] + '\t' + tax
+        elif lowered_mention in paper.abb_sf_to_lf:
+            other_form = paper.abb_sf_to_lf[lowered_mention] + '\t' + tax
+        if other_form and other_form in gene_mention_hash and ID_KEY in hashes:
+            gene_mention_hash[other_form][ID_KEY] = hashes[ID_KEY]
+
+
+def reference_remove_gmt(paper: GNormPaper, gene_mention_hash: Dict[str, Dict[str, str]], gene_scoring: Dict[str, Tuple[str, int]]):
+    gmts: List[str] = []
+    for gene_mention_tax, hashes in gene_mention_hash.items():
+        mentions, tax = gene_mention_tax.split('\t')
+        if TYPE_KEY in hashes and ID_KEY in hashes and hashes[TYPE_KEY] == GeneType.GENE.value:
+            ID = hashes[ID_KEY]
+            gene_id = ''
+            match1 = re.match(HOMO_GMT_PATTERN, ID)
+            match2 = re.match(GENE_GMT_PATTERN, ID)
+            if match1:
+                gene_id = 'Homo:' + match1.group(2)
+            elif match2:
+                gene_id = 'Gene:' + match2.group(1)
+
+            lf_token_match = False
+            lf_exist = True
+            if gene_id in gene_scoring:
+                if mentions.lower() in paper.abb_sf_to_lf:
+                    token_lexicon = [token.split('-')[0] for token in gene_scoring[gene_id][0].split(',')]
+                    lf_tokens = split_to_tokens(paper.abb_sf_to_lf[mentions.lower()])
+                    for word in token_lexicon:
+                        for mention in lf_tokens:
+                            if word == mention and not re.match(NUMBER_PATTERN, mention):
+                                lf_token_match = True
+                else:
+                    lf_exist = False
+            else:
+                lf_token_match = True
+
+            if not lf_token_match and lf_exist:
+                gmts.append(gene_mention_tax)
+                gmts.append(paper.abb_sf_to_lf[mentions.lower()] + '\t' + tax)
+            elif len(mentions) <= 2 and lf_exist:
+                gmts.append(gene_mention_tax)
+
+    for gmt in gmts:
+        gene_mention_hash.pop(gmt, None)
+
+
+def reference_append_gene_ids(paper: GNormPaper, gene_mention_hash: Dict[str, Dict[str, str]], family_name_tree: PrefixTree):
+    gene_ids: Set[str] = set()
+    for passage in paper.passages:
+        for gene in passage.genes:
+            if gene.type == GeneType.GENE:
+                m_with_tax = gene.text + '\t' + gene.tax_id.id
+                if m_with_tax in gene_mention_hash and ID_KEY in gene_mention_hash[m_with_tax]:
+                    gene_id = gene_mention_hash[m_with_tax][ID_KEY]
+                    gene.id = gene_id
+                    if FALLBACK_KEY in gene_mention_hash[m_with_tax]:
+                        gene.tax_id = GNormSpeciesAnnotation(gene_mention_hash[m_with_tax][FALLBACK_KEY],
+                                                             SpeciesAnnotationPlacement.FALLBACK)
+                    gene_ids.add(gene_id.split('-')[0])
+            elif gene.type == GeneType.FAMILY_NAME or gene.type == GeneType.DOMAIN_MOTIF:
+                res = [ID for ID in family_name_tree.find_mention(gene.text).split('|') if ID in gene_ids]
+                if len(res) != 0:
+                    if gene.type == GeneType.FAMILY_NAME:
+                        gene.type = GeneType.GENE
+                    gene.id = ';'.join(res)
+
+
+def dump(paper: GNormPaper) -> str:
+    """Text of the normalized paper with types, species and IDs of all genes.
+    """
+    genes = '\n'.join(str(gene) for passage in paper.passages for gene in passage.genes)
+    return f'{paper}\n{genes}'
+
+
+def _make_gene_ids(rng: random.Random, ids_count: int) -> str:
+    form = rng.randrange(5)
+    if form == 0:  # Official name
+        return f'*{rng.randrange(ids_count)}-{rng.randrange(ids_count)}'
+    if form == 1:  # Homologene
+        return f'{rng.randrange(ids_count)}-{rng.randrange(ids_count)}'
+    if form == 2:
+        return str(rng.randrange(ids_count))
+    return ','.join(str(rng.randrange(ids_count)) for _ in range(rng.randint(2, 4)))
+
+
+def make_data(names_count: int, passages_count: int, genes_count: int, seed: int) -> Tuple[Paper, PipelineData]:
+    """Make random trees, gene scorings and a paper with ambiguous, abbreviated and family name mentions.
+
+    Returns:
+        Paper and data of the pipeline.
+    """
+    rng = random.Random(seed)
+    ids_count = names_count // 2
+    names = [f'G{i}{rng.choice(_NAME_SUFFIXES)}' for i in range(names_count)]
+    long_forms = [f'{" ".join(rng.sample(_LONG_FORM_WORDS, 2))} {i}' for i in range(names_count // 5)]
+    families = [f'{name} family' for name in names[:names_count // 10]]
+
+    gene_tree = PrefixTree({})
+    for name in names + long_forms:
+        tax_ids = rng.sample(_TAX_IDS, rng.randint(1, 2))
+        gene_tree.insert(name, '|'.join(f'{tax_id}:{_make_gene_ids(rng, ids_count)}' for tax_id in tax_ids))
+    family_name_tree = PrefixTree({})
+    for family in families:
+        family_name_tree.insert(family, '|'.join(str(rng.randrange(ids_count)) for _ in range(3)))
+    chromosome_tree = PrefixTree({})
+    chromosomes = [f'{rng.randint(1, 22)}q{i}' for i in range(20)]
+    for chromosome in chromosomes:
+        chromosome_tree.insert(chromosome, 'r|'.join(str(rng.randrange(ids_count)) for _ in range(2)))
+
+    vocabulary = _LONG_FORM_WORDS + [f'tok{i}' for i in range(50)]
+    gene_scoring = {}
+    for i in range(ids_count):
+        tokens = rng.sample(vocabulary, rng.randint(1, 8))
+        frequencies = [rng.randint(1, 20) for _ in tokens]
+        gene_scoring[f'{rng.choice(["Gene", "Homo"])}:{i}'] = \
+            parse_gene_scoring(','.join(f'{token}-{freq}' for token, freq in zip(tokens, frequencies)), sum(frequencies) + 1)
+    gene_scoring_df = {token: rng.uniform(0.1, 3.0) for token in vocabulary}
+
+    short_forms = rng.sample(names, len(long_forms))
+    abbreviations = [Abbreviation(long_form, short_form) for long_form, short_form in zip(long_forms, short_forms)]
+    mentions = names + long_forms + families + ['h' + name for name in names[:10]] + ['AB', 'x']
+    passages = []
+    for p in range(passages_count):
+        parts: List[str] = []
+        genes: List[GeneMention] = []
+        species: List[SpeciesMention] = []
+        offset = 0
+        for _ in range(genes_count):
+            roll = rng.random()
+            if roll < 0.5:
+                word = rng.choice(mentions)
+                genes.append(GeneMention(Location(offset, offset + len(word)), word))
+            elif roll < 0.6:
+                word = rng.choice(['human', 'mouse', 'rat'])
+                mention = SpeciesMention(Location(offset, offset + len(word)), word)
+                mention.id = _TAX_IDS[['human', 'mouse', 'rat'].index(word)]
+                species.append(mention)
+            elif roll < 0.65:
+                word = rng.choice(chromosomes)
+            else:
+                word = rng.choice(_WORDS)
+            parts.append(word)
+            offset += len(word) + 1
+            if rng.random() < 0.1:
+                parts[-1] += '.'
+                offset += 1
+        passages.append(Passage('title' if p == 0 else f'paragraph {p}', ' '.join(parts), genes=genes, species=species))
+    return Paper('pipeline', passages, abbreviations), PipelineData(gene_tree, family_name_tree, chromosome_tree, gene_scoring,
+                                                                   gene_scoring_df)
+
+
+def prepare_paper(paper: Paper, data: PipelineData) -> GNormPaper:
+    """Pre-process the paper and assign species, the stages before the gene mention hash.
+    """
+    prepared = GNormPaper(deepcopy(paper))
+    preprocess_paper(prepared, data.chromosome_tree)
+    assign_species(prepared, {HUMAN_ID: 0.5, '10090': 0.2}, set(), set(), PREFIX_MAP)
+    return prepared
+
+
+Stage = Tuple[str, Callable[[Dict[str, Any]], None]]
+
+
+def reference_stages(data: PipelineData) -> List[Stage]:
+    reference_scoring = {key: (entry.tokens, entry.total) for key, entry in data.gene_scoring.items()}
+    return [
+        ('fill', lambda s: reference_fill_gene_mention_hash(s['paper'], s['hash'], s['mentions'])),
+        ('gene tree', lambda s: reference_find_in_gene_tree(s['paper'], s['guaranteed'], s['multi'], data.gene_tree, s['hash'])),
+        ('multiple genes', lambda s: reference_infer_multiple_genes(s['guaranteed'], s['multi'], s['hash'])),
+        ('abbreviations', lambda s: reference_process_abbreviations(s['paper'], s['hash'])),
+        ('score function', lambda s: reference_rank(s['paper'], s['hash'], s['mentions'], reference_scoring, data.gene_scoring_df)),
+        ('gmt', lambda s: reference_remove_gmt(s['paper'], s['hash'], reference_scoring)),
+        ('gene ids', lambda s: reference_append_gene_ids(s['paper'], s['hash'], data.family_name_tree)),
+    ]
+
+
+def stages(data: PipelineData) -> List[Stage]:
+    return [
+        ('fill', lambda s: fill_gene_mention_hash(s['paper'], s['hash'], s['mentions'], set())),
+        ('gene tree', lambda s: find_in_gene_tree(s['paper'], s['guaranteed'], s['multi'], data.gene_tree, s['hash'])),
+        ('multiple genes', lambda s: infer_multiple_genes(s['guaranteed'], s['multi'], s['hash'])),
+        ('abbreviations', lambda s: process_abbreviations(s['paper'], s['hash'])),
+        ('score function', lambda s: rank_by_score_function(s['paper'], s['hash'], s['mentions'], data.gene_scoring, data.gene_scoring_df)),
+        ('gmt', lambda s: remove_gmt(s['paper'], s['hash'], data.gene_scoring)),
+        ('gene ids', lambda s: append_gene_ids(s['paper'], s['hash'], data.family_name_tree)),
+    ]
+
+
+def run_stages(prepared: GNormPaper, pipeline_stages: List[Stage], on_stage: Callable[[str, Dict[str, Any]], None] = None) \
+        -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Run the stages on a copy of the prepared paper.
+
+    Returns:
+        Final state and time of every stage in seconds.
+    """
+    state = {'paper': deepcopy(prepared), 'hash': {}, 'mentions': set(), 'guaranteed': {}, 'multi': {}}
+    timings = {}
+    for name, stage in pipeline_stages:
+        start = time.perf_counter()
+        stage(state)
+        timings[name] = time.perf_counter() - start
+        if on_stage is not None:
+            on_stage(name, state)
+    return state, timings
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--names", type=int, default=2000, help='Number of gene names in trees')
+    parser.add_argument("--passages", type=int, default=100)
+    parser.add_argument("--words", type=int, default=200, help='Number of words in every passage')
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(names_count: int, passages_count: int, words_count: int, repeat: int, seed: int):
+    paper, data = make_data(names_count, passages_count, words_count, seed)
+    prepared = prepare_paper(paper, data)
+    expected, _ = run_stages(prepared, reference_stages(data))
+    actual, _ = run_stages(prepared, stages(data))
+    assert dump(actual['paper']) == dump(expected['paper']), 'Pipeline output changed'
+
+    reference_timings = [run_stages(prepared, reference_stages(data))[1] for _ in range(repeat)]
+    timings = [run_stages(prepared, stages(data))[1] for _ in range(repeat)]
+    genes = sum(len(passage.genes) for passage in paper.passages)
+    print(f'{len(paper.passages)} passages, {genes} genes, {len(expected["hash"])} gene mentions with species')
+    for name, _ in stages(data):
+        reference_time = min(timing[name] for timing in reference_timings)
+        table_time = min(timing[name] for timing in timings)
+        print(f'{name:>15}: {reference_time * 1e3:8.2f}ms -> {table_time * 1e3:8.2f}ms ({reference_time / table_time:.1f}x)')
+    reference_total = min(sum(timing.values()) for timing in reference_timings)
+    total = min(sum(timing.values()) for timing in timings)
+    print(f'{"total":>15}: {reference_total * 1e3:8.2f}ms -> {total * 1e3:8.2f}ms ({reference_total / total:.1f}x)')
+
+
+if __name__ == '__main__':
+    parser = setup_argparser()
+    args_ = parser.parse_args()
+    main(args_.names, args_.passages, args_.words, args_.repeat, args_.seed)
@@ -0,0 +1,178 @@
+"""
+Benchmark of gene mention pre-processing with precompiled and memoized type detection against the reference implementation
+building and matching the regexes for every mention, on synthetic gene-heavy papers. Chromosome recognition is left out, so
+only the mentions are timed.
+"""
+
+import argparse
+import random
+import re
+import timeit
+from copy import deepcopy
+from typing import Dict, List, Tuple
+
+from bionorm.common.models import Paper, Passage, GeneMention, Location, Abbreviation
+from bionorm.normalizers.gene.GNormPlus.models import GNormPaper, GeneType, GNormGeneMention, GNormPassage
+from bionorm.normalizers.gene.GNormPlus.processing import preprocess_paper, MentionPreprocessor
+from bionorm.normalizers.gene.GNormPlus.util import PREPROCESS_PATTERN0, PREPROCESS_PATTERN1, PREPROCESS_PATTERN2, PREPROCESS_PATTERN3, \
+    PREPROCESS_PATTERN4, PREPROCESS_PATTERN5, PREPROCESS_PATTERN6, PREPROCESS_PATTERN7, PrefixTree, \
+    FoundMention
+
+_CELL_SUFFIX = '(cell|cells)'
+_FAMILY_NAME_SUFFIX = '(disease|diseases|syndrome|syndromes|tumor|tumour|deficiency|dysgenesis|atrophy|frame|dystrophy|frame|factors|' \
+                      'family|families|superfamily|superfamilies|subfamily|subfamilies|complex|genes|proteins)'
+_DOMAIN_MOTIF_SUFFIX = '(domain|motif|domains|motifs|sequences)'
+
+_WORDS = ['the', 'protein', 'binds', 'to', 'expression', 'of', 'was', 'increased', 'in', 'cells', 'and', 'family', 'domain', 'we']
+_GENES = ['TP53', 'BRCA1', 'IL-2 receptor alpha', 'Rad51p', 'NFnu', 'GATA3a', 'Cdc2b', 'CaMKIIa', 'PKCIIIb', 'TGF-beta1',
+          'EGFR', 'p53 domain', 'Ras proteins', 'T cell receptor', 'HOX genes', 'Notch\nfamily', 'Smad motif']
+
+
+class _NoChromosomes(PrefixTree):
+    def __init__(self):
+        super().__init__({})
+
+    def search_mention_location(self, context: str) -> List[FoundMention]:
+        return []
+
+
+def reference_preprocess_paper(paper: GNormPaper, chromosome_tree: PrefixTree):
+    """Pre-processing building and matching the regexes for every mention.
+    """
+    mention_to_type: Dict[str, GeneType] = {}
+
+    for passage in paper.passages:  # type: GNormPassage
+        for i, annotation in enumerate(passage.genes):  # type: GNormGeneMention
+            mention = annotation.text.lower()
+            m_type = annotation.type
+            end = annotation.location.end
+            trailing = passage.context[end: end + 15]
+
+            if re.match(f'.*{_CELL_SUFFIX}', mention) or re.match(_CELL_SUFFIX, trailing):
+                m_type = GeneType.CELL
+            elif re.match(f'.*{_FAMILY_NAME_SUFFIX}', mention) or re.match(_FAMILY_NAME_SUFFIX, trailing):
+                m_type = GeneType.FAMILY_NAME
+            elif re.match(f'.*{_DOMAIN_MOTIF_SUFFIX}', mention) or re.match(_DOMAIN_MOTIF_SUFFIX, trailing):
+                m_type = GeneType.DOMAIN_MOTIF
+
+            if mention in paper.abb_sf_to_lf:
+                long_form = paper.abb_sf_to_lf[mention]
+                if long_form in mention_to_type:
+                    m_type = mention_to_type[long_form]
+                elif re.match(f'.*{_CELL_SUFFIX}', long_form):
+                    m_type = GeneType.CELL
+                elif re.match(f'.*{_FAMILY_NAME_SUFFIX}', long_form):
+                    m_type = GeneType.FAMILY_NAME
+                elif re.match(f'.*{_DOMAIN_MOTIF_SUFFIX}', long_form):
+                    m_type = GeneType.DOMAIN_MOTIF
+
+            mention_to_type[mention] = m_type
+            passage.genes[i].type = m_type
+
+            if m_type != GeneType.GENE:
+                continue
+
+            mention = annotation.text
+            mtmp0 = re.match(PREPROCESS_PATTERN0, mention)
+            mtmp1 = re.match(PREPROCESS_PATTERN1, mention)
+            mtmp2 = re.match(PREPROCESS_PATTERN2, mention)
+            mtmp3 = re.match(PREPROCESS_PATTERN3, mention)
+            mtmp4 = re.match(PREPROCESS_PATTERN4, mention)
+            mtmp5 = re.match(PREPROCESS_PATTERN5, mention)
+            mtmp6 = re.match(PREPROCESS_PATTERN6, mention)
+            mtmp7 = re.match(PREPROCESS_PATTERN7, mention)
+            if mtmp0:
+                mention += f'|{mtmp0.group(1)}'
+            if mtmp1:
+                mention += f'|{mtmp1.group(1)}'
+            if mtmp2:
+                mention += f'|{mtmp2.group(1)}a{mtmp2.group(2)}'
+            if mtmp3:
+                mention += f'|{mtmp3.group(1)}b{mtmp3.group(2)}'
+            if mtmp4:
+                mention += f'|{mtmp4.group(1)}alpha'
+            if mtmp5:
+                mention += f'|{mtmp5.group(1)}beta'
+            if mtmp6:
+                mention += f'|{mtmp6.group(1)}2{mtmp6.group(2)}'
+            if mtmp7:
+                mention += f'|{mtmp7.group(1)}3{mtmp7.group(2)}'
+            passage.genes[i].text = mention
+
+        locations = chromosome_tree.search_mention_location(passage.context)
+        for location in locations:
+            ids = re.split('r[|,]', location.concept)
+            for ID in ids:
+                paper.chromosome_hash.add(ID)
+
+
+def make_passage(name: str, words_count: int, genes: List[str], rng: random.Random) -> Passage:
+    """Make a passage of random words with gene mentions.
+    """
+    parts: List[str] = []
+    mentions: List[GeneMention] = []
+    offset = 0
+    for _ in range(words_count):
+        if rng.random() < 0.2:
+            word = rng.choice(genes)
+            mentions.append(GeneMention(Location(offset, offset + len(word)), word))
+        else:
+            word = rng.choice(_WORDS)
+        parts.append(word)
+        offset += len(word) + 1
+    return Passage(name, ' '.join(parts), genes=mentions)
+
+
+def make_paper(passages_count: int, words_count: int, seed: int) -> Paper:
+    rng = random.Random(seed)
+    genes = _GENES + [f'{rng.choice(_GENES).split()[0]}{i}' for i in range(50)]
+    abbreviations = [Abbreviation(f'{rng.choice(_GENES)} {rng.choice(_WORDS)}', gene) for gene in rng.sample(genes, 10)]
+    passages = [make_passage(f'paragraph {i}', words_count, genes, rng) for i in range(passages_count)]
+    return Paper('benchmark', passages, abbreviations)
+
+
+def annotations(paper: GNormPaper) -> List[Tuple[str, GeneType]]:
+    return [(gene.text, gene.type) for passage in paper.passages for gene in passage.genes]
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--papers", type=int, default=20)
+    parser.add_argument("--passages", type=int, default=10)
+    parser.add_argument("--words", type=int, default=300, help='Number of words in every passage')
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(papers_count: int, passages_count: int, words_count: int, repeat: int, seed: int):
+    papers = [make_paper(passages_count, words_count, seed + i) for i in range(papers_count)]
+    chromosome_tree = _NoChromosomes()
+    for paper in papers:
+        expected = GNormPaper(deepcopy(paper))
+        reference_preprocess_paper(expected, chromosome_tree)
+        actual = GNormPaper(deepcopy(paper))
+        preprocess_paper(actual, chromosome_tree)
+        assert annotations(actual) == annotations(expected), 'Memoized pre-processing changed genes'
+
+    def run(preprocess, **kwargs):
+        for paper in papers:
+            preprocess(GNormPaper(deepcopy(paper)), chromosome_tree, **kwargs)
+
+    copy_time = min(timeit.repeat(lambda: [GNormPaper(deepcopy(paper)) for paper in papers], number=1, repeat=repeat))
+    reference_time = min(timeit.repeat(lambda: run(reference_preprocess_paper), number=1, repeat=repeat)) - copy_time
+    paper_time = min(timeit.repeat(lambda: run(preprocess_paper), number=1, repeat=repeat)) - copy_time
+    preprocessor = MentionPreprocessor()
+    shared_time = min(timeit.repeat(lambda: run(preprocess_paper, preprocessor=preprocessor), number=1, repeat=repeat)) - copy_time
+    genes = sum(len(passage.genes) for paper in papers for passage in paper.passages)
+    print(f'{len(papers)} papers, {genes} genes')
+    print(f'               reference: {reference_time / genes * 1e6:8.2f}us per gene')
+    print(f'   memoized within paper: {paper_time / genes * 1e6:8.2f}us per gene ({reference_time / paper_time:.1f}x)')
+    print(f'  memoized across papers: {shared_time / genes * 1e6:8.2f}us per gene ({reference_time / shared_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    parser = setup_argparser()
+    args_ = parser.parse_args()
+    main(args_.papers, args_.passages, args_.words, args_.repeat, args_.seed)
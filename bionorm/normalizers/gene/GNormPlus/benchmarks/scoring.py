@@ -0,0 +1,158 @@
+"""
+Benchmark of the gene ranking by score function with pre-parsed token frequencies against the reference parsing the raw
+GeneScoring.txt strings for every candidate gene.
+"""
+
+import argparse
+import random
+import re
+import timeit
+from copy import deepcopy
+from typing import Dict, Set, Tuple, List
+
+from bionorm.common.models import Paper, Abbreviation
+from bionorm.normalizers.gene.GNormPlus.benchmarks.multiple_genes import ID_KEY, to_reference_hash
+from bionorm.normalizers.gene.GNormPlus.models import GNormPaper, GeneType
+from bionorm.normalizers.gene.GNormPlus.processing import rank_by_score_function, parse_gene_scoring, GeneScoringEntry, \
+    GeneMentionRecord, GeneMentionHash
+from bionorm.normalizers.gene.GNormPlus.util import SCORE_PATTERN, split_to_tokens
+
+
+def reference_score_function(gene_id: str, mention_hash: Set[str], long_form: str, scoring_hash: Dict[str, Tuple[str, int]],
+                             scoring_df: Dict[str, float]) -> float:
+    lf_tokens = split_to_tokens(long_form)
+    lf_partial_match = 0
+
+    match = re.match(SCORE_PATTERN, gene_id)
+    if match:
+        gene_id = 'Homo:' + match.group(1)
+    else:
+        gene_id = 'Gene:' + gene_id
+
+    if gene_id in scoring_hash:
+        token_freq: Dict[str, float] = {}
+        term_freq: Dict[str, int] = {}
+
+        scoring = scoring_hash[gene_id]
+        tokens = scoring[0].split(',')
+        for token in tokens:  # type: str
+            gene, freq = token.split('-')
+            term_freq[gene] = int(freq)
+
+        for mention in mention_hash:  # type: str
+            mention_tokens = split_to_tokens(mention)
+            for token in mention_tokens:  # type: str
+                if token in term_freq:
+                    token_freq[token] = term_freq[token]
+
+        score = .0
+        for token, freq in token_freq.items():  # type: str, float
+            for lf_token in lf_tokens:  # type: str
+                if lf_token == token:
+                    lf_partial_match += 1
+
+            if token in scoring_df:
+                tf_i_j = freq / scoring[1]
+                score += tf_i_j * scoring_df[token] * (1.0 / (1.0 - tf_i_j))
+
+        if lf_partial_match > 0:
+            score += lf_partial_match
+
+        return score
+
+    return .0
+
+
+def reference_rank(paper: GNormPaper, gene_mention_hash: Dict[str, Dict[str, str]], mention_hash: Set[str],
+                   gene_scoring: Dict[str, Tuple[str, int]], gene_scoring_df: Dict[str, float]):
+    for gene_mention_tax, hashes in gene_mention_hash.items():
+        if ID_KEY in hashes and ',' in hashes[ID_KEY]:
+            gene_ids: List[str] = hashes[ID_KEY].split(',')
+            max_score = .0
+            target_gene_id = ''
+            for ID in gene_ids:
+                mentions, tax = gene_mention_tax.split('\t')
+                lowered_mention = mentions.lower()
+                if lowered_mention in paper.abb_sf_to_lf:
+                    lf = paper.abb_sf_to_lf[lowered_mention]
+                    score = reference_score_function(ID, mention_hash, lf, gene_scoring, gene_scoring_df)
+                    if score > max_score:
+                        max_score = score
+                        target_gene_id = ID
+            hashes[ID_KEY] = target_gene_id
+
+
+def make_data(genes_count: int, vocabulary_size: int, mentions_count: int, candidates_count: int, seed: int) \
+        -> Tuple[Dict[str, GeneScoringEntry], Dict[str, float], GNormPaper, GeneMentionHash, Set[str]]:
+    """Make random token frequencies of genes and a paper with ambiguous abbreviated mentions.
+
+    Returns:
+        Gene scorings, document frequencies of tokens, paper, gene mention hash and mention hash.
+    """
+    rng = random.Random(seed)
+    vocabulary = [f'tok{i}' for i in range(vocabulary_size)]
+    gene_scoring: Dict[str, GeneScoringEntry] = {}
+    for i in range(genes_count):
+        tokens = rng.sample(vocabulary, rng.randint(1, 20))
+        frequencies = [rng.randint(1, 50) for _ in tokens]
+        key = f'Homo:{i}' if i % 2 else f'Gene:{i}'
+        gene_scoring[key] = parse_gene_scoring(','.join(f'{token}-{freq}' for token, freq in zip(tokens, frequencies)),
+                                               sum(frequencies) + 1)
+    gene_scoring_df = {token: rng.uniform(0.1, 5.0) for token in vocabulary if rng.random() < 0.8}
+
+    abbreviations = []
+    gene_mention_hash: GeneMentionHash = {}
+    mention_hash: Set[str] = set()
+    for i in range(mentions_count):
+        short_form = f'G{i}'
+        long_form = ' '.join(rng.sample(vocabulary, 3))
+        abbreviations.append(Abbreviation(long_form, short_form))
+        ids = [f'9606-{rng.randrange(genes_count)}' if rng.random() < 0.5 else str(rng.randrange(genes_count))
+               for _ in range(candidates_count)]
+        record = gene_mention_hash[short_form, '9606'] = GeneMentionRecord(short_form, '9606', GeneType.GENE)
+        record.ids = tuple(ids)
+        mention_hash.add(short_form)
+        mention_hash.add(long_form)
+    paper = GNormPaper(Paper('benchmark', [], abbreviations))
+    return gene_scoring, gene_scoring_df, paper, gene_mention_hash, mention_hash
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--genes", type=int, default=20000)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--mentions", type=int, default=200, help='Number of ambiguous mentions in paper')
+    parser.add_argument("--candidates", type=int, default=5, help='Number of candidate gene IDs of every mention')
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(genes_count: int, vocabulary_size: int, mentions_count: int, candidates_count: int, repeat: int, seed: int):
+    gene_scoring, gene_scoring_df, paper, gene_mention_hash, mention_hash = \
+        make_data(genes_count, vocabulary_size, mentions_count, candidates_count, seed)
+    reference_scoring = {key: (entry.tokens, entry.total) for key, entry in gene_scoring.items()}
+
+    reference_hash = to_reference_hash(gene_mention_hash)
+    expected = deepcopy(reference_hash)
+    reference_rank(paper, expected, mention_hash, reference_scoring, gene_scoring_df)
+    actual = deepcopy(gene_mention_hash)
+    rank_by_score_function(paper, actual, mention_hash, gene_scoring, gene_scoring_df)
+    assert to_reference_hash(actual) == expected, 'Pre-parsed scoring ranked genes differently'
+
+    reference_time = min(timeit.repeat(
+        lambda: reference_rank(paper, deepcopy(reference_hash), mention_hash, reference_scoring, gene_scoring_df),
+        number=1, repeat=repeat))
+    parsed_time = min(timeit.repeat(
+        lambda: rank_by_score_function(paper, deepcopy(gene_mention_hash), mention_hash, gene_scoring, gene_scoring_df),
+        number=1, repeat=repeat))
+    print(f'{mentions_count} mentions, {candidates_count} candidates each, {len(mention_hash)} mentions in hash')
+    print(f' reference: {reference_time * 1e3:8.2f}ms per paper')
+    print(f'pre-parsed: {parsed_time * 1e3:8.2f}ms per paper ({reference_time / parsed_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    parser = setup_argparser()
+    args_ = parser.parse_args()
+    main(args_.genes, args_.vocabulary, args_.mentions, args_.candidates, args_.repeat, args_.seed)
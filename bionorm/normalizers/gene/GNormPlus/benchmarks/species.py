@@ -0,0 +1,177 @@
+"""
+Benchmark of species assignment with bisect lookups of sentences and species against the reference implementation scanning
+all of them for every gene, on long synthetic documents.
+"""
+
+import argparse
+import random
+import re
+import timeit
+from copy import deepcopy
+from typing import List, Tuple, Dict, Optional
+
+from bionorm.common.models import Paper, Passage, GeneMention, SpeciesMention, Location
+from bionorm.normalizers.gene.GNormPlus.models import GNormPaper, GNormSpeciesAnnotation, SpeciesAnnotationPlacement
+from bionorm.normalizers.gene.GNormPlus.processing import assign_species, SENTENCE_TOKENIZER, HUMAN_ID, TaxonomyFrequency, \
+    HumanViruses, GeneWithoutSpPrefix, PrefixMap
+
+_WORDS = ['the', 'protein', 'binds', 'to', 'expression', 'of', 'was', 'increased', 'in', 'cells', 'and', 'tissue', 'we', 'found']
+_SPECIES = [('human', '9606'), ('mouse', '10090'), ('rat', '10116'), ('yeast', '4932'), ('unknown', None)]
+PREFIX_MAP = {'9606': re.compile(r'^(h)([A-Z].*)$'), '10090': re.compile(r'^(m)([A-Z].*)$')}
+
+
+def reference_assign_species(paper: GNormPaper, taxonomy_frequency: TaxonomyFrequency, human_viruses: HumanViruses,
+                             gene_without_sp_prefix: GeneWithoutSpPrefix, prefix_map: PrefixMap):
+    """Species assignment scanning all sentences and species for every gene.
+    """
+    species_to_num_hash: Dict[str, float] = {}
+    for passage in paper.passages:
+        for species in passage.species:
+            if species.id is None:
+                continue
+            ID = species.id
+            weight = 2.0 if passage.name == 'title' else 1.0
+            if ID in species_to_num_hash:
+                species_to_num_hash[ID] += weight
+            else:
+                species_to_num_hash[ID] = taxonomy_frequency[ID] + weight if ID in taxonomy_frequency else weight
+                if ID in human_viruses:
+                    if HUMAN_ID in species_to_num_hash:
+                        species_to_num_hash[HUMAN_ID] += weight
+                    else:
+                        species_to_num_hash[HUMAN_ID] = taxonomy_frequency[HUMAN_ID] + weight
+
+    major_species = HUMAN_ID
+    max_species = .0
+    for ID, freq in species_to_num_hash.items():
+        if freq > max_species:
+            major_species = ID
+            max_species = freq
+
+    for passage in paper.passages:
+        sentence_offsets: List[Tuple[int, int]] = list(SENTENCE_TOKENIZER.span_tokenize(passage.context))
+
+        for gene in passage.genes:
+            mention = gene.text.split('|')[0]
+            if mention not in gene_without_sp_prefix:
+                for tax_id, prefix_pattern in prefix_map.items():
+                    match = re.match(prefix_pattern, mention)
+                    if match:
+                        gene.text += f'|{match.group(2)}'
+                        gene.tax_id = GNormSpeciesAnnotation(tax_id, SpeciesAnnotationPlacement.PREFIX)
+                        break
+            if gene.tax_id:
+                continue
+
+            start = gene.location.start
+            end = gene.location.end
+            target_sentence = 0
+            for i, (s_start, s_end) in enumerate(sentence_offsets):
+                if s_start <= start <= s_end:
+                    target_sentence = i
+                    break
+
+            s_start, s_end = sentence_offsets[target_sentence]
+            closest_species_start = 0
+            for sp in passage.species:
+                if sp.id is None:
+                    continue
+                sp_start = sp.location.start
+                if start >= sp_start >= s_start and sp_start > closest_species_start:
+                    closest_species_start = sp_start
+                    gene.tax_id = GNormSpeciesAnnotation(sp.id, SpeciesAnnotationPlacement.LEFT)
+            if gene.tax_id:
+                continue
+
+            closest_species_end = 1_000_000
+            for sp in passage.species:
+                if sp.id is None:
+                    continue
+                sp_end = sp.location.end
+                if end <= sp_end <= s_end and sp_end < closest_species_end:
+                    closest_species_end = sp_end
+                    gene.tax_id = GNormSpeciesAnnotation(sp.id, SpeciesAnnotationPlacement.RIGHT)
+            if gene.tax_id:
+                continue
+
+            gene.tax_id = GNormSpeciesAnnotation(major_species, SpeciesAnnotationPlacement.FOCUS)
+
+
+def make_passage(name: str, sentences_count: int, rng: random.Random) -> Passage:
+    """Make a passage of random sentences with gene and species mentions.
+    """
+    parts: List[str] = []
+    genes: List[GeneMention] = []
+    species: List[SpeciesMention] = []
+    length = 0
+    for _ in range(sentences_count):
+        words = [rng.choice(_WORDS).capitalize()] + [rng.choice(_WORDS) for _ in range(rng.randint(4, 20))]
+        for position in range(len(words)):
+            roll = rng.random()
+            if roll < 0.1:
+                words[position] = rng.choice(['hTP53', 'mBRCA1', 'TNF', 'IL6', 'EGFR', 'p53'])
+            elif roll < 0.15:
+                words[position] = rng.choice(_SPECIES)[0]
+        sentence = ' '.join(words) + '.'
+        offset = length
+        for word in sentence[:-1].split(' '):
+            location = Location(offset, offset + len(word))
+            if word[0].isupper() and word != words[0] or word == 'p53':
+                genes.append(GeneMention(location, word))
+            elif word in dict(_SPECIES):
+                mention = SpeciesMention(location, word)
+                mention.id = dict(_SPECIES)[word]
+                species.append(mention)
+            offset += len(word) + 1
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return Passage(name, ' '.join(parts), genes=genes, species=species)
+
+
+def make_paper(passages_count: int, sentences_count: int, seed: int) -> Paper:
+    rng = random.Random(seed)
+    passages = [make_passage('title', 1, rng)]
+    passages.extend(make_passage(f'paragraph {i}', sentences_count, rng) for i in range(passages_count))
+    return Paper('benchmark', passages, [])
+
+
+def annotations(paper: GNormPaper) -> List[Tuple[str, Optional[str], str]]:
+    return [(gene.text, gene.tax_id.id, gene.tax_id.placement) for passage in paper.passages for gene in passage.genes]
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--passages", type=int, default=50)
+    parser.add_argument("--sentences", type=int, default=40, help='Number of sentences in every passage')
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(passages_count: int, sentences_count: int, repeat: int, seed: int):
+    paper = make_paper(passages_count, sentences_count, seed)
+    arguments = ({'9606': 0.5, '10090': 0.2}, {'10298'}, {'hTP53'}, PREFIX_MAP)
+    expected = GNormPaper(deepcopy(paper))
+    reference_assign_species(expected, *arguments)
+    actual = GNormPaper(deepcopy(paper))
+    assign_species(actual, *arguments)
+    assert annotations(actual) == annotations(expected), 'Indexed assignment assigned different species'
+    spans = [list(SENTENCE_TOKENIZER.span_tokenize(passage.context)) for passage in paper.passages]
+
+    reference_time = min(timeit.repeat(lambda: reference_assign_species(GNormPaper(paper), *arguments), number=1, repeat=repeat))
+    indexed_time = min(timeit.repeat(lambda: assign_species(GNormPaper(paper), *arguments), number=1, repeat=repeat))
+    spans_time = min(timeit.repeat(lambda: assign_species(GNormPaper(paper), *arguments, sentence_spans=spans), number=1,
+                                   repeat=repeat))
+    genes = sum(len(passage.genes) for passage in paper.passages)
+    species = sum(len(passage.species) for passage in paper.passages)
+    print(f'{len(paper.passages)} passages, {genes} genes, {species} species, {sum(map(len, spans))} sentences')
+    print(f'           reference: {reference_time * 1e3:8.2f}ms per paper')
+    print(f'             indexed: {indexed_time * 1e3:8.2f}ms per paper ({reference_time / indexed_time:.1f}x)')
+    print(f'indexed, spans given: {spans_time * 1e3:8.2f}ms per paper ({reference_time / spans_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    parser = setup_argparser()
+    args_ = parser.parse_args()
+    main(args_.passages, args_.sentences, args_.repeat, args_.seed)
@@ -0,0 +1,91 @@
+"""
+Benchmark of species prefix matching with the map of literal prefixes against matching the patterns of SPPrefix.txt one by one,
+on gene mentions of synthetic gene-heavy abstracts.
+"""
+
+import argparse
+import random
+import re
+import string
+import timeit
+from pathlib import Path
+from typing import Optional, Tuple, List
+
+from bionorm.normalizers.gene.GNormPlus.config import GNormPlusConfig
+from bionorm.normalizers.gene.GNormPlus.processing import SpeciesPrefixMatcher, PrefixMap
+from bionorm.common.util import iter_lines
+
+_GENES = ['TP53', 'BRCA1', 'EGFR', 'IL6', 'TNF', 'Actb', 'Gapdh', 'MYC', 'p53', 'Cdk2', 'KRAS', 'Il1b', 'PTEN']
+
+
+def reference_match(prefix_map: PrefixMap, mention: str) -> Optional[Tuple[str, str]]:
+    for tax_id, prefix_pattern in prefix_map.items():
+        match = re.match(prefix_pattern, mention)
+        if match:
+            return tax_id, match.group(2)
+    return None
+
+
+def load_prefix_map(path: Path) -> PrefixMap:
+    prefix_map: PrefixMap = {}
+    for line in iter_lines(str(path)):
+        parts = line.rstrip('\n').split('\t')
+        prefix_map[parts[0]] = re.compile(rf'^({parts[1]})([A-Z].*)$')
+    return prefix_map
+
+
+def make_prefix_map(taxa_count: int, rng: random.Random) -> PrefixMap:
+    """Make random prefix patterns of the SPPrefix.txt form: alternation of short lowercase prefixes.
+    """
+    prefix_map: PrefixMap = {}
+    for tax_id in rng.sample(range(1, 10 ** 6), taxa_count):
+        prefixes = {''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(1, 3))) for _ in range(rng.randint(1, 4))}
+        prefix_map[str(tax_id)] = re.compile(rf'^({"|".join(sorted(prefixes))})([A-Z].*)$')
+    return prefix_map
+
+
+def make_mentions(mentions_count: int, rng: random.Random) -> List[str]:
+    """Make gene mentions, a half of them with random lowercase prefixes.
+    """
+    mentions = []
+    for _ in range(mentions_count):
+        mention = rng.choice(_GENES)
+        if rng.random() < 0.5:
+            mention = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(1, 3))) + mention
+        mentions.append(mention)
+    return mentions
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--prefixes", type=lambda x: Path(x), default=None,
+                        help='SPPrefix.txt, random prefixes are used if it is not given or missing')
+    parser.add_argument("--taxa", type=int, default=300, help='Number of random taxa')
+    parser.add_argument("--mentions", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(prefixes_path: Optional[Path], taxa_count: int, mentions_count: int, repeat: int, seed: int):
+    rng = random.Random(seed)
+    prefixes_path = prefixes_path or Path(GNormPlusConfig().prefix_id_map_path)
+    prefix_map = load_prefix_map(prefixes_path) if prefixes_path.exists() else make_prefix_map(taxa_count, rng)
+    mentions = make_mentions(mentions_count, rng)
+    matcher = SpeciesPrefixMatcher(prefix_map)
+
+    expected = [reference_match(prefix_map, mention) for mention in mentions]
+    assert [matcher.match(mention) for mention in mentions] == expected, 'Prefix matcher matched different prefixes'
+
+    reference_time = min(timeit.repeat(lambda: [reference_match(prefix_map, mention) for mention in mentions], number=1, repeat=repeat))
+    matcher_time = min(timeit.repeat(lambda: [matcher.match(mention) for mention in mentions], number=1, repeat=repeat))
+    print(f'{len(prefix_map)} taxa, {len(mentions)} mentions, {sum(match is not None for match in expected)} with prefix')
+    print(f'one by one: {reference_time / len(mentions) * 1e6:8.2f}us per mention')
+    print(f'   matcher: {matcher_time / len(mentions) * 1e6:8.2f}us per mention ({reference_time / matcher_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    parser = setup_argparser()
+    args_ = parser.parse_args()
+    main(args_.prefixes, args_.taxa, args_.mentions, args_.repeat, args_.seed)
@@ -0,0 +1,80 @@
+"""
+Memory and lookup benchmark of prefix tree backends (PrefixTree vs ArrayPrefixTree) on a text prefix tree (PT_*.txt).
+"""
+
+import argparse
+import gc
+import random
+import timeit
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Type, Tuple
+
+from bionorm.normalizers.gene.GNormPlus.util import PrefixTree, ArrayPrefixTree
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--tree", type=lambda x: Path(x), required=True)
+    parser.add_argument("--mentions", type=int, default=10000, help='Number of mentions to look up')
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def collect_mentions(lines: List[str]) -> List[str]:
+    """Restores mentions with concepts from the lines of the text prefix tree.
+    """
+    path: List[str] = []
+    mentions = []
+    for line in lines:
+        parts = line.strip().split('\t')
+        depth = len(parts[0].split('-'))
+        del path[depth - 1:]
+        path.append(parts[1])
+        if len(parts) == 3 and parts[2]:
+            mentions.append(' '.join(path))
+    return mentions
+
+
+def measure_memory(tree_class: Type[PrefixTree], lines: List[str]) -> Tuple[PrefixTree, int, float]:
+    gc.collect()
+    tracemalloc.start()
+    start = datetime.now()
+    tree = tree_class({})
+    tree.load_from_lines(lines)
+    elapsed = (datetime.now() - start).total_seconds()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tree, current, elapsed
+
+
+def main(tree_path: Path, mentions_count: int, repeat: int, seed: int):
+    with open(tree_path, 'r') as f:
+        lines = [line for line in f if line.strip()]
+    mentions = collect_mentions(lines)
+    random.Random(seed).shuffle(mentions)
+    mentions = mentions[:mentions_count]
+    contexts = [f'the {mention} protein binds {other}' for mention, other in zip(mentions, reversed(mentions))]
+    print(f'{tree_path.name}: {len(lines)} nodes, {len(mentions)} mentions to look up')
+
+    results: Dict[str, str] = {}
+    for tree_class in (PrefixTree, ArrayPrefixTree):
+        tree, memory, elapsed = measure_memory(tree_class, lines)
+        find_time = min(timeit.repeat(lambda: [tree.find_mention(mention) for mention in mentions], number=1, repeat=repeat))
+        search_time = min(timeit.repeat(lambda: [tree.search_mention_location(context) for context in contexts], number=1,
+                                        repeat=repeat))
+        print(f'{tree_class.__name__:>16}: memory {memory / 2 ** 20:8.1f} MiB, load {elapsed:6.2f}s, '
+              f'find_mention {find_time / len(mentions) * 1e6:6.2f}us, '
+              f'search_mention_location {search_time / len(contexts) * 1e6:6.2f}us')
+        results[tree_class.__name__] = '\n'.join(str(tree.search_mention_location(context)) for context in contexts[:100])
+        del tree
+    assert results[PrefixTree.__name__] == results[ArrayPrefixTree.__name__], 'Backends returned different results'
+
+
+if __name__ == '__main__':
+    parser = setup_argparser()
+    args_ = parser.parse_args()
+    main(args_.tree, args_.mentions, args_.repeat, args_.seed)
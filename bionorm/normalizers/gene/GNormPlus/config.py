@@ -1,3 +1,4 @@
+from enum import Enum
 from os.path import dirname, join
 from typing import NamedTuple
 
@@ -6,6 +7,15 @@ DATA_PATH = join(MODULE_PATH, 'data')
 TREES_PATH = join(DATA_PATH, 'trees')
 
 
+class TreeBackend(Enum):
+    """Storage of prefix trees built from text files
+    OBJECT — :class:`PrefixTree` with a Python object per node
+    ARRAY — :class:`ArrayPrefixTree` with interned tokens and flat arrays, several times smaller in memory
+    """
+    OBJECT = 0
+    ARRAY = 1
+
+
 class GNormPlusConfig(NamedTuple):
     """Configuration class which holds options and paths to data files.
 
@@ -23,6 +33,9 @@ class GNormPlusConfig(NamedTuple):
     chromosome_tree_path: str = join(TREES_PATH, 'PT_GeneChromosome.txt')
     gene_tree_path: str = join(TREES_PATH, 'PT_Gene.txt')
     family_name_tree_path: str = join(TREES_PATH, 'PT_FamilyName.txt')
+    use_tree_snapshots: bool = True
+    tree_backend: TreeBackend = TreeBackend.OBJECT
+    preprocessing_cache_size: int = 1 << 16
 
 
 TEST_CONFIG = GNormPlusConfig(
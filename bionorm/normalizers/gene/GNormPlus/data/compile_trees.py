@@ -0,0 +1,30 @@
+"""
+Compile text prefix trees (PT_*.txt) into binary snapshots, which are loaded by GNormPlus with mmap instead of rebuilding the trees.
+"""
+
+import argparse
+from pathlib import Path
+from typing import List
+
+from tqdm import tqdm
+
+from bionorm.normalizers.gene.GNormPlus.util import compile_snapshot
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--trees", type=lambda x: Path(x), nargs='+', required=True)
+    return parser
+
+
+def main(trees: List[Path]):
+    for tree in tqdm(trees, 'Compiling trees'):
+        snapshot = compile_snapshot(str(tree))
+        print(f'{tree.name} -> {snapshot}')
+
+
+if __name__ == '__main__':
+    parser = setup_argparser()
+    args_ = parser.parse_args()
+    main(args_.trees)
@@ -1,25 +1,124 @@
 import math
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Set, Dict, List, Tuple, Pattern
-
-from tqdm import tqdm
+from os.path import exists, getmtime
+from typing import Set, Dict, List, Tuple, Pattern, NamedTuple, Optional, Any, Sequence
 
 from bionorm.common.models import Paper
-from bionorm.common.util import process_file
-from bionorm.normalizers.gene.GNormPlus.config import GNormPlusConfig
-from bionorm.normalizers.gene.GNormPlus.models.paper import GNormPaper
+from bionorm.common.util import process_file, iter_lines
+from bionorm.normalizers.gene.GNormPlus.config import GNormPlusConfig, TreeBackend
+from bionorm.normalizers.gene.GNormPlus.models.paper import GNormPaper, GeneType
 from bionorm.normalizers.gene.GNormPlus.processing import fill_gene_mention_hash, find_in_gene_tree, infer_multiple_genes, \
-    process_abbreviations, rank_by_score_function, remove_gmt, append_gene_ids, preprocess_paper, assign_species
-from bionorm.normalizers.gene.GNormPlus.util import PrefixTree
+    process_abbreviations, rank_by_score_function, remove_gmt, append_gene_ids, preprocess_paper, assign_species, GeneScoringEntry, \
+    parse_gene_scoring, SentenceSpans, SpeciesPrefixMatcher, MentionPreprocessor, GeneMentionHash, GuaranteedGeneToID, MultiGeneToId
+from bionorm.normalizers.gene.GNormPlus.util import PrefixTree, ArrayPrefixTree, snapshot_path, compile_snapshot
 
 
 def _process_tree(path: str, tree: PrefixTree, *, verbose: bool = False, message: str = ''):
-    with open(path, 'r') as f:
-        lines = f.readlines()
+    tree.load_from_lines(line for line in iter_lines(path, verbose=verbose, message=message) if line.strip())
+
+
+def _usable_snapshot(path: str, use_snapshot: bool) -> bool:
+    snapshot = snapshot_path(path)
+    return use_snapshot and exists(snapshot) and (not exists(path) or getmtime(snapshot) >= getmtime(path))
+
+
+def _load_tree(path: str, suffix_translation_map: Dict[str, str], *, use_snapshot: bool = True,
+               backend: TreeBackend = TreeBackend.OBJECT, verbose: bool = False, message: str = '') -> PrefixTree:
+    if _usable_snapshot(path, use_snapshot):
+        snapshot = snapshot_path(path)
         if verbose:
-            lines = tqdm(lines, message)
-        tree.load_from_lines(lines)
+            print(f'{message} from snapshot {snapshot}')
+        tree = ArrayPrefixTree(suffix_translation_map)
+        tree.load_snapshot(snapshot)
+        return tree
+    tree = ArrayPrefixTree(suffix_translation_map) if backend == TreeBackend.ARRAY else PrefixTree(suffix_translation_map)
+    _process_tree(path, tree, verbose=verbose, message=message)
+    return tree
+
+
+def _has_family_names(paper: GNormPaper) -> bool:
+    return any(gene.type == GeneType.FAMILY_NAME or gene.type == GeneType.DOMAIN_MOTIF
+               for passage in paper.passages for gene in passage.genes)
+
+
+class _Resource(NamedTuple):
+    """Resource of the normalizer.
+
+    Attributes:
+        attributes (Tuple[str, ...]):
+            Attributes of the normalizer filled by the loader.
+        loader (str):
+            Name of the normalizer method loading the resource.
+        in_process (bool):
+            Whether to always load the resource in the current process, even with parallel loading.
+            Is used for the compiled regexes, as unpickling compiles them again.
+    """
+    attributes: Tuple[str, ...]
+    loader: str
+    in_process: bool = False
+
+
+_RESOURCES: Dict[str, _Resource] = {
+    'gene_tree': _Resource(('gene_tree',), '_load_gene_tree'),
+    'gene_scoring': _Resource(('gene_scoring',), '_load_gene_scoring'),
+    'gene_scoring_df': _Resource(('gene_scoring_df', 'gene_scoring_df_sum'), '_load_gene_scoring_df'),
+    'chromosome_tree': _Resource(('chromosome_tree',), '_load_chromosome_tree'),
+    'family_name_tree': _Resource(('family_name_tree',), '_load_family_name_tree'),
+    'gene_without_sp_prefix': _Resource(('gene_without_sp_prefix',), '_load_gene_without_sp_prefix'),
+    'suffix_translation_map': _Resource(('suffix_translation_map',), '_load_suffix_translation_map', in_process=True),
+    'prefix_map': _Resource(('prefix_map', 'prefix_matcher'), '_load_prefix_map', in_process=True),
+    'taxonomy_frequency': _Resource(('taxonomy_frequency',), '_load_taxonomy_frequency'),
+    'human_viruses': _Resource(('human_viruses',), '_load_human_viruses'),
+    'filtering': _Resource(('filtering',), '_load_filtering', in_process=True),
+}
+
+_TREE_PATHS: Dict[str, str] = {
+    'gene_tree': 'gene_tree_path',
+    'chromosome_tree': 'chromosome_tree_path',
+    'family_name_tree': 'family_name_tree_path',
+}
+
+LAZY_RESOURCES = ('family_name_tree', 'filtering')
+
+
+class _LazyResource:
+    """Non-data descriptor loading the resource on the first access.
+
+    The loaded value is stored in the instance dictionary, which shadows the descriptor afterwards.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, instance: Optional['GNormPlus'], owner):
+        if instance is None:
+            return self
+        instance._load_resource(self.name)
+        return instance.__dict__[self.name]
+
+
+def _load_in_worker(config: GNormPlusConfig, name: str) -> Tuple[Dict[str, Any], float]:
+    normalizer = GNormPlus(config)
+    normalizer._load_resource(name)
+    values = {attribute: getattr(normalizer, attribute) for attribute in _RESOURCES[name].attributes if hasattr(normalizer, attribute)}
+    return values, normalizer.load_timings[name]
+
+
+def _compile_in_worker(tree_path: str) -> float:
+    start_time = datetime.now()
+    snapshot = snapshot_path(tree_path)
+    # Written under a temporary name, so other processes never map a partially written snapshot
+    temporary = f'{snapshot}.{os.getpid()}.tmp'
+    try:
+        compile_snapshot(tree_path, temporary)
+        os.replace(temporary, snapshot)
+    finally:
+        if exists(temporary):
+            os.remove(temporary)
+    return (datetime.now() - start_time).total_seconds()
 
 
 class GNormPlus:
@@ -31,18 +130,26 @@ class GNormPlus:
     Attributes:
         config (GNormPlusConfig):
             Config for normalizer.
+        load_timings (Dict[str, float]):
+            Time in seconds spent on loading of every resource.
     """
 
+    family_name_tree = _LazyResource('family_name_tree')
+    filtering = _LazyResource('filtering')
+
     def __init__(self, config: GNormPlusConfig):
         self.config = config
+        self.load_timings: Dict[str, float] = {}
         self.gene_without_sp_prefix: Set[str] = set()
         self.suffix_translation_map: Dict[str, str] = {}
         self.prefix_map: Dict[str, Pattern[str]] = {}
+        self.prefix_matcher = SpeciesPrefixMatcher(self.prefix_map)
         self.taxonomy_frequency: Dict[str, float] = {}
         self.human_viruses: Set[str] = set()
         self.filtering: Set[Pattern[str]] = set()
-        self.gene_scoring: Dict[str, Tuple[str, int]] = {}
+        self.gene_scoring: Dict[str, GeneScoringEntry] = {}
         self.gene_scoring_df: Dict[str, float] = {}
+        self.mention_preprocessor = MentionPreprocessor(config.preprocessing_cache_size)
 
         self.chromosome_tree = PrefixTree(self.suffix_translation_map)
         self.gene_tree = PrefixTree(self.suffix_translation_map)
@@ -57,45 +164,126 @@ class GNormPlus:
         """
         return GNormPlus(GNormPlusConfig())
 
-    def load_data(self, *, verbose: bool = False) -> None:
+    def load_data(self, *, verbose: bool = False, workers: int = 1, lazy: bool = False) -> None:
         """Loads the data used by normalizer.
 
         Args:
             verbose (:obj:`bool`, defaults to :obj:`False`):
                 Whether to output verbose information about loading.
+            workers (:obj:`int`, defaults to 1):
+                Number of processes parsing the resources. With 1 everything is loaded one by one in the current process.
+                Trees are never transferred from workers: with use_tree_snapshots of config workers compile missing snapshots
+                (so the trees are ArrayPrefixTree) and they are mapped in the current process, otherwise trees are built in
+                the current process.
+            lazy (:obj:`bool`, defaults to :obj:`False`):
+                Whether to postpone loading of rarely used resources (see LAZY_RESOURCES) until the first access.
+                normalize() loads the family name tree for the first paper with family name or domain/motif genes, that
+                paper pays the full load. Filtering is only loaded if it is accessed directly, as its use is disabled.
+
+        Notes:
+            Time spent on every resource (in seconds) is saved to load_timings.
         """
         start_time = datetime.now()
 
         if verbose:
             print(f'Loading dictionaries…')
-        _process_tree(self.config.gene_tree_path, self.gene_tree, verbose=verbose,
-                      message='Loading gene tree')
+        names = [name for name in _RESOURCES if not lazy or name not in LAZY_RESOURCES]
+        if workers > 1:
+            self._load_parallel(names, workers)
+        else:
+            for name in names:
+                self._load_resource(name, verbose=verbose)
+        if lazy:
+            for name in LAZY_RESOURCES:
+                # Drop the empty value from __init__, so the attribute is looked up in the class and loaded on access
+                self.__dict__.pop(name, None)
+
+        if verbose:
+            for name, elapsed in self.load_timings.items():
+                print(f'{name:>24}: {elapsed:.3f}s')
+            print(f'Dictionaries loading took {datetime.now() - start_time}s')
+
+    def _load_resource(self, name: str, *, verbose: bool = False):
+        start_time = datetime.now()
+        getattr(self, _RESOURCES[name].loader)(verbose)
+        self.load_timings[name] = (datetime.now() - start_time).total_seconds()
+
+    def _load_parallel(self, names: List[str], workers: int):
+        # Trees are never sent between processes, as unpickling a tree of nodes takes longer than building it.
+        # Workers compile missing snapshots which are mapped here, without snapshots trees are built here.
+        compiled = [name for name in names if name in _TREE_PATHS and self.config.use_tree_snapshots and not self._has_tree_snapshot(name)]
+        in_process = [name for name in names if name not in compiled and (_RESOURCES[name].in_process or name in _TREE_PATHS)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            compile_futures = {name: executor.submit(_compile_in_worker, getattr(self.config, _TREE_PATHS[name])) for name in compiled}
+            futures = {name: executor.submit(_load_in_worker, self.config, name)
+                       for name in names if name not in in_process and name not in compiled}
+            # Resources which are cheap to load here or expensive to transfer are loaded while the pool is busy
+            for name in in_process:
+                self._load_resource(name)
+            for name, future in futures.items():
+                values, elapsed = future.result()
+                for attribute, value in values.items():
+                    setattr(self, attribute, value)
+                self.load_timings[name] = elapsed
+            for name, future in compile_futures.items():
+                try:
+                    elapsed = future.result()
+                except OSError:  # The snapshot can't be written next to the tree, it's built from the text file here
+                    elapsed = .0
+                self._load_resource(name)
+                self.load_timings[name] += elapsed
+
+    def _has_tree_snapshot(self, name: str) -> bool:
+        return name in _TREE_PATHS and _usable_snapshot(getattr(self.config, _TREE_PATHS[name]), self.config.use_tree_snapshots)
+
+    def _load_tree_resource(self, name: str, verbose: bool, message: str):
+        setattr(self, name, _load_tree(getattr(self.config, _TREE_PATHS[name]), self.suffix_translation_map,
+                                       use_snapshot=self.config.use_tree_snapshots, backend=self.config.tree_backend,
+                                       verbose=verbose, message=message))
+
+    def _load_gene_tree(self, verbose: bool):
+        self._load_tree_resource('gene_tree', verbose, 'Loading gene tree')
+
+    def _load_chromosome_tree(self, verbose: bool):
+        self._load_tree_resource('chromosome_tree', verbose, 'Loading chromosome tree')
+
+    def _load_family_name_tree(self, verbose: bool):
+        self._load_tree_resource('family_name_tree', verbose, 'Loading family name tree')
+
+    def _load_gene_scoring(self, verbose: bool):
         process_file(self.config.gene_scoring_path, self._process_gene_scoring, verbose=verbose,
                      message='Loading gene scorings')
+
+    def _load_gene_scoring_df(self, verbose: bool):
         process_file(self.config.gene_scoring_df_path, self._process_gene_scoring_df, verbose=verbose,
                      message='Loading gene scorings DF')
 
-        _process_tree(self.config.chromosome_tree_path, self.chromosome_tree, verbose=verbose,
-                      message='Loading chromosome tree')
-        _process_tree(self.config.family_name_tree_path, self.family_name_tree, verbose=verbose,
-                      message='Loading family name tree')
-
+    def _load_gene_without_sp_prefix(self, verbose: bool):
         process_file(self.config.gene_without_sp_prefix_path, self._process_gene_without_sp_prefix, verbose=verbose,
                      message='Loading genes without special prefix')
+
+    def _load_suffix_translation_map(self, verbose: bool):
         process_file(self.config.suffix_translation_map_path, self._process_suffix_translation_map, verbose=verbose,
                      message='Loading suffix translation map')
+
+    def _load_prefix_map(self, verbose: bool):
         process_file(self.config.prefix_id_map_path, self._process_prefix_map, verbose=verbose,
                      message='Loading prefix map')
+        self.prefix_matcher = SpeciesPrefixMatcher(self.prefix_map)
+
+    def _load_taxonomy_frequency(self, verbose: bool):
         process_file(self.config.taxonomy_freq_map_path, self._process_taxonomy_frequency, verbose=verbose,
                      message='Loading taxonomy frequency')
+
+    def _load_human_viruses(self, verbose: bool):
         process_file(self.config.virus_human_list_path, self._process_virus_to_human, verbose=verbose,
                      message='Loading human virus list')
+
+    def _load_filtering(self, verbose: bool):
+        self.filtering = set()
         process_file(self.config.filtering_path, self._process_filtering, verbose=verbose,
                      message='Loading filtering')
 
-        if verbose:
-            print(f'Dictionaries loading took {datetime.now() - start_time}s')
-
     def _process_gene_without_sp_prefix(self, line: str):
         self.gene_without_sp_prefix.add(line)
 
@@ -120,7 +308,7 @@ class GNormPlus:
 
     def _process_gene_scoring(self, line: str):
         parts: List[str] = line.split('\t')
-        self.gene_scoring[parts[0]] = (parts[1], int(parts[3]))
+        self.gene_scoring[parts[0]] = parse_gene_scoring(parts[1], int(parts[3]))
 
     def _process_gene_scoring_df(self, line: str):
         parts: List[str] = line.split('\t')
@@ -131,19 +319,30 @@ class GNormPlus:
             if count != .0:
                 self.gene_scoring_df[parts[0]] = math.log10(self.gene_scoring_df_sum / count)
 
-    def normalize(self, original_paper: Paper):
+    def normalize(self, original_paper: Paper, *, sentence_spans: Optional[Sequence[SentenceSpans]] = None):
+        """Normalize gene mentions of the paper in-place.
+
+        Args:
+            original_paper (Paper):
+                Paper to normalize.
+            sentence_spans (:obj:`Sequence[SentenceSpans]`, optional):
+                Sentence spans of every passage, if the caller already has them. Computed for species assignment otherwise.
+        """
         paper = GNormPaper(original_paper)
-        gene_mention_hash: Dict[str, Dict[str, str]] = {}
+        gene_mention_hash: GeneMentionHash = {}
         mention_hash: Set[str] = set()
-        guaranteed_gene_to_id: Dict[str, str] = {}
-        multi_gene_to_id: Dict[str, str] = {}
+        guaranteed_gene_to_id: GuaranteedGeneToID = {}
+        multi_gene_to_id: MultiGeneToId = {}
 
-        preprocess_paper(paper, self.chromosome_tree)
-        assign_species(paper, self.taxonomy_frequency, self.human_viruses, self.gene_without_sp_prefix, self.prefix_map)
-        fill_gene_mention_hash(paper, gene_mention_hash, mention_hash, self.filtering)
+        preprocess_paper(paper, self.chromosome_tree, preprocessor=self.mention_preprocessor, lazy_chromosomes=True)
+        assign_species(paper, self.taxonomy_frequency, self.human_viruses, self.gene_without_sp_prefix, self.prefix_matcher,
+                       sentence_spans=sentence_spans)
+        # Filtering in fill_gene_mention_hash is disabled, so the lazy filtering isn't loaded for it
+        fill_gene_mention_hash(paper, gene_mention_hash, mention_hash)
         find_in_gene_tree(paper, guaranteed_gene_to_id, multi_gene_to_id, self.gene_tree, gene_mention_hash)
         infer_multiple_genes(guaranteed_gene_to_id, multi_gene_to_id, gene_mention_hash)
         process_abbreviations(paper, gene_mention_hash)
         rank_by_score_function(paper, gene_mention_hash, mention_hash, self.gene_scoring, self.gene_scoring_df)
         remove_gmt(paper, gene_mention_hash, self.gene_scoring)
-        append_gene_ids(paper, gene_mention_hash, self.family_name_tree)
+        # The lazy family name tree is only loaded by the first paper with family names or domains
+        append_gene_ids(paper, gene_mention_hash, self.family_name_tree if _has_family_names(paper) else None)
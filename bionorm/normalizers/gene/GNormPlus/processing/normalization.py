@@ -1,26 +1,63 @@
 import re
-from typing import Dict, Set, Optional, List, Tuple, Pattern
+from typing import Dict, Set, Optional, List, Pattern, Tuple
 
 from bionorm.normalizers.gene.GNormPlus.models import GNormPaper, GeneType, GNormGeneMention, GNormSpeciesAnnotation, \
     SpeciesAnnotationPlacement, GNormPassage
 from bionorm.normalizers.gene.GNormPlus.processing.species import HUMAN_ID
-from bionorm.normalizers.gene.GNormPlus.processing.scoring import score_function
+from bionorm.normalizers.gene.GNormPlus.processing.scoring import GeneScoringEntry, score_function, get_mention_tokens, \
+    get_token_lexicon
 from bionorm.normalizers.gene.GNormPlus.util import PrefixTree, SINGLE_GENE_PATTERN, MULTI_GENE_PATTERN, GENE_GMT_PATTERN, \
     HOMO_GMT_PATTERN, NUMBER_PATTERN, split_to_tokens
 
-ID_KEY = 'ID'
-TYPE_KEY = 'type'
-FALLBACK_KEY = 'fallback'
-GeneMentionHash = Dict[str, Dict[str, str]]
+GeneMentionKey = Tuple[str, str]
 MentionHash = Set[str]
 Filtering = Set[Pattern[str]]
-GeneScoring = Dict[str, Tuple[str, int]]
+GeneScoring = Dict[str, GeneScoringEntry]
 GeneScoringDF = Dict[str, float]
-GuaranteedGeneToID = Dict[str, str]
-MultiGeneToId = Dict[str, str]
 
 
-def fill_gene_mention_hash(paper: GNormPaper, gene_mention_hash: GeneMentionHash, mention_hash: MentionHash, filtering: Filtering):
+class GeneMentionRecord:
+    """Gene mention of the paper with its species, shared by all of its locations.
+
+    Attributes:
+        mentions (str):
+            Mention with normalization variants, separated by `|`.
+        tax_id (str):
+            Taxonomy ID of the species.
+        type (GeneType):
+            Type of the mention.
+        locations (List[Tuple[int, int]]):
+            Start and end of every location of the mention.
+        ids (:obj:`Tuple[str, ...]`, optional):
+            Candidate gene IDs, None if none are found. They are joined with `,` in the gene ID.
+        fallback (:obj:`str`, optional):
+            Taxonomy ID of the species the gene IDs were taken from, if it's not the species of the mention.
+    """
+    __slots__ = ('mentions', 'tax_id', 'type', 'locations', 'ids', 'fallback')
+
+    def __init__(self, mentions: str, tax_id: str, m_type: GeneType):
+        self.mentions = mentions
+        self.tax_id = tax_id
+        self.type = m_type
+        self.locations: List[Tuple[int, int]] = []
+        self.ids: Optional[Tuple[str, ...]] = None
+        self.fallback: Optional[str] = None
+
+    @property
+    def key(self) -> GeneMentionKey:
+        return self.mentions, self.tax_id
+
+    def __repr__(self):
+        return f'{self.mentions}\t{self.tax_id}\t{self.type}\t{self.ids}\t{self.fallback}'
+
+
+GeneMentionHash = Dict[GeneMentionKey, GeneMentionRecord]
+GuaranteedGeneToID = Dict[GeneMentionKey, str]
+MultiGeneToId = Dict[GeneMentionKey, Tuple[str, ...]]
+
+
+def fill_gene_mention_hash(paper: GNormPaper, gene_mention_hash: GeneMentionHash, mention_hash: MentionHash,
+                           filtering: Optional[Filtering] = None):
     for passage in paper.passages:  # type: Passage
         for gene in passage.genes:  # type: GNormGeneMention
             gene: GNormGeneMention
@@ -30,8 +67,6 @@ def fill_gene_mention_hash(paper: GNormPaper, gene_mention_hash: GeneMentionHash
             m_type = gene.type
             tax_id = gene.tax_id.id
 
-            m_with_tax = f'{mentions}\t{tax_id}'
-
             # Filtering [Disabled]
             found_filter = False
             # for item in filtering:  # type: Pattern[str]
@@ -41,12 +76,11 @@ def fill_gene_mention_hash(paper: GNormPaper, gene_mention_hash: GeneMentionHash
 
             if not found_filter:
                 if m_type == GeneType.GENE:
-                    if m_with_tax in gene_mention_hash:
-                        gene_mention_hash[m_with_tax][f'{start}\t{end}'] = ''
-                    else:
-                        gene_mention_hash[m_with_tax] = {f'{start}\t{end}': ''}
-                        gene_mention_hash[m_with_tax][TYPE_KEY] = m_type.value
+                    record = gene_mention_hash.get((mentions, tax_id))
+                    if record is None:
+                        record = gene_mention_hash[mentions, tax_id] = GeneMentionRecord(mentions, tax_id, m_type)
                         mention_hash.add(mentions)
+                    record.locations.append((start, end))
                 elif m_type == GeneType.FAMILY_NAME or m_type == GeneType.DOMAIN_MOTIF:
                     gms = mentions.split('|')
                     for g in gms:
@@ -58,8 +92,8 @@ def find_in_gene_tree(paper: GNormPaper, guaranteed_gene_to_id: GuaranteedGeneTo
     # Official name
     # Only one gene
     # Chromosome location
-    for gene_mention_tax, hashes in gene_mention_hash.items():  # type: str, Dict[str, str]
-        mentions, tax = gene_mention_tax.split('\t')  # type: str, str
+    for key, record in gene_mention_hash.items():  # type: GeneMentionKey, GeneMentionRecord
+        mentions, tax = key
         gms = mentions.split('|')
         for mention in gms:  # type: str
             id_str = gene_tree.find_mention(mention)
@@ -68,113 +102,116 @@ def find_in_gene_tree(paper: GNormPaper, guaranteed_gene_to_id: GuaranteedGeneTo
             for ID in ids:  # type: str
                 tax_to_id = ID.split(':')  # taxID:geneIDs
                 if tax_to_id[0] == tax:
-                    hashes[ID_KEY] = tax_to_id[1]
+                    record.ids = tuple(tax_to_id[1].split(','))
                     break
 
-            if tax != HUMAN_ID and ID_KEY not in hashes:
+            if tax != HUMAN_ID and record.ids is None:
                 for ID in ids:  # type: str
                     tax_to_id = ID.split(':')
                     if tax_to_id[0] == HUMAN_ID:
-                        hashes[ID_KEY] = tax_to_id[1]
-                        hashes[FALLBACK_KEY] = HUMAN_ID
+                        record.ids = tuple(tax_to_id[1].split(','))
+                        record.fallback = HUMAN_ID
                         break
 
             # Gene ID refinement
-            if ID_KEY in hashes:
-                gene_id = hashes[ID_KEY]
-                match = re.match(MULTI_GENE_PATTERN, gene_id)
+            if record.ids is not None:
+                gene_ids = record.ids
+                # The patterns don't match commas, so only the first ID may match them
+                match = MULTI_GENE_PATTERN.match(gene_ids[0])
                 if match:  # Official name
-                    hashes[ID_KEY] = match.group(1)
-                    guaranteed_gene_to_id[gene_mention_tax] = match.group(1)
-                elif re.match(SINGLE_GENE_PATTERN, gene_id):  # Only one gene
-                    guaranteed_gene_to_id[gene_mention_tax] = gene_id
+                    record.ids = (match.group(1),)
+                    guaranteed_gene_to_id[key] = match.group(1)
+                elif SINGLE_GENE_PATTERN.match(gene_ids[0]):  # Only one gene
+                    guaranteed_gene_to_id[key] = ','.join(gene_ids)
                 else:  # Chromosome location
-                    ids = gene_id.split(',')
                     found_by_chromosome = False
-                    for ID in ids:  # type: str
+                    for ID in gene_ids:  # type: str
                         if ID in paper.chromosome_hash:
-                            guaranteed_gene_to_id[gene_mention_tax] = ID
+                            guaranteed_gene_to_id[key] = ID
                             found_by_chromosome = True
                             break
                     if not found_by_chromosome:
-                        multi_gene_to_id[gene_mention_tax] = gene_id
+                        multi_gene_to_id[key] = gene_ids
 
 
 def infer_multiple_genes(guaranteed_gene_to_id: GuaranteedGeneToID, multi_gene_to_id: MultiGeneToId, gene_mention_hash: GeneMentionHash):
+    """Resolve ambiguous genes to the guaranteed ID among their candidates.
+
+    If several candidates are guaranteed, the one guaranteed first (in the order of guaranteed_gene_to_id) wins.
+    """
     # Multiple genes can be inferred by steps 1 and 2
-    for multi_gene, ids_str in multi_gene_to_id.items():  # type: str, str
-        found_guaranteed = False
-        for guaranteed_id in guaranteed_gene_to_id.values():  # type: str
-            ids = ids_str.split(',')
-            for ID in ids:  # type: str
-                if ID == guaranteed_id:
-                    gene_mention_hash[multi_gene][ID_KEY] = ID
-                    found_guaranteed = True
-                    break
-            if found_guaranteed:
-                break
+    guaranteed_ranks: Dict[str, int] = {}
+    for guaranteed_id in guaranteed_gene_to_id.values():  # type: str
+        guaranteed_ranks.setdefault(guaranteed_id, len(guaranteed_ranks))
+    if not guaranteed_ranks:
+        return
+
+    for multi_gene, gene_ids in multi_gene_to_id.items():  # type: GeneMentionKey, Tuple[str, ...]
+        ranked_ids = [ID for ID in gene_ids if ID in guaranteed_ranks]
+        if ranked_ids:
+            gene_mention_hash[multi_gene].ids = (min(ranked_ids, key=guaranteed_ranks.__getitem__),)
 
 
 def process_abbreviations(paper: GNormPaper, gene_mention_hash: GeneMentionHash):
     # FullName -> Abbreviation
     # Abbreviation -> FullName
-    for gene_mention_tax, hashes in gene_mention_hash.items():  # type: str, Dict[str, str]
-        mentions, tax = gene_mention_tax.split('\t')  # type: str, str
-        other_form: Optional[str] = None
+    for (mentions, tax), record in gene_mention_hash.items():  # type: GeneMentionKey, GeneMentionRecord
+        other_form: Optional[GeneMentionKey] = None
         lowered_mention = mentions.lower()
         if lowered_mention in paper.abb_lf_to_sf:
-            other_form = paper.abb_lf_to_sf[lowered_mention] + '\t' + tax
+            other_form = paper.abb_lf_to_sf[lowered_mention], tax
         elif lowered_mention in paper.abb_sf_to_lf:
-            other_form = paper.abb_sf_to_lf[lowered_mention] + '\t' + tax
-        if other_form and other_form in gene_mention_hash and ID_KEY in hashes:
-            gene_mention_hash[other_form][ID_KEY] = hashes[ID_KEY]
+            other_form = paper.abb_sf_to_lf[lowered_mention], tax
+        if other_form and other_form in gene_mention_hash and record.ids is not None:
+            gene_mention_hash[other_form].ids = record.ids
 
 
 def rank_by_score_function(paper: GNormPaper, gene_mention_hash: GeneMentionHash, mention_hash: MentionHash, gene_scoring: GeneScoring,
                            gene_scoring_df: GeneScoringDF):
     # Ranking by score function (inference network)
-    for gene_mention_tax, hashes in gene_mention_hash.items():  # type: str, Dict[str, str]
-        if ID_KEY in hashes and ',' in hashes[ID_KEY]:
-            gene_ids: List[str] = hashes[ID_KEY].split(',')
+    # Tokens of the mentions are the same for all of the genes, so they are split once per paper
+    mention_tokens: Optional[List[str]] = None
+    for (mentions, tax), record in gene_mention_hash.items():  # type: GeneMentionKey, GeneMentionRecord
+        if record.ids is not None and len(record.ids) > 1:
             max_score = .0
             target_gene_id = ''
-            for ID in gene_ids:
-                mentions, tax = gene_mention_tax.split('\t')
-                lowered_mention = mentions.lower()
-                if lowered_mention in paper.abb_sf_to_lf:
-                    lf = paper.abb_sf_to_lf[lowered_mention]
-                    score = score_function(ID, mention_hash, lf, gene_scoring, gene_scoring_df)
+            lowered_mention = mentions.lower()
+            if lowered_mention in paper.abb_sf_to_lf:
+                lf = paper.abb_sf_to_lf[lowered_mention]
+                lf_tokens = split_to_tokens(lf)
+                if mention_tokens is None:
+                    mention_tokens = get_mention_tokens(mention_hash)
+                for ID in record.ids:
+                    score = score_function(ID, mention_hash, lf, gene_scoring, gene_scoring_df, mention_tokens=mention_tokens,
+                                           lf_tokens=lf_tokens)
                     if score > max_score:
                         max_score = score
                         target_gene_id = ID
-            hashes[ID_KEY] = target_gene_id
+            record.ids = (target_gene_id,)
 
 
 def remove_gmt(paper: GNormPaper, gene_mention_hash: GeneMentionHash, gene_scoring: GeneScoring):
     # The inference network tokens of Abbreviation.ID should contain at least LF tokens
     # The short mention should be filtered if not long form support
-    gmts: List[str] = []
-    for gene_mention_tax, hashes in gene_mention_hash.items():  # type: str, Dict[str, str]
-        mentions, tax = gene_mention_tax.split('\t')  # type: str, str
-        if TYPE_KEY in hashes and ID_KEY in hashes and hashes[TYPE_KEY] == GeneType.GENE.value:
-            ID = hashes[ID_KEY]
+    gmts: List[GeneMentionKey] = []
+    for key, record in gene_mention_hash.items():  # type: GeneMentionKey, GeneMentionRecord
+        mentions, tax = key
+        if record.ids is not None and record.type == GeneType.GENE:
             gene_id = ''
-            match1 = re.match(HOMO_GMT_PATTERN, ID)
-            match2 = re.match(GENE_GMT_PATTERN, ID)
-            if match1:
-                gene_id = 'Homo:' + match1.group(2)
-            elif match2:
-                gene_id = 'Gene:' + match2.group(1)
+            # Several IDs joined with commas match none of the patterns
+            if len(record.ids) == 1:
+                match1 = HOMO_GMT_PATTERN.match(record.ids[0])
+                match2 = GENE_GMT_PATTERN.match(record.ids[0])
+                if match1:
+                    gene_id = 'Homo:' + match1.group(2)
+                elif match2:
+                    gene_id = 'Gene:' + match2.group(1)
 
             lf_token_match = False
             lf_exist = True
             if gene_id in gene_scoring:
                 if mentions.lower() in paper.abb_sf_to_lf:
-                    scoring = gene_scoring[gene_id]
-                    tokens = scoring[0].split(',')
-                    token_lexicon: List[str] = []
-                    for token in tokens:  # type: str
-                        token_lexicon.append(token.split('-')[0])
+                    token_lexicon = get_token_lexicon(gene_scoring[gene_id])
 
                     lf_lower = paper.abb_sf_to_lf[mentions.lower()]
                     lf_tokens = split_to_tokens(lf_lower)
@@ -188,28 +225,31 @@ def remove_gmt(paper: GNormPaper, gene_mention_hash: GeneMentionHash, gene_scori
                 lf_token_match = True
 
             if not lf_token_match and lf_exist:
-                gmts.append(gene_mention_tax)
-                gmts.append(paper.abb_sf_to_lf[mentions.lower()] + '\t' + tax)
+                gmts.append(key)
+                gmts.append((paper.abb_sf_to_lf[mentions.lower()], tax))
             elif len(mentions) <= 2 and lf_exist:
-                gmts.append(gene_mention_tax)
+                gmts.append(key)
 
-    for gmt in gmts:  # type: str
+    for gmt in gmts:  # type: GeneMentionKey
         gene_mention_hash.pop(gmt, None)
 
 
-def append_gene_ids(paper: GNormPaper, gene_mention_hash: GeneMentionHash, family_name_tree: PrefixTree):
+def append_gene_ids(paper: GNormPaper, gene_mention_hash: GeneMentionHash, family_name_tree: Optional[PrefixTree]):
+    """Set IDs of the genes, family names and domains are resolved to the found genes with family_name_tree.
+
+    family_name_tree may be None if the paper has no family name or domain/motif genes.
+    """
     # Append gene IDs
     gene_ids: Set[str] = set()
     for passage in paper.passages:  # type: GNormPassage
         for gene in passage.genes:  # type: GNormGeneMention
             if gene.type == GeneType.GENE:
-                m_with_tax = gene.text + '\t' + gene.tax_id.id
-                if m_with_tax in gene_mention_hash and ID_KEY in gene_mention_hash[m_with_tax]:
-                    gene_id = gene_mention_hash[m_with_tax][ID_KEY]
+                record = gene_mention_hash.get((gene.text, gene.tax_id.id))
+                if record is not None and record.ids is not None:
+                    gene_id = ','.join(record.ids)
                     gene.id = gene_id
-                    if FALLBACK_KEY in gene_mention_hash[m_with_tax]:
-                        gene.tax_id = GNormSpeciesAnnotation(gene_mention_hash[m_with_tax][FALLBACK_KEY],
-                                                             SpeciesAnnotationPlacement.FALLBACK)
+                    if record.fallback is not None:
+                        gene.tax_id = GNormSpeciesAnnotation(record.fallback, SpeciesAnnotationPlacement.FALLBACK)
                     gene_ids.add(gene_id.split('-')[0])
             elif gene.type == GeneType.FAMILY_NAME or gene.type == GeneType.DOMAIN_MOTIF:
                 ids = family_name_tree.find_mention(gene.text)
@@ -1,9 +1,9 @@
 import re
-from typing import Dict
+from typing import Dict, List, Tuple, Pattern, Optional, Any
 
 from bionorm.normalizers.gene.GNormPlus.models import GNormPaper, GeneType, GNormGeneMention, GNormPassage
 from bionorm.normalizers.gene.GNormPlus.util import PREPROCESS_PATTERN0, PREPROCESS_PATTERN1, PREPROCESS_PATTERN2, PREPROCESS_PATTERN3, \
-    PREPROCESS_PATTERN4, PREPROCESS_PATTERN5, PREPROCESS_PATTERN6, PREPROCESS_PATTERN7, PrefixTree, FoundMention
+    PREPROCESS_PATTERN4, PREPROCESS_PATTERN5, PREPROCESS_PATTERN6, PREPROCESS_PATTERN7, PrefixTree, LazyConceptIds
 
 _CELL_SUFFIX = '(cell|cells)'
 _FAMILY_NAME_SUFFIX = '(disease|diseases|syndrome|syndromes|tumor|tumour|deficiency|dysgenesis|atrophy|frame|dystrophy|frame|factors|' \
@@ -12,8 +12,123 @@ _DOMAIN_MOTIF_SUFFIX = '(domain|motif|domains|motifs|sequences)'
 
 _DEFAULT_BOUNDARY_LEN = 15
 
+# Types of the suffixes in the order of their priority
+_SUFFIX_TYPES: List[Tuple[GeneType, Pattern[str]]] = [
+    (GeneType.CELL, re.compile(_CELL_SUFFIX)),
+    (GeneType.FAMILY_NAME, re.compile(_FAMILY_NAME_SUFFIX)),
+    (GeneType.DOMAIN_MOTIF, re.compile(_DOMAIN_MOTIF_SUFFIX)),
+]
 
-def preprocess_paper(paper: GNormPaper, chromosome_tree: PrefixTree):
+
+class MentionPreprocessor:
+    """Precompiled type detection and pre-processing of gene mentions, memoized per mention text.
+
+    Suffix types only depend on the text, so they are computed once for every unique mention and long form. The same holds for
+    the variants appended to gene mentions by PREPROCESS_PATTERN*. One preprocessor may be shared between papers, when the cache
+    is full, the oldest results are evicted.
+
+    Notes:
+        `re.match('.*suffix', text)` finds the suffix anywhere in the first line of the text (`.` doesn't match line breaks),
+        so it's searched there without backtracking of the leading `.*`.
+
+    Attributes:
+        max_size (int):
+            Maximum number of cached results of every kind, 0 disables caching.
+    """
+
+    def __init__(self, max_size: int = 1 << 16):
+        self.max_size = max_size
+        self._suffix_types: Dict[str, Optional[GeneType]] = {}
+        self._variants: Dict[str, str] = {}
+
+    def suffix_type(self, text: str) -> Optional[GeneType]:
+        """Type of the first suffix (by priority) found in the text.
+
+        Args:
+            text (str):
+                Mention or long form of abbreviation.
+
+        Returns:
+            Type of the suffix, None if there are none of them.
+        """
+        if text in self._suffix_types:
+            return self._suffix_types[text]
+        first_line = text.partition('\n')[0]
+        suffix_type = next((gene_type for gene_type, pattern in _SUFFIX_TYPES if pattern.search(first_line)), None)
+        self._put(self._suffix_types, text, suffix_type)
+        return suffix_type
+
+    def variants(self, mention: str) -> str:
+        """Mention with its normalization variants appended, separated by `|`.
+
+        Args:
+            mention (str):
+                Gene mention.
+
+        Returns:
+            Mention with variants.
+        """
+        result = self._variants.get(mention)
+        if result is None:
+            result = _append_variants(mention)
+            self._put(self._variants, mention, result)
+        return result
+
+    def _put(self, cache: Dict[str, Any], key: str, value: Any):
+        if self.max_size > 0:
+            if len(cache) >= self.max_size:
+                del cache[next(iter(cache))]
+            cache[key] = value
+
+
+def _append_variants(mention: str) -> str:
+    mtmp0 = PREPROCESS_PATTERN0.match(mention)
+    mtmp1 = PREPROCESS_PATTERN1.match(mention)
+    mtmp2 = PREPROCESS_PATTERN2.match(mention)
+    mtmp3 = PREPROCESS_PATTERN3.match(mention)
+    mtmp4 = PREPROCESS_PATTERN4.match(mention)
+    mtmp5 = PREPROCESS_PATTERN5.match(mention)
+    mtmp6 = PREPROCESS_PATTERN6.match(mention)
+    mtmp7 = PREPROCESS_PATTERN7.match(mention)
+    if mtmp0:
+        mention += f'|{mtmp0.group(1)}'
+    if mtmp1:
+        mention += f'|{mtmp1.group(1)}'
+    if mtmp2:
+        mention += f'|{mtmp2.group(1)}a{mtmp2.group(2)}'
+    if mtmp3:
+        mention += f'|{mtmp3.group(1)}b{mtmp3.group(2)}'
+    if mtmp4:
+        mention += f'|{mtmp4.group(1)}alpha'
+    if mtmp5:
+        mention += f'|{mtmp5.group(1)}beta'
+    if mtmp6:
+        mention += f'|{mtmp6.group(1)}2{mtmp6.group(2)}'
+    if mtmp7:
+        mention += f'|{mtmp7.group(1)}3{mtmp7.group(2)}'
+    return mention
+
+
+def preprocess_paper(paper: GNormPaper, chromosome_tree: PrefixTree, *, preprocessor: Optional[MentionPreprocessor] = None,
+                     lazy_chromosomes: bool = False):
+    """Detect types of gene mentions, append normalization variants to genes and recognize chromosomes.
+
+    Notes:
+        With lazy_chromosomes chromosome_hash of the paper is :class:`LazyConceptIds`, which searches the passages only until
+        the looked up chromosome IDs are found.
+
+    Args:
+        paper (GNormPaper):
+            Paper to process in-place.
+        chromosome_tree (PrefixTree):
+            Tree of chromosome mentions.
+        preprocessor (:obj:`MentionPreprocessor`, optional):
+            Preprocessor to reuse between papers, a new one is used for the paper if None.
+        lazy_chromosomes (:obj:`bool`, defaults to :obj:`False`):
+            Whether to search chromosomes on the lookups of chromosome_hash instead of all passages at once.
+    """
+    if preprocessor is None:
+        preprocessor = MentionPreprocessor()
     mention_to_type: Dict[str, GeneType] = {}
 
     for passage in paper.passages:  # type: GNormPassage
@@ -24,24 +139,19 @@ def preprocess_paper(paper: GNormPaper, chromosome_tree: PrefixTree):
             trailing = passage.context[end: end + _DEFAULT_BOUNDARY_LEN]
 
             # Check suffix – Gene -> Family/Domain/Cell
-            if re.match(f'.*{_CELL_SUFFIX}', mention) or re.match(_CELL_SUFFIX, trailing):
-                m_type = GeneType.CELL
-            elif re.match(f'.*{_FAMILY_NAME_SUFFIX}', mention) or re.match(_FAMILY_NAME_SUFFIX, trailing):
-                m_type = GeneType.FAMILY_NAME
-            elif re.match(f'.*{_DOMAIN_MOTIF_SUFFIX}', mention) or re.match(_DOMAIN_MOTIF_SUFFIX, trailing):
-                m_type = GeneType.DOMAIN_MOTIF
+            mention_suffix_type = preprocessor.suffix_type(mention)
+            for gene_type, pattern in _SUFFIX_TYPES:
+                if mention_suffix_type is gene_type or pattern.match(trailing):
+                    m_type = gene_type
+                    break
 
             # Abbreviation Resolution
             if mention in paper.abb_sf_to_lf:
                 long_form = paper.abb_sf_to_lf[mention]
                 if long_form in mention_to_type:
                     m_type = mention_to_type[long_form]
-                elif re.match(f'.*{_CELL_SUFFIX}', long_form):
-                    m_type = GeneType.CELL
-                elif re.match(f'.*{_FAMILY_NAME_SUFFIX}', long_form):
-                    m_type = GeneType.FAMILY_NAME
-                elif re.match(f'.*{_DOMAIN_MOTIF_SUFFIX}', long_form):
-                    m_type = GeneType.DOMAIN_MOTIF
+                else:
+                    m_type = preprocessor.suffix_type(long_form) or m_type
 
             mention_to_type[mention] = m_type
             passage.genes[i].type = m_type
@@ -50,38 +160,13 @@ def preprocess_paper(paper: GNormPaper, chromosome_tree: PrefixTree):
                 continue
 
             # Normalization pre-processing
-            mention = annotation.text
-            mtmp0 = re.match(PREPROCESS_PATTERN0, mention)
-            mtmp1 = re.match(PREPROCESS_PATTERN1, mention)
-            mtmp2 = re.match(PREPROCESS_PATTERN2, mention)
-            mtmp3 = re.match(PREPROCESS_PATTERN3, mention)
-            mtmp4 = re.match(PREPROCESS_PATTERN4, mention)
-            mtmp5 = re.match(PREPROCESS_PATTERN5, mention)
-            mtmp6 = re.match(PREPROCESS_PATTERN6, mention)
-            mtmp7 = re.match(PREPROCESS_PATTERN7, mention)
-            if mtmp0:
-                mention += f'|{mtmp0.group(1)}'
-            if mtmp1:
-                mention += f'|{mtmp1.group(1)}'
-            if mtmp2:
-                mention += f'|{mtmp2.group(1)}a{mtmp2.group(2)}'
-            if mtmp3:
-                mention += f'|{mtmp3.group(1)}b{mtmp3.group(2)}'
-            if mtmp4:
-                mention += f'|{mtmp4.group(1)}alpha'
-            if mtmp5:
-                mention += f'|{mtmp5.group(1)}beta'
-            if mtmp6:
-                mention += f'|{mtmp6.group(1)}2{mtmp6.group(2)}'
-            if mtmp7:
-                mention += f'|{mtmp7.group(1)}3{mtmp7.group(2)}'
-            passage.genes[i].text = mention
-
-        # Recognize chromosomes
-        locations = chromosome_tree.search_mention_location(passage.context)
-        for location in locations:  # type: FoundMention
-            ids = re.split('r[|,]', location.concept)
-            for ID in ids:
-                paper.chromosome_hash.add(ID)
+            passage.genes[i].text = preprocessor.variants(annotation.text)
+
+    # Recognize chromosomes
+    contexts = [passage.context for passage in paper.passages]
+    if lazy_chromosomes:
+        paper.chromosome_hash = LazyConceptIds(chromosome_tree, contexts)
+    else:
+        paper.chromosome_hash.update(chromosome_tree.find_concept_ids(contexts))
 
     # Original implementation also has extension to all gene matches. We omit it, as it should be tagger's job.
@@ -1,49 +1,130 @@
 import re
-from typing import Dict, Set, Tuple
+from typing import Dict, Set, List, Iterable, NamedTuple, Optional
 
 from bionorm.normalizers.gene.GNormPlus.util import SCORE_PATTERN, split_to_tokens
 
 
-def score_function(gene_id: str, mention_hash: Set[str], long_form: str, scoring_hash: Dict[str, Tuple[str, int]],
-                   scoring_df: Dict[str, float]) -> float:
-    lf_tokens = split_to_tokens(long_form)
-    lf_partial_match = 0
+class GeneScoringEntry(NamedTuple):
+    """Token frequencies of the gene from GeneScoring.txt.
+
+    Attributes:
+        tokens (str):
+            Comma-separated pairs of token and its frequency, separated by dash.
+        total (int):
+            Total frequency of the tokens.
+        term_freq (:obj:`Dict[str, int]`, optional):
+            Frequencies parsed from tokens (the last one for repeated tokens), None if some of the pairs is malformed.
+    """
+    tokens: str
+    total: int
+    term_freq: Optional[Dict[str, int]]
+
+
+def parse_gene_scoring(tokens: str, total: int) -> GeneScoringEntry:
+    """Parse token frequencies of the gene.
+
+    Args:
+        tokens (str):
+            Comma-separated pairs of token and its frequency.
+        total (int):
+            Total frequency of the tokens.
+
+    Returns:
+        Gene scoring with parsed frequencies.
+    """
+    try:
+        term_freq = _parse_term_freq(tokens)
+    except ValueError:
+        # Malformed pairs fail the same way on scoring as they did before the pre-parsing
+        term_freq = None
+    return GeneScoringEntry(tokens, total, term_freq)
+
+
+def _parse_term_freq(tokens: str) -> Dict[str, int]:
+    term_freq: Dict[str, int] = {}
+    for token in tokens.split(','):  # type: str
+        gene, freq = token.split('-')
+        term_freq[gene] = int(freq)
+    return term_freq
+
+
+def get_term_freq(scoring: GeneScoringEntry) -> Dict[str, int]:
+    return scoring.term_freq if scoring.term_freq is not None else _parse_term_freq(scoring.tokens)
+
+
+def get_token_lexicon(scoring: GeneScoringEntry) -> Iterable[str]:
+    """Tokens of the gene, parsed the lenient way of remove_gmt().
+    """
+    return scoring.term_freq.keys() if scoring.term_freq is not None else [token.split('-')[0] for token in scoring.tokens.split(',')]
+
 
+def get_mention_tokens(mention_hash: Iterable[str]) -> List[str]:
+    """Unique tokens of the mentions of the paper in the order of their first occurrence.
+
+    Args:
+        mention_hash (Iterable[str]):
+            Mentions of the paper.
+
+    Returns:
+        List of tokens.
+    """
+    return list(dict.fromkeys(token for mention in mention_hash for token in split_to_tokens(mention)))
+
+
+def get_scoring_key(gene_id: str) -> str:
     match = re.match(SCORE_PATTERN, gene_id)
-    if match:
-        gene_id = 'Homo:' + match.group(1)
-    else:
-        gene_id = 'Gene:' + gene_id
-
-    if gene_id in scoring_hash:
-        token_freq: Dict[str, float] = {}
-        term_freq: Dict[str, int] = {}
-
-        scoring = scoring_hash[gene_id]
-        tokens = scoring[0].split(',')
-        for token in tokens:  # type: str
-            gene, freq = token.split('-')
-            term_freq[gene] = int(freq)
-
-        for mention in mention_hash:  # type: str
-            mention_tokens = split_to_tokens(mention)
-            for token in mention_tokens:  # type: str
-                if token in term_freq:
-                    token_freq[token] = term_freq[token]
-
-        score = .0
-        for token, freq in token_freq.items():  # type: str, float
-            for lf_token in lf_tokens:  # type: str
-                if lf_token == token:
-                    lf_partial_match += 1
-
-            if token in scoring_df:
-                tf_i_j = freq / scoring[1]
-                score += tf_i_j * scoring_df[token] * (1.0 / (1.0 - tf_i_j))
-
-        if lf_partial_match > 0:
-            score += lf_partial_match
-
-        return score
-
-    return .0
+    return 'Homo:' + match.group(1) if match else 'Gene:' + gene_id
+
+
+def score_function(gene_id: str, mention_hash: Set[str], long_form: str, scoring_hash: Dict[str, GeneScoringEntry],
+                   scoring_df: Dict[str, float], *, mention_tokens: Optional[List[str]] = None,
+                   lf_tokens: Optional[List[str]] = None) -> float:
+    """Score of the gene for the long form of abbreviation.
+
+    Notes:
+        Tokens are summed in the order of their first occurrence in the mentions, so the float score doesn't depend on
+        whether the tokens were precomputed.
+
+    Args:
+        gene_id (str):
+            Candidate gene ID.
+        mention_hash (Set[str]):
+            Mentions of the paper.
+        long_form (str):
+            Long form of abbreviation.
+        scoring_hash (Dict[str, GeneScoringEntry]):
+            Token frequencies of genes.
+        scoring_df (Dict[str, float]):
+            Inverse document frequencies of tokens.
+        mention_tokens (:obj:`List[str]`, optional):
+            Result of get_mention_tokens() for mention_hash, computed if None.
+        lf_tokens (:obj:`List[str]`, optional):
+            Tokens of long form, computed if None.
+
+    Returns:
+        Score of the gene, 0 if it has no token frequencies.
+    """
+    scoring = scoring_hash.get(get_scoring_key(gene_id))
+    if scoring is None:
+        return .0
+
+    if lf_tokens is None:
+        lf_tokens = split_to_tokens(long_form)
+    if mention_tokens is None:
+        mention_tokens = get_mention_tokens(mention_hash)
+    term_freq = get_term_freq(scoring)
+    lf_partial_match = 0
+    score = .0
+    for token in mention_tokens:  # type: str
+        freq = term_freq.get(token)
+        if freq is None:
+            continue
+        lf_partial_match += lf_tokens.count(token)
+        if token in scoring_df:
+            tf_i_j = freq / scoring.total
+            score += tf_i_j * scoring_df[token] * (1.0 / (1.0 - tf_i_j))
+
+    if lf_partial_match > 0:
+        score += lf_partial_match
+
+    return score
@@ -1,5 +1,6 @@
 import re
-from typing import List, Tuple, Dict, Set, Pattern
+from bisect import bisect_left, bisect_right
+from typing import List, Tuple, Dict, Set, Pattern, Optional, Sequence, Union
 
 from nltk import tokenize
 
@@ -13,11 +14,192 @@ HumanViruses = Set[str]
 GeneWithoutSpPrefix = Set[str]
 PrefixMap = Dict[str, Pattern[str]]
 
+SentenceSpans = Sequence[Tuple[int, int]]
+
 SENTENCE_TOKENIZER = tokenize.PunktSentenceTokenizer()
+_BACKREFERENCE_PATTERN = re.compile(r'\\\d|\(\?P=')
+_PREFIX_PATTERN_FORM = re.compile(r'\^\((.*)\)\(\[A-Z\]\.\*\)\$', re.DOTALL)
+# Bound of species end on the right of gene
+_MAX_SPECIES_END = 1_000_000
+
+
+class SpeciesPrefixMatcher:
+    """Finds the first pattern of prefix map (in its order) matching the gene mention in a single pass.
+
+    Patterns of SPPrefix.txt have the form `^(prefix|prefix...)([A-Z].*)$` with literal prefixes. Such prefixes are put into one
+    map to the smallest index of their patterns, and the mention is checked for every prefix length followed by an uppercase
+    letter. Other patterns are combined into one regex with an alternative per pattern in the map order.
+
+    Notes:
+        The mention without prefix is taken from the matching pattern itself, so it's the same as with matching the patterns
+        one by one. If the patterns can't be combined (they have backreferences, flags or clashing group names), they are
+        matched one by one.
+    """
+
+    def __init__(self, prefix_map: PrefixMap):
+        """
+        Args:
+            prefix_map (PrefixMap):
+                Map from taxonomy ID to pattern, which matches the gene with the species prefix in group 2.
+        """
+        self.prefix_map = prefix_map
+        self._tax_ids = list(prefix_map)
+        # Smallest index of the patterns for every literal prefix
+        self._prefix_ranks: Optional[Dict[str, int]] = {}
+        for rank, pattern in enumerate(prefix_map.values()):
+            prefixes = _literal_prefixes(pattern)
+            if prefixes is None:
+                self._prefix_ranks = None
+                break
+            for prefix in prefixes:
+                self._prefix_ranks.setdefault(prefix, rank)
+        self._max_prefix_length = max(map(len, self._prefix_ranks), default=0) if self._prefix_ranks is not None else 0
+
+        self._pattern: Optional[Pattern[str]] = None
+        default_flags = re.compile('').flags
+        if self._prefix_ranks is None and all(pattern.flags == default_flags and not _BACKREFERENCE_PATTERN.search(pattern.pattern)
+                                              for pattern in prefix_map.values()):
+            try:
+                self._pattern = re.compile('|'.join(f'(?P<_sp{i}>{pattern.pattern})' for i, pattern in enumerate(prefix_map.values())))
+            except re.error:
+                self._pattern = None
+
+    def match(self, mention: str) -> Optional[Tuple[str, str]]:
+        """Find the species prefix of the mention.
+
+        Args:
+            mention (str):
+                Gene mention.
+
+        Returns:
+            Taxonomy ID of the first matching pattern and the mention without prefix, None if none of them match.
+        """
+        if self._prefix_ranks is not None:
+            rank = self._find_prefix_rank(mention)
+            if rank is None:
+                return None
+            tax_id = self._tax_ids[rank]
+        elif self._pattern is not None:
+            match = self._pattern.match(mention)
+            if match is None:
+                return None
+            # The group of the whole alternative is closed last
+            tax_id = self._tax_ids[int(match.lastgroup[len('_sp'):])]
+        else:
+            for tax_id, prefix_pattern in self.prefix_map.items():  # type: str, Pattern[str]
+                match = re.match(prefix_pattern, mention)
+                if match:
+                    return tax_id, match.group(2)
+            return None
+        return tax_id, self.prefix_map[tax_id].match(mention).group(2)
+
+    def _find_prefix_rank(self, mention: str) -> Optional[int]:
+        # `.*$` doesn't match line breaks, except for the last character
+        newline = mention.find('\n')
+        if newline != -1 and newline != len(mention) - 1:
+            return None
+        best: Optional[int] = None
+        for length in range(min(self._max_prefix_length, len(mention) - 1) + 1):
+            if 'A' <= mention[length] <= 'Z':
+                rank = self._prefix_ranks.get(mention[:length])
+                if rank is not None and (best is None or rank < best):
+                    best = rank
+        return best
+
+
+def _literal_prefixes(pattern: Pattern[str]) -> Optional[List[str]]:
+    """Literal prefixes of the pattern of SPPrefix.txt form, None if it has another form.
+    """
+    match = _PREFIX_PATTERN_FORM.match(pattern.pattern)
+    if match is None or pattern.flags != re.compile('').flags:
+        return None
+    prefixes = match.group(1).split('|')
+    return prefixes if all(re.escape(prefix) == prefix for prefix in prefixes) else None
+
+
+class SentenceIndex:
+    """Sentence spans of passage with bisect lookup of the sentence containing the position.
+
+    Notes:
+        Spans should be sorted and non-overlapping, as the ones of PunktSentenceTokenizer.span_tokenize.
+    """
+
+    def __init__(self, spans: SentenceSpans):
+        self.spans = spans
+        self._ends = [end for _, end in spans]
+
+    def find(self, position: int) -> int:
+        """Find the first sentence containing the position (bounds inclusive).
+
+        Returns:
+            Index of the sentence, 0 if none of them contains the position.
+        """
+        i = bisect_left(self._ends, position)
+        return i if i < len(self.spans) and self.spans[i][0] <= position else 0
+
+
+class SpeciesIndex:
+    """Species mentions of passage sorted by their starts and ends for bisect lookups of the closest species.
+
+    Mentions without IDs are skipped. Among mentions with the same start (end) the first one in passage wins.
+    """
+
+    def __init__(self, species: List[SpeciesMention]):
+        species = [sp for sp in species if sp.id is not None]
+        # Sorting is stable, so the mentions with equal positions keep their order
+        by_start = sorted(species, key=lambda sp: sp.location.start)
+        self._starts = [sp.location.start for sp in by_start]
+        self._start_ids = [sp.id for sp in by_start]
+        by_end = sorted(species, key=lambda sp: sp.location.end)
+        self._ends = [sp.location.end for sp in by_end]
+        self._end_ids = [sp.id for sp in by_end]
+
+    def find_left(self, start: int, sentence_start: int) -> Optional[str]:
+        """Find the species with the greatest positive start in [sentence_start, start].
+        """
+        i = bisect_right(self._starts, start)
+        if i == 0:
+            return None
+        sp_start = self._starts[i - 1]
+        if sp_start < sentence_start or sp_start <= 0:
+            return None
+        return self._start_ids[bisect_left(self._starts, sp_start)]
+
+    def find_right(self, end: int, sentence_end: int) -> Optional[str]:
+        """Find the species with the smallest end in [end, sentence_end] below _MAX_SPECIES_END.
+        """
+        i = bisect_left(self._ends, end)
+        if i == len(self._ends):
+            return None
+        sp_end = self._ends[i]
+        if sp_end > sentence_end or sp_end >= _MAX_SPECIES_END:
+            return None
+        return self._end_ids[i]
 
 
 def assign_species(paper: GNormPaper, taxonomy_frequency: TaxonomyFrequency, human_viruses: HumanViruses,
-                   gene_without_sp_prefix: GeneWithoutSpPrefix, prefix_map: PrefixMap):
+                   gene_without_sp_prefix: GeneWithoutSpPrefix, prefix_map: Union[PrefixMap, SpeciesPrefixMatcher], *,
+                   sentence_spans: Optional[Sequence[SentenceSpans]] = None):
+    """Assign species to the gene mentions of paper.
+
+    Species are taken from the gene prefix, the closest species mention in the sentence on the left or on the right,
+    or the major species of paper.
+
+    Args:
+        paper (GNormPaper):
+            Paper to process.
+        taxonomy_frequency (TaxonomyFrequency):
+            Prior frequencies of species.
+        human_viruses (HumanViruses):
+            Species of viruses, which count as human.
+        gene_without_sp_prefix (GeneWithoutSpPrefix):
+            Genes, which look like having a species prefix, but don't.
+        prefix_map (Union[PrefixMap, SpeciesPrefixMatcher]):
+            Patterns of species prefixes of genes, combined into a matcher if it's a map.
+        sentence_spans (:obj:`Sequence[SentenceSpans]`, optional):
+            Sentence spans of every passage, if they are already known. Computed with SENTENCE_TOKENIZER otherwise.
+    """
+    prefix_matcher = prefix_map if isinstance(prefix_map, SpeciesPrefixMatcher) else SpeciesPrefixMatcher(prefix_map)
     species_to_num_hash: Dict[str, float] = {}
     for passage in paper.passages:  # type: GNormPassage
         for species in passage.species:  # type: SpeciesMention
@@ -49,21 +231,21 @@ def assign_species(paper: GNormPaper, taxonomy_frequency: TaxonomyFrequency, hum
             major_species = ID
             max_species = freq
 
-    for passage in paper.passages:  # type: GNormPassage
-        sentence_offsets: List[Tuple[int, int]] = list(SENTENCE_TOKENIZER.span_tokenize(passage.context))
+    for passage_index, passage in enumerate(paper.passages):  # type: int, GNormPassage
+        # Indexes are built for the first gene without prefix species
+        sentence_index: Optional[SentenceIndex] = None
+        species_index: Optional[SpeciesIndex] = None
 
         for gene in passage.genes:  # type: GNormGeneMention
             mention = gene.text.split('|')[0]  # Only use the first term to detect species
 
             # Prefix
             if mention not in gene_without_sp_prefix:
-                for tax_id, prefix_pattern in prefix_map.items():  # type: str, Pattern[str]
-                    match = re.match(prefix_pattern, mention)
-                    if match:
-                        mention_without_prefix = match.group(2)
-                        gene.text += f'|{mention_without_prefix}'
-                        gene.tax_id = GNormSpeciesAnnotation(tax_id, SpeciesAnnotationPlacement.PREFIX)
-                        break
+                match = prefix_matcher.match(mention)
+                if match:
+                    tax_id, mention_without_prefix = match
+                    gene.text += f'|{mention_without_prefix}'
+                    gene.tax_id = GNormSpeciesAnnotation(tax_id, SpeciesAnnotationPlacement.PREFIX)
 
             if gene.tax_id:
                 continue
@@ -71,37 +253,22 @@ def assign_species(paper: GNormPaper, taxonomy_frequency: TaxonomyFrequency, hum
             start = gene.location.start
             end = gene.location.end
 
-            target_sentence = 0
-            for i, (s_start, s_end) in enumerate(sentence_offsets):  # type: int, int, int
-                if s_start <= start <= s_end:
-                    target_sentence = i
-                    break
+            if sentence_index is None:
+                sentence_index = SentenceIndex(sentence_spans[passage_index] if sentence_spans is not None else
+                                               list(SENTENCE_TOKENIZER.span_tokenize(passage.context)))
+                species_index = SpeciesIndex(passage.species)
 
-            s_start, s_end = sentence_offsets[target_sentence]
+            s_start, s_end = sentence_index.spans[sentence_index.find(start)]
             # Left
-            closest_species_start = 0
-            for sp in passage.species:  # type: SpeciesMention
-                if sp.id is None:
-                    continue
-                sp_start = sp.location.start
-                if start >= sp_start >= s_start and sp_start > closest_species_start:
-                    closest_species_start = sp_start
-                    gene.tax_id = GNormSpeciesAnnotation(sp.id, SpeciesAnnotationPlacement.LEFT)
-
-            if gene.tax_id:
+            species_id = species_index.find_left(start, s_start)
+            if species_id is not None:
+                gene.tax_id = GNormSpeciesAnnotation(species_id, SpeciesAnnotationPlacement.LEFT)
                 continue
 
             # Right
-            closest_species_end = 1_000_000
-            for sp in passage.species:  # type: SpeciesMention
-                if sp.id is None:
-                    continue
-                sp_end = sp.location.end
-                if end <= sp_end <= s_end and sp_end < closest_species_end:
-                    closest_species_end = sp_end
-                    gene.tax_id = GNormSpeciesAnnotation(sp.id, SpeciesAnnotationPlacement.RIGHT)
-
-            if gene.tax_id:
+            species_id = species_index.find_right(end, s_end)
+            if species_id is not None:
+                gene.tax_id = GNormSpeciesAnnotation(species_id, SpeciesAnnotationPlacement.RIGHT)
                 continue
 
             gene.tax_id = GNormSpeciesAnnotation(major_species, SpeciesAnnotationPlacement.FOCUS)
@@ -0,0 +1,94 @@
+from os.path import exists
+
+import pytest
+
+from bionorm.common.models import Paper, Passage, GeneMention, Location
+from bionorm.normalizers.gene.GNormPlus import GNormPlus, GNormPlusConfig, LAZY_RESOURCES
+from bionorm.normalizers.gene.GNormPlus.util import PrefixTree, ArrayPrefixTree, snapshot_path
+
+_FILES = {
+    'gene_without_sp_prefix_path': 'ABC1\nXYZ\n',
+    'suffix_translation_map_path': 'a\talpha\nalpha\ta\n',
+    'prefix_id_map_path': '9606\th\n10090\tm\n',
+    'taxonomy_freq_map_path': '9606\t1000\n10090\t200\n',
+    'virus_human_list_path': '10298\n',
+    'filtering_path': 'protein\ngene\n',
+    'gene_scoring_path': 'abc1\t1\tx\t5\nxyz\t2\ty\t7\n',
+    'gene_scoring_df_path': '100\nabc\t10\nxyz\t0\n',
+    'chromosome_tree_path': '1\tchr\n1-1\t1\t10\n',
+    'gene_tree_path': '1\tabc\n1-1\t1\t1\n2\txyz\t2\n',
+    'family_name_tree_path': '1\tkinase\t3\n',
+}
+
+
+def _state(normalizer: GNormPlus):
+    return {
+        'gene_without_sp_prefix': normalizer.gene_without_sp_prefix,
+        'suffix_translation_map': normalizer.suffix_translation_map,
+        'prefix_map': {key: pattern.pattern for key, pattern in normalizer.prefix_map.items()},
+        'taxonomy_frequency': normalizer.taxonomy_frequency,
+        'human_viruses': normalizer.human_viruses,
+        'filtering': {pattern.pattern for pattern in normalizer.filtering},
+        'gene_scoring': normalizer.gene_scoring,
+        'gene_scoring_df': normalizer.gene_scoring_df,
+        'trees': [tree.pretty_print() for tree in (normalizer.chromosome_tree, normalizer.gene_tree, normalizer.family_name_tree)],
+        'tree_maps': [tree.suffix_translation_map is normalizer.suffix_translation_map
+                      for tree in (normalizer.chromosome_tree, normalizer.gene_tree, normalizer.family_name_tree)],
+    }
+
+
+@pytest.fixture
+def config(tmp_path) -> GNormPlusConfig:
+    paths = {}
+    for field, content in _FILES.items():
+        path = tmp_path / f'{field}.txt'
+        path.write_text(content)
+        paths[field] = str(path)
+    return GNormPlusConfig(**paths)
+
+
+def test_parallel(config):
+    serial = GNormPlus(config)
+    serial.load_data()
+    parallel = GNormPlus(config)
+    parallel.load_data(workers=3)
+    assert _state(parallel) == _state(serial)
+    assert all(tree_map for tree_map in _state(parallel)['tree_maps'])
+    assert set(parallel.load_timings) == set(serial.load_timings)
+    # Trees aren't transferred from workers, they compile the snapshots mapped in the main process
+    for path in (config.chromosome_tree_path, config.gene_tree_path, config.family_name_tree_path):
+        assert exists(snapshot_path(path))
+    assert isinstance(parallel.gene_tree, ArrayPrefixTree)
+
+
+def test_parallel_without_snapshots(config):
+    config = config._replace(use_tree_snapshots=False)
+    serial = GNormPlus(config)
+    serial.load_data()
+    parallel = GNormPlus(config)
+    parallel.load_data(workers=3)
+    assert _state(parallel) == _state(serial)
+    assert all(tree_map for tree_map in _state(parallel)['tree_maps'])
+    assert not exists(snapshot_path(config.gene_tree_path))
+    assert type(parallel.gene_tree) is PrefixTree
+
+
+def test_lazy(config):
+    serial = GNormPlus(config)
+    serial.load_data()
+    lazy = GNormPlus(config)
+    lazy.load_data(lazy=True)
+    assert not any(name in lazy.load_timings for name in LAZY_RESOURCES)
+    assert _state(lazy) == _state(serial)
+    assert all(name in lazy.load_timings for name in LAZY_RESOURCES)
+
+
+def test_lazy_normalize(config):
+    lazy = GNormPlus(config)
+    lazy.load_data(lazy=True)
+    lazy.normalize(Paper('1', [Passage('title', 'abc binds xyz', genes=[GeneMention(Location(0, 3), 'abc')])], []))
+    assert not any(name in lazy.load_timings for name in LAZY_RESOURCES)
+
+    lazy.normalize(Paper('2', [Passage('title', 'abc kinase family', genes=[GeneMention(Location(0, 17), 'abc kinase family')])], []))
+    assert 'family_name_tree' in lazy.load_timings
+    assert 'filtering' not in lazy.load_timings
@@ -0,0 +1,41 @@
+import pytest
+
+from bionorm.normalizers.gene.GNormPlus.models import GeneType
+from bionorm.normalizers.gene.GNormPlus.processing import infer_multiple_genes, GeneMentionRecord
+
+_GUARANTEED_GENE_TO_ID = {('a', '9606'): '3', ('b', '9606'): '1', ('c', '9606'): '3', ('d', '9606'): '2'}
+
+
+def _gene_mention_hash(multi_gene_to_id):
+    gene_mention_hash = {}
+    for (mentions, tax_id), ids in multi_gene_to_id.items():
+        record = gene_mention_hash[mentions, tax_id] = GeneMentionRecord(mentions, tax_id, GeneType.GENE)
+        record.ids = ids
+    return gene_mention_hash
+
+
+@pytest.mark.parametrize('guaranteed_gene_to_id, ids, expected', [
+    # 3 is the first guaranteed ID, so it wins a tie with 1 and 2
+    (_GUARANTEED_GENE_TO_ID, ('1', '2', '3'), ('3',)),
+    # The lowest rank wins regardless of the candidate order
+    (_GUARANTEED_GENE_TO_ID, ('2', '1'), ('1',)),
+    (_GUARANTEED_GENE_TO_ID, ('4', '2', '5'), ('2',)),
+    # Repeated and empty candidates
+    (_GUARANTEED_GENE_TO_ID, ('2', '', '2'), ('2',)),
+    # No guaranteed candidate
+    (_GUARANTEED_GENE_TO_ID, ('4', '5'), ('4', '5')),
+    ({}, ('1', '2'), ('1', '2')),
+])
+def test_infer_multiple_genes(guaranteed_gene_to_id, ids, expected):
+    multi_gene_to_id = {('x', '9606'): ids}
+    gene_mention_hash = _gene_mention_hash(multi_gene_to_id)
+    infer_multiple_genes(guaranteed_gene_to_id, multi_gene_to_id, gene_mention_hash)
+    assert gene_mention_hash['x', '9606'].ids == expected
+
+
+def test_several_genes():
+    multi_gene_to_id = {('x', '9606'): ('1', '2', '3'), ('y', '9606'): ('2', '1'), ('z', '10090'): ('4', '5')}
+    gene_mention_hash = _gene_mention_hash(multi_gene_to_id)
+    infer_multiple_genes(_GUARANTEED_GENE_TO_ID, multi_gene_to_id, gene_mention_hash)
+    assert {gene: record.ids for gene, record in gene_mention_hash.items()} == {
+        ('x', '9606'): ('3',), ('y', '9606'): ('1',), ('z', '10090'): ('4', '5')}
@@ -0,0 +1,58 @@
+from bionorm.common.models import Paper, Passage, GeneMention, Location
+from bionorm.normalizers.gene.GNormPlus.models import GNormPaper, GeneType, GNormSpeciesAnnotation, SpeciesAnnotationPlacement
+from bionorm.normalizers.gene.GNormPlus.processing import fill_gene_mention_hash, GeneMentionRecord
+
+_GENES = [
+    # (passage, start, text, type, tax ID)
+    (0, 0, 'TP53|p53', GeneType.GENE, '9606'),
+    (0, 20, 'MDM2', GeneType.GENE, '9606'),
+    # Same mention and species as the first one
+    (1, 4, 'TP53|p53', GeneType.GENE, '9606'),
+    # Same mention of another species
+    (1, 30, 'TP53|p53', GeneType.GENE, '10090'),
+    (1, 50, 'MDM family|MDM', GeneType.FAMILY_NAME, '9606'),
+    (1, 70, 'SH2 domain', GeneType.DOMAIN_MOTIF, '9606'),
+    (1, 90, 'T-cells', GeneType.CELL, '9606'),
+]
+
+
+def _paper() -> GNormPaper:
+    passages = [Passage('title', ' ' * 40, genes=[]), Passage('abstract', ' ' * 100, genes=[])]
+    for passage, start, text, _, _ in _GENES:
+        passages[passage].genes.append(GeneMention(Location(start, start + len(text)), text))
+    paper = GNormPaper(Paper('pipeline', passages, []))
+    genes = [gene for passage in paper.passages for gene in passage.genes]
+    for gene, (_, _, _, m_type, tax_id) in zip(genes, _GENES):
+        gene.type = m_type
+        gene.tax_id = GNormSpeciesAnnotation(tax_id, SpeciesAnnotationPlacement.FOCUS)
+    return paper
+
+
+def test_fill_gene_mention_hash():
+    gene_mention_hash = {}
+    mention_hash = set()
+    fill_gene_mention_hash(_paper(), gene_mention_hash, mention_hash)
+
+    assert list(gene_mention_hash) == [('TP53|p53', '9606'), ('MDM2', '9606'), ('TP53|p53', '10090')]
+    assert {key: record.locations for key, record in gene_mention_hash.items()} == {
+        ('TP53|p53', '9606'): [(0, 8), (4, 12)], ('MDM2', '9606'): [(20, 24)], ('TP53|p53', '10090'): [(30, 38)]}
+    for key, record in gene_mention_hash.items():
+        assert record.key == key
+        assert record.type == GeneType.GENE
+        assert record.ids is None and record.fallback is None
+    # Gene mentions are added whole, family names and domains are split
+    assert mention_hash == {'TP53|p53', 'MDM2', 'MDM family', 'MDM', 'SH2 domain'}
+
+
+def test_fill_existing_records():
+    record = GeneMentionRecord('MDM2', '9606', GeneType.GENE)
+    record.ids = ('4193',)
+    gene_mention_hash = {record.key: record}
+    mention_hash = set()
+    fill_gene_mention_hash(_paper(), gene_mention_hash, mention_hash)
+
+    assert gene_mention_hash['MDM2', '9606'] is record
+    assert record.locations == [(20, 24)]
+    assert record.ids == ('4193',)
+    # Only mentions of new records are added
+    assert 'MDM2' not in mention_hash
@@ -0,0 +1,89 @@
+import pytest
+
+from bionorm.common.models import Paper, Passage, GeneMention, Location, Abbreviation
+from bionorm.normalizers.gene.GNormPlus.models import GNormPaper, GeneType
+from bionorm.normalizers.gene.GNormPlus.processing import preprocess_paper, MentionPreprocessor
+from bionorm.normalizers.gene.GNormPlus.util import PrefixTree
+
+_CHROMOSOME_TREE = PrefixTree({})
+
+_EDGE_GENES = [
+    # Suffixes are only searched in the first line of the mention
+    ('Notch\nfamily', 'Notch\nfamily', GeneType.GENE),
+    ('cellular\nRas', 'cellular\nRas', GeneType.CELL),
+    ('Rad51 p', 'Rad51 p|Rad51', GeneType.GENE),
+    ('Rad51p\n', 'Rad51p\n|Rad51', GeneType.GENE),
+    ('TGF-beta\n1', 'TGF-beta\n1', GeneType.GENE),
+    ('T-cells', 'T-cells', GeneType.CELL),
+    # Type of the long form of abbreviation
+    ('MHC', 'MHC', GeneType.FAMILY_NAME),
+    # Type of the long form already seen as a mention
+    ('SOD', 'SOD', GeneType.CELL),
+    # Suffix right after the mention
+    ('x', 'x', GeneType.DOMAIN_MOTIF),
+]
+
+
+def _edge_paper() -> Paper:
+    context = ' '.join(gene for gene, _, _ in _EDGE_GENES) + 'domains cells'
+    mentions = []
+    for gene, _, _ in _EDGE_GENES:
+        start = context.index(gene)
+        mentions.append(GeneMention(Location(start, start + len(gene)), gene))
+    abbreviations = [Abbreviation('major histocompatibility complex', 'MHC'), Abbreviation('T-cells', 'SOD')]
+    return Paper('edge', [Passage('title', context, genes=mentions)], abbreviations)
+
+
+@pytest.mark.parametrize('mention, variants', [
+    ('TP53', 'TP53'),
+    ('Rad51p', 'Rad51p|Rad51'),
+    ('NFnu', 'NFnu|NF'),
+    ('GATA3a', 'GATA3a|GATA3alpha'),
+    ('Cdc2b', 'Cdc2b|Cdc2beta'),
+    ('TNF alpha', 'TNF alpha|TNF a'),
+    ('IL-1 beta', 'IL-1 beta|IL-1 b'),
+    ('CaMKIIa', 'CaMKIIa|CaMK2a'),
+    ('PKCIIIb', 'PKCIIIb|PKCI2b|PKC3b'),
+])
+def test_variants(mention, variants):
+    assert MentionPreprocessor().variants(mention) == variants
+
+
+@pytest.mark.parametrize('text, suffix_type', [
+    ('cells', GeneType.CELL),
+    ('cellular\nras', GeneType.CELL),
+    ('notch\nfamily', None),
+    ('fanconi anemia complex', GeneType.FAMILY_NAME),
+    ('p53 binding domain', GeneType.DOMAIN_MOTIF),
+    ('tp53', None),
+])
+def test_suffix_type(text, suffix_type):
+    assert MentionPreprocessor().suffix_type(text) is suffix_type
+
+
+def test_edge_cases():
+    paper = GNormPaper(_edge_paper())
+    preprocess_paper(paper, _CHROMOSOME_TREE)
+    assert [(gene.text, gene.type) for gene in paper.passages[0].genes] == [(text, m_type) for _, text, m_type in _EDGE_GENES]
+
+
+@pytest.mark.parametrize('max_size', [0, 1, 1 << 16])
+def test_shared_preprocessor(max_size):
+    preprocessor = MentionPreprocessor(max_size)
+    for _ in range(2):
+        paper = GNormPaper(_edge_paper())
+        preprocess_paper(paper, _CHROMOSOME_TREE, preprocessor=preprocessor)
+        assert [(gene.text, gene.type) for gene in paper.passages[0].genes] == [(text, m_type) for _, text, m_type in _EDGE_GENES]
+    assert len(preprocessor._variants) <= max_size and len(preprocessor._suffix_types) <= max_size
+
+
+@pytest.mark.parametrize('lazy_chromosomes', [False, True])
+def test_chromosomes(lazy_chromosomes):
+    tree = PrefixTree({})
+    tree.insert('17q21', '10r|11')
+    tree.insert('chromosome 1p36', '30')
+    contexts = ['17q21 deletion', 'no chromosomes here', 'chromosome 1p36 loss']
+    paper = GNormPaper(Paper('chromosomes', [Passage(f'paragraph {i}', context) for i, context in enumerate(contexts)], []))
+    preprocess_paper(paper, tree, lazy_chromosomes=lazy_chromosomes)
+    assert '11' in paper.chromosome_hash and '20' not in paper.chromosome_hash
+    assert set(paper.chromosome_hash) == {'10', '11', '30'}
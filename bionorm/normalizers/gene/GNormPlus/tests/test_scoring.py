@@ -0,0 +1,58 @@
+import pytest
+
+from bionorm.common.models import Paper, Abbreviation
+from bionorm.normalizers.gene.GNormPlus.models import GNormPaper, GeneType
+from bionorm.normalizers.gene.GNormPlus.processing import rank_by_score_function, score_function, parse_gene_scoring, \
+    get_token_lexicon, get_mention_tokens, GeneMentionRecord
+
+_GENE_SCORING = {
+    'Gene:1': parse_gene_scoring('kinase-2,receptor-1', 4),
+    'Homo:7': parse_gene_scoring('growth-1,factor-1', 3),
+}
+_GENE_SCORING_DF = {'kinase': 2.0, 'growth': 1.0}
+_MENTION_HASH = {'KR', 'kinase receptor', 'growth factor'}
+
+
+@pytest.mark.parametrize('gene_id, score', [
+    # kinase: 2 / 4 * 2.0 / (1 - 2 / 4), plus both tokens of the long form
+    ('1', 4.0),
+    # Homo ID, growth: 1 / 3 * 1.0 / (1 - 1 / 3)
+    ('9606-7', 0.5),
+    ('5', 0.0),
+])
+def test_score_function(gene_id, score):
+    assert score_function(gene_id, _MENTION_HASH, 'kinase receptor', _GENE_SCORING, _GENE_SCORING_DF) == pytest.approx(score)
+    assert score_function(gene_id, _MENTION_HASH, 'kinase receptor', _GENE_SCORING, _GENE_SCORING_DF,
+                          mention_tokens=get_mention_tokens(_MENTION_HASH), lf_tokens=['kinase', 'receptor']) == pytest.approx(score)
+
+
+def test_mention_tokens():
+    assert get_mention_tokens(['IL-2a', 'il 2 receptor', 'TNF']) == ['il', '2', 'a', 'receptor', 'tnf']
+
+
+def test_rank_by_score_function():
+    paper = GNormPaper(Paper('scoring', [], [Abbreviation('kinase receptor', 'KR')]))
+    ids = {
+        ('KR', '9606'): ('9606-7', '1'),
+        # None of the candidates is scored
+        ('KR', '10090'): ('5', '6'),
+        # No long form
+        ('GF', '9606'): ('1', '9606-7'),
+        ('AB', '9606'): ('1',),
+    }
+    gene_mention_hash = {}
+    for (mentions, tax_id), gene_ids in ids.items():
+        record = gene_mention_hash[mentions, tax_id] = GeneMentionRecord(mentions, tax_id, GeneType.GENE)
+        record.ids = gene_ids
+    rank_by_score_function(paper, gene_mention_hash, _MENTION_HASH, _GENE_SCORING, _GENE_SCORING_DF)
+    assert {key: record.ids for key, record in gene_mention_hash.items()} == {
+        ('KR', '9606'): ('1',), ('KR', '10090'): ('',), ('GF', '9606'): ('',), ('AB', '9606'): ('1',)}
+
+
+def test_malformed_scoring():
+    entry = parse_gene_scoring('abc-1,x', 5)
+    assert entry.term_freq is None
+    assert list(get_token_lexicon(entry)) == ['abc', 'x']
+    with pytest.raises(ValueError):
+        score_function('1', {'abc'}, 'abc', {'Gene:1': entry}, {})
+    assert parse_gene_scoring('abc-1,xyz-2,abc-3', 5).term_freq == {'abc': 3, 'xyz': 2}
@@ -0,0 +1,78 @@
+import re
+
+import pytest
+
+from bionorm.common.models import Paper, Passage, GeneMention, SpeciesMention, Location
+from bionorm.normalizers.gene.GNormPlus.models import GNormPaper, SpeciesAnnotationPlacement
+from bionorm.normalizers.gene.GNormPlus.processing import assign_species, SpeciesPrefixMatcher
+
+_PREFIX_MAP = {'9606': re.compile(r'^(h)([A-Z].*)$'), '10090': re.compile(r'^(m)([A-Z].*)$')}
+_ARGUMENTS = ({'9606': 0.5, '10090': 0.2}, {'10298'}, {'hTP53'}, _PREFIX_MAP)
+
+
+def _species(start: int, end: int, species_id):
+    mention = SpeciesMention(Location(start, end), 'species')
+    mention.id = species_id
+    return mention
+
+
+def _paper() -> Paper:
+    context = 'Aaaa bbbb. Cccc dddd eeee. Ffff gggg.'
+    genes = [GeneMention(Location(start, start + 4), 'TNF') for start in [0, 5, 11, 16, 21, 27, 32]]
+    species = [
+        _species(0, 4, '10090'),  # Start 0 never counts on the left
+        _species(16, 20, None),
+        _species(11, 15, '10116'),
+        _species(11, 15, '4932'),  # Same start as the previous one
+        _species(21, 25, '10298'),  # Virus counting as human
+        _species(27, 31, '9606'),
+        _species(27, 31, '10090'),
+    ]
+    prefixed = [GeneMention(Location(0, 5), 'hTP53'), GeneMention(Location(10, 14), 'mTOR')]
+    return Paper('edge', [Passage('title', context, genes=genes, species=species),
+                          Passage('abstract', 'hTP53 and mTOR in cells.', genes=prefixed)], [])
+
+
+@pytest.mark.parametrize('sentence_spans', [
+    None,
+    # Spans of the caller, touching each other and ending outside of the context
+    [[(0, 11), (11, 27), (27, 2_000_000)], [(0, 24)]],
+])
+def test_assign_species(sentence_spans):
+    paper = GNormPaper(_paper())
+    assign_species(paper, *_ARGUMENTS, sentence_spans=sentence_spans)
+    assert [(gene.text, gene.tax_id.id, gene.tax_id.placement) for passage in paper.passages for gene in passage.genes] == [
+        # The species starting at 0 is on the right
+        ('TNF', '10090', SpeciesAnnotationPlacement.RIGHT),
+        # No species in the sentence, the virus makes human (4.5) the major species over mouse (4.2)
+        ('TNF', '9606', SpeciesAnnotationPlacement.FOCUS),
+        # The first of the species with the same start
+        ('TNF', '10116', SpeciesAnnotationPlacement.LEFT),
+        # The species without ID is skipped
+        ('TNF', '10116', SpeciesAnnotationPlacement.LEFT),
+        ('TNF', '10298', SpeciesAnnotationPlacement.LEFT),
+        ('TNF', '9606', SpeciesAnnotationPlacement.LEFT),
+        ('TNF', '9606', SpeciesAnnotationPlacement.LEFT),
+        # Genes without species prefix aren't matched
+        ('hTP53', '9606', SpeciesAnnotationPlacement.FOCUS),
+        ('mTOR|TOR', '10090', SpeciesAnnotationPlacement.PREFIX),
+    ]
+
+
+_MENTIONS = ['aTP53', 'abTP53', 'abcTP53', 'aaTP53', 'acTP53', 'TP53', 'TP-53', 'aTP53\n', 'tp53', 'a']
+
+
+@pytest.mark.parametrize('prefix_map, expected', [
+    # Literal prefixes, the first pattern wins over the longer prefix
+    ({'1': re.compile(r'^(a|abc)([A-Z].*)$'), '2': re.compile(r'^(ab)([A-Z].*)$'), '3': re.compile(r'^(ab|)([A-Z].*)$')},
+     [('1', 'TP53'), ('2', 'TP53'), ('1', 'TP53'), None, None, ('3', 'TP53'), ('3', 'TP-53'), ('1', 'TP53'), None, None]),
+    # Other patterns are combined into one regex
+    ({'1': re.compile(r'^(a[bc]?)([A-Z].*)$'), '2': re.compile(r'^(ab)([A-Z].*)$'), '3': re.compile(r'^()([A-Z]\w+)$')},
+     [('1', 'TP53'), ('1', 'TP53'), None, None, ('1', 'TP53'), ('3', 'TP53'), None, ('1', 'TP53'), None, None]),
+    # Backreferences are matched one by one
+    ({'1': re.compile(r'^(a)\1([A-Z].*)$'), '2': re.compile(r'^(a+)([A-Z].*)$')},
+     [('2', 'TP53'), None, None, ('1', 'TP53'), None, None, None, ('2', 'TP53'), None, None]),
+])
+def test_prefix_matcher(prefix_map, expected):
+    matcher = SpeciesPrefixMatcher(prefix_map)
+    assert [matcher.match(mention) for mention in _MENTIONS] == expected
@@ -1,3 +1,4 @@
 from .re_patterns import *
 from .tokens import *
 from .trees import *
+from .array_trees import *
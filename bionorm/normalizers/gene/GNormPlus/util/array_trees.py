@@ -0,0 +1,399 @@
+import mmap
+import re
+import struct
+import sys
+from array import array
+from os.path import splitext
+from typing import Dict, List, Optional, Iterable, Sequence, Tuple
+
+from bionorm.common.util import iter_lines
+from bionorm.normalizers.gene.GNormPlus.util.tokens import split_to_tokens
+from bionorm.normalizers.gene.GNormPlus.util.trees import PrefixTree, PrefixTranslation
+
+SNAPSHOT_EXTENSION = '.bin'
+SNAPSHOT_VERSION = 1
+
+_MAGIC = b'GNPTREE\0'
+# magic, version, byte order, nodes, edges, tokens, concepts, token blob size, concept blob size
+_HEADER = struct.Struct('<8sIIIIIIQQ')
+_ALIGNMENT = 8
+_BYTE_ORDERS = {'little': 0, 'big': 1}
+
+_NUMBER_PATTERN = re.compile(r'\d+')
+_NO_NODE = -1
+_ROOT = 0
+
+
+def snapshot_path(tree_path: str) -> str:
+    """Path of the binary snapshot compiled from the tree file.
+
+    Args:
+        tree_path (str):
+            Path to the text tree file (PT_*.txt).
+
+    Returns:
+        Path to the snapshot next to the text file.
+    """
+    return splitext(tree_path)[0] + SNAPSHOT_EXTENSION
+
+
+class _StringTable:
+    """Strings packed into one UTF-8 blob with offsets, decoded on access."""
+
+    def __init__(self, blob: memoryview, offsets: Sequence[int]):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1] - 1], 'utf-8')
+
+
+class ArrayPrefixTree(PrefixTree):
+    """Prefix tree of concepts stored in flat arrays.
+
+    Nodes are integer ids with the root being 0. Tokens and concepts are interned and nodes only keep their ids, children of every node
+    occupy a contiguous range of the children arrays sorted by token id (CSR layout), so lookups are binary searches.
+
+    The tree can be saved to a binary snapshot and loaded back with :func:`mmap`, which makes the load nearly instant and lets the
+    processes share the pages of the same file.
+
+    Notes:
+        Nodes added by insert() are kept in a small overlay map until freeze() merges them into the arrays.
+        Inserting into a tree loaded from a snapshot copies its arrays into memory.
+
+    Attributes:
+        suffix_translation_map (Dict[str, str]):
+            Suffices mapping between short and long forms.
+        root (int):
+            Root node of the tree.
+    """
+
+    def __init__(self, suffix_translation_map: Dict[str, str]):
+        self.suffix_translation_map = suffix_translation_map
+        self.root = _ROOT
+        self._tokens: List[str] = []
+        self._token_ids: Dict[str, int] = {}
+        self._concepts: Sequence[str] = []
+        self._concept_ids: Optional[Dict[str, int]] = {}
+        self._node_tokens: Sequence[int] = array('i', [_NO_NODE])
+        self._node_concepts: Sequence[int] = array('i', [_NO_NODE])
+        self._number_children: Sequence[int] = array('i', [_NO_NODE])
+        self._child_offsets: Sequence[int] = array('i', [0, 0])
+        self._child_nodes: Sequence[int] = array('i')
+        self._child_tokens: Sequence[int] = array('i')
+        self._pending: Dict[Tuple[int, int], int] = {}
+        self._mmap: Optional[mmap.mmap] = None
+
+    def __len__(self) -> int:
+        return len(self._node_tokens)
+
+    def _find_child(self, node: int, token: str, prefix_translation: PrefixTranslation = PrefixTranslation.NONE) -> Optional[int]:
+        child = self._find_child_by_token(node, token)
+        if child is not None:
+            return child
+
+        if prefix_translation == PrefixTranslation.SUFFIX_TRANSLATION_MAP:
+            if token in self.suffix_translation_map:
+                return self._find_child_by_token(node, self.suffix_translation_map[token])
+
+        elif prefix_translation == PrefixTranslation.NUMBER and _NUMBER_PATTERN.match(token):
+            child = self._number_children[node]
+            if child != _NO_NODE:
+                return child
+
+        return None
+
+    def _find_child_by_token(self, node: int, token: str) -> Optional[int]:
+        token_id = self._token_ids.get(token)
+        if token_id is None:
+            return None
+        if node < len(self._child_offsets) - 1:
+            lo = self._child_offsets[node]
+            hi = self._child_offsets[node + 1]
+            while lo < hi:
+                mid = (lo + hi) // 2
+                mid_token = self._child_tokens[mid]
+                if mid_token < token_id:
+                    lo = mid + 1
+                elif mid_token > token_id:
+                    hi = mid
+                else:
+                    return self._child_nodes[mid]
+        if self._pending:
+            return self._pending.get((node, token_id))
+        return None
+
+    def _get_concept(self, node: int) -> Optional[str]:
+        concept_id = self._node_concepts[node]
+        if concept_id == _NO_NODE:
+            return None
+        return self._concepts[concept_id]
+
+    def insert(self, mention: str, concept: str) -> None:
+        """Splits a mention into tokens and inserts them into the tree with given ids.
+
+        Args:
+            mention (str):
+                Mention as is.
+            concept (str):
+                Its concept ID.
+        """
+        self._make_writable()
+        tokens = split_to_tokens(mention, memoize=False)
+        tmp = _ROOT
+        for i, token in enumerate(tokens):
+            child_node = self._find_child_by_token(tmp, token)
+            if child_node is not None:
+                tmp = child_node
+                if i == len(tokens) - 1:
+                    self._node_concepts[tmp] = self._intern_concept(concept)
+            else:
+                tmp = self._add_node(tmp, token, concept if i == len(tokens) - 1 else None)
+
+    def _add_node(self, parent: int, token: str, concept: Optional[str]) -> int:
+        token_id = self._token_ids.get(token)
+        if token_id is None:
+            token_id = len(self._tokens)
+            self._tokens.append(token)
+            self._token_ids[token] = token_id
+        node = len(self._node_tokens)
+        self._node_tokens.append(token_id)
+        self._node_concepts.append(_NO_NODE if concept is None else self._intern_concept(concept))
+        self._number_children.append(_NO_NODE)
+        self._pending[(parent, token_id)] = node
+        if self._number_children[parent] == _NO_NODE and _NUMBER_PATTERN.match(token):
+            self._number_children[parent] = node
+        return node
+
+    def _intern_concept(self, concept: str) -> int:
+        concept_id = self._concept_ids.get(concept)
+        if concept_id is None:
+            concept_id = len(self._concepts)
+            self._concepts.append(concept)
+            self._concept_ids[concept] = concept_id
+        return concept_id
+
+    def _make_writable(self):
+        if self._mmap is None:
+            return
+        self._concepts = [self._concepts[i] for i in range(len(self._concepts))]
+        self._concept_ids = {concept: i for i, concept in enumerate(self._concepts)}
+        self._node_tokens = array('i', self._node_tokens)
+        self._node_concepts = array('i', self._node_concepts)
+        self._number_children = array('i', self._number_children)
+        self._child_offsets = array('i', self._child_offsets)
+        self._child_nodes = array('i', self._child_nodes)
+        self._child_tokens = array('i', self._child_tokens)
+        self._mmap = None
+
+    def freeze(self):
+        """Merges the nodes added by insert() into the children arrays.
+        """
+        if not self._pending:
+            return
+        edges = [(parent, self._child_tokens[i], self._child_nodes[i])
+                 for parent in range(len(self._child_offsets) - 1)
+                 for i in range(self._child_offsets[parent], self._child_offsets[parent + 1])]
+        edges.extend((parent, token_id, child) for (parent, token_id), child in self._pending.items())
+        self._pending = {}
+        self._set_children(edges)
+
+    def pretty_print(self) -> str:
+        """Recursively print the tree
+
+        Returns:
+            String representation of tree
+        """
+        return self._pretty_print(_ROOT, '')
+
+    def _pretty_print(self, node: int, depth: str) -> str:
+        res = ''
+        if node != _ROOT:
+            concept = self._get_concept(node)
+            token = self._tokens[self._node_tokens[node]]
+            res += f'{depth}\t{token}\t{concept}\n' if concept else f'{depth}\t{token}\n'
+        if depth != '':
+            depth += '-'
+        children: List[int] = []
+        if node < len(self._child_offsets) - 1:
+            children.extend(self._child_nodes[self._child_offsets[node]:self._child_offsets[node + 1]])
+        children.extend(child for (parent, _), child in self._pending.items() if parent == node)
+        children.sort()
+        for i, child in enumerate(children):
+            res += self._pretty_print(child, f'{depth}{i + 1}')
+        return res
+
+    def load_from_lines(self, lines: Iterable[str]):
+        """Loads prefix tree from lines
+
+        Args:
+            lines (Iterable[str]):
+                Sorted by location(!) lines in format [tree-location] [token] [conceptId?].
+                Tree location should be separated with hyphens and all of the parts should be separated with tabulation.
+        """
+        token_ids: Dict[str, int] = {}
+        token_numbers: List[bool] = []
+        concept_ids: Dict[str, int] = {}
+        node_tokens = array('i', [_NO_NODE])
+        node_concepts = array('i', [_NO_NODE])
+        number_children = array('i', [_NO_NODE])
+        parents = array('i', [_NO_NODE])
+        # (parent, token) -> child, keeps the order of the first insertion like Node.children does
+        edges: Dict[Tuple[int, int], int] = {}
+
+        last_depth = 0
+        tmp = _ROOT
+        for line in lines:
+            parts = line.strip().split('\t')
+            locations = parts[0].split('-')
+            token = parts[1]
+            concept = parts[2] if len(parts) == 3 else ''
+            while last_depth >= len(locations):
+                last_depth -= 1
+                tmp = parents[tmp]
+            last_depth = len(locations)
+
+            token_id = token_ids.get(token)
+            if token_id is None:
+                token_id = token_ids[token] = len(token_ids)
+                token_numbers.append(_NUMBER_PATTERN.match(token) is not None)
+            node = len(node_tokens)
+            node_tokens.append(token_id)
+            node_concepts.append(concept_ids.setdefault(concept, len(concept_ids)))
+            number_children.append(_NO_NODE)
+            parents.append(tmp)
+            if token_numbers[token_id]:
+                replaced = edges.get((tmp, token_id))
+                if number_children[tmp] == _NO_NODE or number_children[tmp] == replaced:
+                    number_children[tmp] = node
+            edges[(tmp, token_id)] = node
+            tmp = node
+
+        self._tokens = list(token_ids)
+        self._token_ids = token_ids
+        self._concepts = list(concept_ids)
+        self._concept_ids = concept_ids
+        self._node_tokens = node_tokens
+        self._node_concepts = node_concepts
+        self._number_children = number_children
+        self._pending = {}
+        self._mmap = None
+        self._set_children([(parent, token_id, child) for (parent, token_id), child in edges.items()])
+
+    def _set_children(self, edges: List[Tuple[int, int, int]]):
+        edges.sort()
+        node_count = len(self._node_tokens)
+        child_offsets = array('i', bytes(4 * (node_count + 1)))
+        for parent, _, _ in edges:
+            child_offsets[parent + 1] += 1
+        for i in range(node_count):
+            child_offsets[i + 1] += child_offsets[i]
+
+        self._child_offsets = child_offsets
+        self._child_tokens = array('i', (token_id for _, token_id, _ in edges))
+        self._child_nodes = array('i', (child for _, _, child in edges))
+
+    def save_snapshot(self, path: str):
+        """Saves the tree to the binary snapshot.
+
+        Args:
+            path (str):
+                Path to the snapshot file.
+        """
+        self.freeze()
+        token_blob = ''.join(f'{token}\n' for token in self._tokens).encode('utf-8')
+        concept_offsets = array('q', [0])
+        concept_blob = bytearray()
+        for i in range(len(self._concepts)):
+            concept_blob += self._concepts[i].encode('utf-8') + b'\n'
+            concept_offsets.append(len(concept_blob))
+
+        header = _HEADER.pack(_MAGIC, SNAPSHOT_VERSION, _BYTE_ORDERS[sys.byteorder], len(self._node_tokens), len(self._child_nodes),
+                              len(self._tokens), len(self._concepts), len(token_blob), len(concept_blob))
+        sections = [self._node_tokens, self._node_concepts, self._number_children, self._child_offsets, self._child_nodes,
+                     self._child_tokens, concept_offsets, token_blob, concept_blob]
+        with open(path, 'wb') as f:
+            f.write(header)
+            for section in sections:
+                data = memoryview(section).cast('B')
+                f.write(data)
+                f.write(bytes(-len(data) % _ALIGNMENT))
+
+    def load_snapshot(self, path: str):
+        """Loads the tree from the binary snapshot without copying its arrays into memory.
+
+        Args:
+            path (str):
+                Path to the snapshot file created by save_snapshot().
+
+        Raises:
+            ValueError: If the file isn't a snapshot or it was saved in an incompatible format.
+        """
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+
+        magic, version, byte_order, node_count, edge_count, token_count, concept_count, token_blob_size, concept_blob_size = \
+            _HEADER.unpack_from(view)
+        if magic != _MAGIC:
+            raise ValueError(f'{path} is not a prefix tree snapshot')
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f'{path} has snapshot version {version}, but {SNAPSHOT_VERSION} is expected')
+        if byte_order != _BYTE_ORDERS[sys.byteorder]:
+            raise ValueError(f'{path} was saved on the machine with different byte order')
+
+        offset = _HEADER.size
+
+        def section(size: int, fmt: str) -> memoryview:
+            nonlocal offset
+            item_size = struct.calcsize(fmt)
+            data = view[offset:offset + size * item_size].cast(fmt)
+            offset += size * item_size
+            offset += -offset % _ALIGNMENT
+            return data
+
+        node_tokens = section(node_count, 'i')
+        node_concepts = section(node_count, 'i')
+        number_children = section(node_count, 'i')
+        child_offsets = section(node_count + 1, 'i')
+        child_nodes = section(edge_count, 'i')
+        child_tokens = section(edge_count, 'i')
+        concept_offsets = section(concept_count + 1, 'q')
+        token_blob = section(token_blob_size, 'B')
+        concept_blob = section(concept_blob_size, 'B')
+
+        tokens = str(token_blob, 'utf-8').split('\n')[:token_count]
+        self._tokens = tokens
+        self._token_ids = {token: i for i, token in enumerate(tokens)}
+        self._concepts = _StringTable(concept_blob, concept_offsets)
+        self._node_tokens = node_tokens
+        self._node_concepts = node_concepts
+        self._number_children = number_children
+        self._child_offsets = child_offsets
+        self._child_nodes = child_nodes
+        self._child_tokens = child_tokens
+        self._concept_ids = None
+        self._pending = {}
+        self._mmap = mapped
+
+
+def compile_snapshot(tree_path: str, out_path: Optional[str] = None) -> str:
+    """Compiles the text tree file into the binary snapshot.
+
+    Args:
+        tree_path (str):
+            Path to the text tree file (PT_*.txt).
+        out_path (:obj:`str`, optional):
+            Path to the snapshot. Defaults to the tree path with the snapshot extension.
+
+    Returns:
+        Path to the written snapshot.
+    """
+    out_path = out_path or snapshot_path(tree_path)
+    tree = ArrayPrefixTree({})
+    tree.load_from_lines(line for line in iter_lines(tree_path) if line.strip())
+    tree.save_snapshot(out_path)
+    return out_path
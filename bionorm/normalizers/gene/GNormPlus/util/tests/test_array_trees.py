@@ -0,0 +1,125 @@
+import pytest
+
+from bionorm.normalizers.gene.GNormPlus.util import ArrayPrefixTree, PrefixTree, ID_NOT_FOUND, SUBSTRING_FOUND, MENTION_NOT_FOUND
+
+_SUFFIX_TRANSLATION_MAP = {
+    'a': 'alpha',
+    'alpha': 'a',
+    'g': 'gamma',
+    'y': 'gamma',
+    'gamma': 'g',
+}
+
+_LINES = """1\ta
+1-1\t1\t0
+1-2\t2\t1
+1-2-1\t1\t2
+1-2-2\ta\t3
+2\tbb\t5
+3\tgamma\t6
+4\til
+4-1\t12\t7
+4-1-1\tb\t8
+5\tp53
+5-1\tgene\t9""".split('\n')
+
+_MENTIONS = ['a-1', 'a-2-1', 'a-2-alpha', 'a', 'a-3', 'bb', 'y', 'IL-12', 'IL12b', 'il-7', 'p53 gene', 'cc']
+
+_CONTEXTS = [
+    'The IL-12 and IL-7b genes bind the p53 gene in bb cells',
+    '  a 2 1 and a 2 alpha or a-2-a with gamma',
+    'no concepts here',
+    'il 12 b',
+]
+
+
+def _trees():
+    tree = PrefixTree(_SUFFIX_TRANSLATION_MAP)
+    tree.load_from_lines(_LINES)
+    array_tree = ArrayPrefixTree(_SUFFIX_TRANSLATION_MAP)
+    array_tree.load_from_lines(_LINES)
+    return tree, array_tree
+
+
+def test_load_from_lines():
+    tree, array_tree = _trees()
+    assert array_tree.pretty_print() == tree.pretty_print()
+
+
+def test_find_mention():
+    tree, array_tree = _trees()
+    for mention in _MENTIONS:
+        assert array_tree.find_mention(mention) == tree.find_mention(mention)
+    assert array_tree.find_mention('a-2-alpha') == '3'
+    assert array_tree.find_mention('a') == ID_NOT_FOUND
+    assert array_tree.find_mention('a-3') == SUBSTRING_FOUND
+    assert array_tree.find_mention('cc') == MENTION_NOT_FOUND
+
+
+def test_search_mention_location():
+    tree, array_tree = _trees()
+    for context in _CONTEXTS:
+        assert array_tree.search_mention_location(context) == tree.search_mention_location(context)
+
+
+def test_snapshot(tmp_path):
+    tree, array_tree = _trees()
+    path = str(tmp_path / 'PT_Test.bin')
+    array_tree.save_snapshot(path)
+
+    loaded = ArrayPrefixTree(_SUFFIX_TRANSLATION_MAP)
+    loaded.load_snapshot(path)
+    assert loaded.pretty_print() == tree.pretty_print()
+    for mention in _MENTIONS:
+        assert loaded.find_mention(mention) == tree.find_mention(mention)
+    for context in _CONTEXTS:
+        assert loaded.search_mention_location(context) == tree.search_mention_location(context)
+
+
+def test_snapshot_wrong_file(tmp_path):
+    path = tmp_path / 'PT_Test.bin'
+    path.write_bytes(b'not a snapshot' * 10)
+    with pytest.raises(ValueError):
+        ArrayPrefixTree({}).load_snapshot(str(path))
+
+
+_INSERTED = [('IL-7', '10'), ('a-3', '11'), ('p53', '12'), ('il 12 c', '13'), ('MIR-21 alpha', '14')]
+
+
+@pytest.mark.parametrize('loaded', [False, True])
+def test_insert(loaded):
+    tree = PrefixTree(_SUFFIX_TRANSLATION_MAP)
+    array_tree = ArrayPrefixTree(_SUFFIX_TRANSLATION_MAP)
+    if loaded:
+        tree.load_from_lines(_LINES)
+        array_tree.load_from_lines(_LINES)
+    for mention, concept in _INSERTED:
+        tree.insert(mention, concept)
+        array_tree.insert(mention, concept)
+
+    assert array_tree.pretty_print() == tree.pretty_print()
+    for mention in _MENTIONS + [mention for mention, _ in _INSERTED]:
+        assert array_tree.find_mention(mention) == tree.find_mention(mention)
+    for context in _CONTEXTS:
+        assert array_tree.search_mention_location(context) == tree.search_mention_location(context)
+
+    array_tree.freeze()
+    assert not array_tree._pending
+    assert array_tree.pretty_print() == tree.pretty_print()
+    for context in _CONTEXTS:
+        assert array_tree.search_mention_location(context) == tree.search_mention_location(context)
+
+
+def test_insert_into_snapshot(tmp_path):
+    tree, array_tree = _trees()
+    path = str(tmp_path / 'PT_Test.bin')
+    array_tree.save_snapshot(path)
+    loaded = ArrayPrefixTree(_SUFFIX_TRANSLATION_MAP)
+    loaded.load_snapshot(path)
+    for mention, concept in _INSERTED:
+        tree.insert(mention, concept)
+        loaded.insert(mention, concept)
+
+    assert loaded.pretty_print() == tree.pretty_print()
+    for mention in _MENTIONS:
+        assert loaded.find_mention(mention) == tree.find_mention(mention)
@@ -0,0 +1,49 @@
+import random
+import re
+from os.path import exists
+from typing import List
+
+import pytest
+
+from bionorm.normalizers.gene.GNormPlus.config import GNormPlusConfig
+from bionorm.normalizers.gene.GNormPlus.util import split_to_tokens
+
+_ALPHABET = 'aZz09 \t\n  -_^;:,.()/+\'İßαΒ\x1c'
+
+
+def _reference_split_to_tokens(mention: str) -> List[str]:
+    mention = mention.lower()
+    mention = re.sub(r'([0-9])([a-z])', r'\1 \2', mention)
+    mention = re.sub(r'([a-z])([0-9])', r'\1 \2', mention)
+    mention = re.sub(r'[\s\-_^;:,]+', ' ', mention)
+    mention = re.sub(r'[ ]+', ' ', mention)
+    return mention.split()
+
+
+@pytest.mark.parametrize('mention', ['IL-12b', 'p53 gene', '1a2b3c', 'a1b2', '  TGF_beta1;2 ', 'CD4+/CD8+', '', ' - ', 'İL2'])
+def test_split_to_tokens(mention):
+    assert split_to_tokens(mention) == _reference_split_to_tokens(mention)
+    assert split_to_tokens(mention, memoize=False) == _reference_split_to_tokens(mention)
+
+
+def test_random_mentions():
+    rng = random.Random(0)
+    for _ in range(20000):
+        mention = ''.join(rng.choice(_ALPHABET) for _ in range(rng.randint(0, 12)))
+        assert split_to_tokens(mention) == _reference_split_to_tokens(mention), repr(mention)
+
+
+def test_memoized_tokens_are_copies():
+    tokens = split_to_tokens('IL-12b')
+    tokens.append('changed')
+    assert split_to_tokens('IL-12b') == ['il', '12', 'b']
+
+
+def test_gene_tree_vocabulary():
+    path = GNormPlusConfig().gene_tree_path
+    if not exists(path):
+        pytest.skip(f'{path} is missing')
+    with open(path, 'r', encoding='utf-8') as f:
+        tokens = {line.rstrip('\n').split('\t')[1] for line in f if line.strip()}
+    for token in tokens:
+        assert split_to_tokens(token, memoize=False) == _reference_split_to_tokens(token), repr(token)
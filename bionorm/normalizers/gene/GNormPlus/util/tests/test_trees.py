@@ -1,4 +1,7 @@
-from bionorm.normalizers.gene.GNormPlus.util import PrefixTree, PrefixTranslation, ID_NOT_FOUND, SUBSTRING_FOUND, MENTION_NOT_FOUND
+import pytest
+
+from bionorm.normalizers.gene.GNormPlus.util import ArrayPrefixTree, PrefixTree, PrefixTranslation, ID_NOT_FOUND, SUBSTRING_FOUND, \
+    MENTION_NOT_FOUND, LazyConceptIds
 
 _SUFFIX_TRANSLATION_MAP = {
     'a': 'alpha',
@@ -68,3 +71,50 @@ def test_load_from_lines():
     lines = lines_str.split('\n')
     tree.load_from_lines(lines)
     assert tree.pretty_print().strip() == lines_str
+
+
+@pytest.mark.parametrize('tree_class', [PrefixTree, ArrayPrefixTree])
+@pytest.mark.parametrize('context, expected', [
+    ('TP53 binds', [(0, 4, 'TP53', '3')]),
+    # Mentions ending at the end of the text aren't reported
+    ('TP53', []),
+    # The longest mention wins
+    ('a1b a1', [(0, 3, 'a1b', '0')]),
+    ('  a1 b', [(0, 4, '  a1', '1')]),
+    # Tokens right after each other move the cursor
+    ('a1a1a1', [(0, 2, 'a1', '1'), (2, 4, 'a1', '1')]),
+    # Lowercased `İ` is two characters long, which shifts the locations as in the original implementation
+    ('İl2 İl-2 a1b', [(0, 4, 'İl2 ', '2'), (7, 9, '2 ', '0')]),
+    ('a1 and İL 2.', [(0, 2, 'a1', '1'), (4, 5, 'n', '2')]),
+    # The cursor is only moved by the tokens of the tree, so the mentions after other words aren't located
+    ('The TP53 gene', []),
+    ('', []),
+    ('   ', []),
+])
+def test_search_mention_location(tree_class, context, expected):
+    tree = tree_class({})
+    for i, mention in enumerate(['a 1 b', 'a 1', 'İl 2', 'TP53']):
+        tree.insert(mention, str(i))
+    assert [tuple(location) for location in tree.search_mention_location(context)] == expected
+
+
+def test_find_concept_ids():
+    tree = PrefixTree({})
+    # Concept IDs are separated by `r|` and `r,` in chromosome tree
+    tree.insert('17q21', '10r|11')
+    tree.insert('1p36', '20')
+    tree.insert('chromosome 1p36', '30r,31r|32')
+    tree.insert('Xp11', '40')
+    contexts = ['17q21 deletion', 'chromosome 1p36 loss', 'Xp11 gain', 'no chromosomes here']
+    expected = {'10', '11', '30', '31', '32', '40'}
+    assert tree.find_concept_ids(contexts) == expected
+    assert list(tree.iter_concept_ids(contexts)) == [{'10', '11'}, {'30', '31', '32'}, {'40'}, set()]
+    # The search stops at the first text
+    assert tree.find_concept_ids(contexts, wanted={'10'}) == {'10', '11'}
+
+    concept_ids = LazyConceptIds(tree, contexts)
+    assert '10' in concept_ids and '11' in concept_ids
+    assert not concept_ids.exhausted
+    assert 'missing' not in concept_ids
+    assert concept_ids.exhausted
+    assert set(concept_ids) == expected and len(concept_ids) == len(expected)
@@ -1,11 +1,39 @@
 import re
-from typing import List
+import threading
+from typing import List, Dict, Tuple
 
+# Runs of separators and the boundaries between digits and letters
+_TOKEN_BOUNDARY_PATTERN = re.compile(r'[\s\-_^;:,]+|(?<=[0-9])(?=[a-z])|(?<=[a-z])(?=[0-9])')
 
-def split_to_tokens(mention: str) -> List[str]:
-    mention = mention.lower()
-    mention = re.sub(r'([0-9])([a-z])', r'\1 \2', mention)
-    mention = re.sub(r'([a-z])([0-9])', r'\1 \2', mention)
-    mention = re.sub(r'[\s\-_^;:,]+', ' ', mention)
-    mention = re.sub(r'[ ]+', ' ', mention)
-    return mention.split()
+_TOKENS_CACHE_SIZE = 1 << 16
+_tokens_cache: Dict[str, Tuple[str, ...]] = {}
+_tokens_cache_lock = threading.Lock()
+
+
+def split_to_tokens(mention: str, *, memoize: bool = True) -> List[str]:
+    """Split the lowercased mention to tokens at separators (whitespace, `-_^;:,`) and between digits and letters.
+
+    Notes:
+        Tokens of the same mentions and long forms are requested again and again, so they are memoized in a bounded cache,
+        the oldest mentions are evicted when it's full. Long texts and mentions seen once should be split with memoize=False,
+        so they don't evict the others.
+
+    Args:
+        mention (str):
+            Mention to split.
+        memoize (:obj:`bool`, defaults to :obj:`True`):
+            Whether to look up and put the tokens into the cache.
+
+    Returns:
+        New list of tokens.
+    """
+    if not memoize:
+        return [token for token in _TOKEN_BOUNDARY_PATTERN.split(mention.lower()) if token]
+    tokens = _tokens_cache.get(mention)
+    if tokens is None:
+        tokens = tuple(token for token in _TOKEN_BOUNDARY_PATTERN.split(mention.lower()) if token)
+        with _tokens_cache_lock:
+            if len(_tokens_cache) >= _TOKENS_CACHE_SIZE:
+                del _tokens_cache[next(iter(_tokens_cache))]
+            _tokens_cache[mention] = tokens
+    return list(tokens)
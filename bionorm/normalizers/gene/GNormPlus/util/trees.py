@@ -1,6 +1,6 @@
 import re
 from enum import Enum
-from typing import Optional, Dict, List, NamedTuple
+from typing import Optional, Dict, List, NamedTuple, Iterable, Iterator, Set, AbstractSet
 
 from bionorm.normalizers.gene.GNormPlus.util import split_to_tokens
 
@@ -80,9 +80,9 @@ class Node:
             if token in self.suffix_translation_map and self.suffix_translation_map[token] in self.children:
                 return self.children[self.suffix_translation_map[token]]
 
-        elif prefix_translation == PrefixTranslation.NUMBER and re.match(r'\d+', token):
+        elif prefix_translation == PrefixTranslation.NUMBER and _NUMBER_PATTERN.match(token):
             for entry in self.children.values():
-                if re.match(r'\d+', entry.token):
+                if _NUMBER_PATTERN.match(entry.token):
                     return entry
 
         return None
@@ -93,6 +93,11 @@ SUBSTRING_FOUND = '-2'
 MENTION_NOT_FOUND = '-3'
 
 _ROOT_NAME = '-ROOT-'
+_NUMBER_PATTERN = re.compile(r'\d+')
+# Separator of concept IDs in chromosome tree as it was in the original implementation, splits on `r|` and `r,` only
+CONCEPT_SEPARATOR_PATTERN = re.compile('r[|,]')
+# Same characters as str.isspace()
+_SPACE_PATTERN = re.compile(r'\s*')
 
 
 class FoundMention(NamedTuple):
@@ -113,8 +118,16 @@ class PrefixTree:
     """
 
     def __init__(self, suffix_translation_map: Dict[str, str]):
+        self.suffix_translation_map = suffix_translation_map
         self.root = Node(suffix_translation_map, None, _ROOT_NAME)
 
+    def _find_child(self, node: Node, token: str, prefix_translation: PrefixTranslation = PrefixTranslation.NONE) -> Optional[Node]:
+        return node.find_child(token, prefix_translation)
+
+    @staticmethod
+    def _get_concept(node: Node) -> Optional[str]:
+        return node.concept
+
     def insert(self, mention: str, concept: str) -> None:
         """Splits a mention into tokens and inserts them into the tree with given ids.
 
@@ -124,7 +137,7 @@ class PrefixTree:
             concept (str):
                 Its concept ID.
         """
-        tokens = split_to_tokens(mention)
+        tokens = split_to_tokens(mention, memoize=False)
         tmp: Node = self.root
         for i, token in enumerate(tokens):
             child_node = tmp.find_child(token)
@@ -146,11 +159,11 @@ class PrefixTree:
         """
         return _pretty_print(self.root, '')
 
-    def load_from_lines(self, lines: List[str]):
+    def load_from_lines(self, lines: Iterable[str]):
         """Loads prefix tree from lines
 
         Args:
-            lines (List[str]):
+            lines (Iterable[str]):
                 Sorted by location(!) lines in format [tree-location] [token] [conceptId?].
                 Tree location should be separated with hyphens and all of the parts should be separated with tabulation.
         """
@@ -181,20 +194,21 @@ class PrefixTree:
         for mention in mentions:
             tokens = split_to_tokens(mention)
             cnt = len(tokens)
-            tmp: Optional[Node] = self.root
+            tmp = self.root
             found = -1
             prefix_translation = PrefixTranslation.NONE
             for i, token in enumerate(tokens):
                 if i == cnt - 1:
                     prefix_translation = PrefixTranslation.SUFFIX_TRANSLATION_MAP
-                tmp = tmp.find_child(token, prefix_translation)
+                tmp = self._find_child(tmp, token, prefix_translation)
                 if tmp is None:
                     break
                 found = i
             if found != -1:
                 if found == cnt - 1:
-                    if tmp.concept:
-                        return tmp.concept
+                    concept = self._get_concept(tmp)
+                    if concept:
+                        return concept
                     else:
                         return ID_NOT_FOUND
                 else:
@@ -203,25 +217,42 @@ class PrefixTree:
         return MENTION_NOT_FOUND
 
     def search_mention_location(self, context: str) -> List[FoundMention]:
+        """Find the mentions of the tree in the text.
+
+        Notes:
+            The text is walked with an integer cursor over its lowercased copy, which is only moved by the tokens found right
+            at it. Whitespace after the cursor is added to the offsets without moving it, and backtracking restores the
+            cursor and the offsets, so the locations are the same as with consuming the unconsumed text string.
+
+        Args:
+            context (str):
+                Text to search in.
+
+        Returns:
+            Found mentions with their locations.
+        """
         locations: List[FoundMention] = []
         lowered = context.lower()
-
-        tokens = split_to_tokens(context)
-        offset = 0
+        context_length = len(context)
+
+        tokens = split_to_tokens(context, memoize=False)
+        tokens_count = len(tokens)
+        find_child = self._find_child
+        get_concept = self._get_concept
+        cursor = 0
+        # Length of the whitespace at the cursor, it's added to the offset after every token
+        space = _count_space(lowered, cursor)
+        offset = space
         start = 0
         last = 0
         first_time = 0
-        for c in lowered:
-            if not c.isspace():
-                break
-            offset += 1
-        lowered.lstrip()
         i = 0
-        while i < len(tokens):
+        while i < tokens_count:
             pre_i = i
             pre_start = start
             pre_last = last
-            pre_lowered = lowered
+            pre_cursor = cursor
+            pre_space = space
             pre_offset = offset
 
             tmp = self.root
@@ -232,76 +263,162 @@ class PrefixTree:
 
             while True:
                 token = tokens[i]
-                child = tmp.find_child(token, PrefixTranslation.NUMBER)
+                child = find_child(tmp, token, PrefixTranslation.NUMBER)
                 if child is None:
                     break
                 tmp = child
                 first_time_while += 1
                 if start == 0 and first_time > 0:
                     start = offset
-                if 0 < len(token) <= len(lowered) and lowered[0:len(token)] == token:
-                    lowered = lowered[len(token):]
+                if lowered.startswith(token, cursor):
+                    cursor += len(token)
                     offset += len(token)
+                    space = _count_space(lowered, cursor)
 
                 last = offset
-                for c in lowered:
-                    if not c.isspace():
-                        break
-                    offset += 1
-                lowered.lstrip()
+                offset += space
 
                 i += 1
-                if tmp.concept and start < last < len(context):
+                concept = get_concept(tmp)
+                if concept and start < last < context_length:
                     concept_found = i
-                    concept_found_mention = FoundMention(start, last, context[start:last], tmp.concept)
+                    concept_found_mention = FoundMention(start, last, context[start:last], concept)
                 found = True
-                if i >= len(tokens):
+                if i >= tokens_count:
                     break
                 if first_time_while == 0:
                     pre_i = i
                     pre_start = start
                     pre_last = last
-                    pre_lowered = lowered
+                    pre_cursor = cursor
+                    pre_space = space
                     pre_offset = offset
 
+            concept = get_concept(tmp)
             if found:
-                if tmp.concept and start < last < len(context):
-                    locations.append(FoundMention(start, last, context[start:last], tmp.concept))
+                if concept and start < last < context_length:
+                    locations.append(FoundMention(start, last, context[start:last], concept))
                 else:
                     if concept_found_mention:
                         locations.append(concept_found_mention)
                         i = concept_found + 1
                     if first_time_while >= 1:
                         i = pre_i
-                        lowered = pre_lowered
+                        cursor = pre_cursor
+                        space = pre_space
                         offset = pre_offset
                     start = 0
                     last = 0
                     if i > 0:
                         i -= 1
             else:
-                if first_time_while >= 1 and tmp.concept is None:
+                if first_time_while >= 1 and concept is None:
                     i = pre_i
                     start = pre_start
                     last = pre_last
-                    lowered = pre_lowered
+                    cursor = pre_cursor
+                    space = pre_space
                     offset = pre_offset
 
-                    if 0 < len(token) <= len(lowered) and lowered[0:len(token)] == token:
-                        lowered = lowered[len(token):]
+                    if lowered.startswith(token, cursor):
+                        cursor += len(token)
                         offset += len(token)
+                        space = _count_space(lowered, cursor)
 
-            for c in lowered:
-                if not c.isspace():
-                    break
-                offset += 1
-            lowered.lstrip()
+            offset += space
             first_time += 1
 
             i += 1
 
         return locations
 
+    def iter_concept_ids(self, contexts: Iterable[str]) -> Iterator[Set[str]]:
+        """Find the mentions of the tree in the texts one by one and split their concepts to IDs.
+
+        Args:
+            contexts (Iterable[str]):
+                Texts to search in, e.g. passages of the paper.
+
+        Returns:
+            Iterator over the sets of concept IDs found in every text.
+        """
+        # Concepts of the same mentions are split once for all of the texts
+        concept_ids: Dict[str, List[str]] = {}
+        for context in contexts:
+            found: Set[str] = set()
+            for location in self.search_mention_location(context):
+                ids = concept_ids.get(location.concept)
+                if ids is None:
+                    ids = concept_ids[location.concept] = CONCEPT_SEPARATOR_PATTERN.split(location.concept)
+                found.update(ids)
+            yield found
+
+    def find_concept_ids(self, contexts: Iterable[str], *, wanted: Optional[AbstractSet[str]] = None) -> Set[str]:
+        """Find the concept IDs of the tree mentioned in the texts.
+
+        Args:
+            contexts (Iterable[str]):
+                Texts to search in, e.g. passages of the paper.
+            wanted (:obj:`AbstractSet[str]`, optional):
+                IDs of interest. The search stops once all of them are found, so the other IDs may be incomplete.
+
+        Returns:
+            Set of concept IDs.
+        """
+        found: Set[str] = set()
+        for ids in self.iter_concept_ids(contexts):
+            found.update(ids)
+            if wanted is not None and wanted <= found:
+                break
+        return found
+
+
+class LazyConceptIds(AbstractSet):
+    """Concept IDs mentioned in the texts, which are searched only as far as the lookups need.
+
+    A lookup of an ID not found yet searches the next texts until it's found, so the search stops early if all of the looked
+    up IDs are in the first texts. Iteration and length search all of the texts.
+    """
+
+    def __init__(self, tree: PrefixTree, contexts: Iterable[str]):
+        """
+        Args:
+            tree (PrefixTree):
+                Tree of the mentions to search.
+            contexts (Iterable[str]):
+                Texts to search in.
+        """
+        self._found: Set[str] = set()
+        self._pending: Optional[Iterator[Set[str]]] = tree.iter_concept_ids(contexts)
+
+    @property
+    def exhausted(self) -> bool:
+        return self._pending is None
+
+    def _search_until(self, concept_id: Optional[str]):
+        while self._pending is not None and (concept_id is None or concept_id not in self._found):
+            ids = next(self._pending, None)
+            if ids is None:
+                self._pending = None
+            else:
+                self._found.update(ids)
+
+    def __contains__(self, concept_id) -> bool:
+        self._search_until(concept_id)
+        return concept_id in self._found
+
+    def __iter__(self) -> Iterator[str]:
+        self._search_until(None)
+        return iter(self._found)
+
+    def __len__(self) -> int:
+        self._search_until(None)
+        return len(self._found)
+
+
+def _count_space(text: str, position: int) -> int:
+    return _SPACE_PATTERN.match(text, position).end() - position
+
 
 def _pretty_print(node: Node, depth: str) -> str:
     res = ''